@@ -1,8 +1,8 @@
-from appwrite.client import Client
 from appwrite.services.account import Account
 from appwrite.exception import AppwriteException
 import os
 from dotenv import load_dotenv
+from db import get_appwrite_client
 
 load_dotenv()
 
@@ -12,10 +12,7 @@ API_KEY = os.getenv("APPWRITE_API_KEY")
 
 class Auth:
     def __init__(self):
-        self.client = Client()
-        self.client.set_endpoint(ENDPOINT)
-        self.client.set_project(PROJECT_ID)
-        self.client.set_key(API_KEY)
+        self.client = get_appwrite_client()
         self.account = Account(self.client)
 
     def login(self, email, password):
@@ -29,10 +26,7 @@ class Auth:
         
 class AdminAuth:
     def __init__(self):
-        self.client = Client()
-        self.client.set_endpoint(ENDPOINT)
-        self.client.set_project(PROJECT_ID)
-        self.client.set_key(API_KEY)
+        self.client = get_appwrite_client()
         self.account = Account(self.client)
         from appwrite.services.teams import Teams
         from appwrite.query import Query
@@ -370,8 +370,10 @@
 
 # File: chatbot.py
 import os
+import time
 import logging
-from typing import Dict, List, Optional, Any
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
+from typing import Callable, Dict, List, Optional, Any, Tuple
 from flask import session
 from datetime import datetime, timedelta
 # from trip_planner import generate_trip_plan
@@ -380,13 +382,35 @@ from trip_planner import generate_trip_plan_from_details, extract_trip_details,
 
 # Import our new, clean Gemini service
 from services.gemini_service import gemini_service
+from services.conversation_store import conversation_store
+from services.intent_classifier import intent_classifier
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Trip-plan tasks are independent (one Gemini call, three SerpAPI calls), so they
+# run side by side on a bounded pool. Each task has its own deadline in seconds,
+# overridable with e.g. CHATBOT_TASK_TIMEOUT_FIND_HOTELS=15.
+TASK_DEADLINES = {
+    "plan_itinerary": 90,
+    "find_hotels": 20,
+    "find_flights": 20,
+    "find_attractions": 20,
+}
+for _task in TASK_DEADLINES:
+    _value = os.getenv(f"CHATBOT_TASK_TIMEOUT_{_task.upper()}")
+    if _value and _value.isdigit():
+        TASK_DEADLINES[_task] = int(_value)
+
+_task_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("CHATBOT_TASK_WORKERS", "8")),
+    thread_name_prefix="trip-task"
+)
+
 class TTravelsChatbot:
     def __init__(self):
-        self.conversation_history = {}
+        # Bounded, expiring store; optionally shared across workers (see services.conversation_store)
+        self.conversation_history = conversation_store
     
     def get_system_instructions(self) -> str:
         """Get comprehensive system instructions for the chatbot."""
@@ -458,10 +482,54 @@ class TTravelsChatbot:
                 history_text += f"{role}: {exchange['content']}\n"
         
         return f"{system_instructions}\n{history_text}\nCurrent user message: {user_message}"
+
+    @staticmethod
+    def _extracted_details(extracted: Any) -> Dict[str, Any]:
+        """Non-empty trip fields from an extract_trip_details result (nested or flat)."""
+        if not isinstance(extracted, dict):
+            return {}
+        details = extracted.get("details") if isinstance(extracted.get("details"), dict) else extracted
+        return {k: v for k, v in details.items() if k != "tasks" and v}
+
+    @staticmethod
+    def _trip_context(history: List[Dict]) -> Dict[str, Any]:
+        """
+        Merge the trip details stored on earlier user turns; later turns win.
+
+        Details are stored on each user entry when its message is extracted,
+        so reading the context needs no model calls.
+        """
+        context = {}
+        for msg in history:
+            if msg.get("role") == "user":
+                context.update(msg.get("details") or {})
+        return context
+
+    def _remember_turn(self, conversation_id: str, user_message: str, reply_text: str,
+                       details: Optional[Dict[str, Any]] = None):
+        """Append a user/assistant exchange, keeping the user turn's extracted details with it."""
+        history = self.conversation_history.get(conversation_id, [])
+        user_entry = {"role": "user", "content": user_message}
+        if details:
+            user_entry["details"] = details
+        history.append(user_entry)
+        history.append({"role": "assistant", "content": reply_text})
+        self.conversation_history[conversation_id] = history[-20:]
         
-    def generate_response(self, user_message: str, conversation_id: Optional[str] = "default") -> Dict[str, Any]:
+    def generate_response(self, user_message: str, conversation_id: Optional[str] = "default",
+                          on_token: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
         """
         Orchestrates generating a response using the Gemini service.
+
+        Args:
+            user_message: Text from the user
+            conversation_id: Conversation the message belongs to
+            on_token: Optional callback receiving reply text chunks as Gemini
+                streams them (free-form chat replies only; structured replies
+                such as flights or trip plans arrive whole in the return value)
+
+        Returns:
+            Dict with at least "reply"
         """
         try:
             # Defensive normalization: some callers may accidentally pass a dict
@@ -483,30 +551,20 @@ class TTravelsChatbot:
                     user_message = str(user_message)
 
             # --- PHASE 2: INTENT DETECTION ---
-            # (For now, we'll use a simple keyword check. You can upgrade 
-            # this to a Gemini call as we discussed in the workflow.)
-
-            import re
-            user_text_lower = user_message.lower()
-            # Detect "create full trip plan" - should trigger comprehensive trip plan generation
-            is_full_trip_plan_request = bool(re.search(r"\b(create|make|generate|build).*(full|complete|entire|whole|comprehensive).*(trip|plan|itinerary)\b", user_text_lower)) or \
-                                        bool(re.search(r"\b(now|then|please).*(create|make|generate).*(full|complete|entire|whole|comprehensive).*(trip|plan|itinerary)\b", user_text_lower))
-            # Require a planning keyword AND some indication of a destination or duration to avoid false positives
-            has_plan_keyword = bool(re.search(r"\b(plan|itinerary|trip)\b", user_text_lower))
-            has_destination_or_duration = bool(re.search(r"\bto\b|\bfor\b|\bdays?\b|\b\d{1,2}\b", user_text_lower))
-            is_plan_request = has_plan_keyword and (has_destination_or_duration or is_full_trip_plan_request)
-            
-            # Detect general greetings/chat (should bypass planning)
-            is_general_greeting = bool(re.search(r"\b(hi|hello|hey|greetings|good morning|good afternoon|good evening)\b", user_text_lower)) and not has_plan_keyword
+            # Table-driven keyword rules, compiled once (see services.intent_classifier)
+            intent = intent_classifier.classify(user_message)
+            # "create full trip plan" - should trigger comprehensive trip plan generation
+            is_full_trip_plan_request = intent["full_trip_plan"]
+            # A planning keyword AND some indication of a destination or duration
+            is_plan_request = intent["plan"]
+            # General greetings/chat (should bypass planning)
+            is_general_greeting = intent["greeting"]
 
             # --- NEW: SEARCH INTENT HANDLERS ---
-            # Detect flight search
-            import re
-            is_flight_search = bool(re.search(r"\b(flight|flights)\b", user_text_lower)) and bool(re.search(r"\b(from|to|on|depart)\b", user_text_lower))
-            is_hotel_search = bool(re.search(r"\b(hotel|hotels|accommodation|stay|room|find.*hotel|show.*hotel|add.*hotel)\b", user_text_lower))
-            
-            # Check if user is asking to add hotels to existing trip plan
-            is_add_hotels_request = bool(re.search(r"\b(add|find|show|get|search for).*(hotel|hotels|accommodation|stay)\b", user_text_lower)) and not is_plan_request
+            is_flight_search = intent["flight_search"]
+            is_hotel_search = intent["hotel_search"]
+            # Asking to add hotels to an existing trip plan
+            is_add_hotels_request = intent["add_hotels"]
 
             if is_flight_search:
                 # Get conversation history for context
@@ -537,10 +595,7 @@ class TTravelsChatbot:
                 formatted = self._format_flight_response(flights, origin, destination, date, return_date)
                 
                 # Update conversation history
-                history = self.conversation_history.get(conversation_id, [])
-                history.append({"role": "user", "content": user_message})
-                history.append({"role": "assistant", "content": formatted})
-                self.conversation_history[conversation_id] = history[-20:]
+                self._remember_turn(conversation_id, user_message, formatted, self._extracted_details(details))
                 
                 return {"reply": formatted}
 
@@ -555,17 +610,10 @@ class TTravelsChatbot:
                 
                 details_dict = details.get("details", {}) if isinstance(details, dict) else {}
                 
-                # Check conversation history for previously mentioned destination
+                # Fall back to the destination of an earlier turn
                 destination = details_dict.get('destination')
                 if not destination:
-                    for msg in reversed(history[-10:]):
-                        if msg.get("role") == "user":
-                            prev_extracted = extract_trip_details(msg.get("content", ""), conversation_history=history)
-                            if prev_extracted and isinstance(prev_extracted, dict):
-                                prev_dest = prev_extracted.get("details", {}).get("destination")
-                                if prev_dest:
-                                    destination = prev_dest
-                                    break
+                    destination = self._trip_context(history).get('destination')
                 
                 # Also check session context
                 if not destination:
@@ -615,19 +663,14 @@ class TTravelsChatbot:
                     formatted = self._format_hotel_response(hotels, destination, check_in)
                     formatted += "\n\nI've added these hotel options to your trip plan. You can select one by clicking the 'Select' button."
                     
-                    history.append({"role": "user", "content": user_message})
-                    history.append({"role": "assistant", "content": formatted})
-                    self.conversation_history[conversation_id] = history[-20:]
+                    self._remember_turn(conversation_id, user_message, formatted, self._extracted_details(details))
                     
                     return {"reply": formatted, "trip_plan": mini_plan}
                 else:
                     formatted = self._format_hotel_response(hotels, destination, check_in)
                     
                     # Update conversation history
-                    history = self.conversation_history.get(conversation_id, [])
-                    history.append({"role": "user", "content": user_message})
-                    history.append({"role": "assistant", "content": formatted})
-                    self.conversation_history[conversation_id] = history[-20:]
+                    self._remember_turn(conversation_id, user_message, formatted, self._extracted_details(details))
                     
                     # Return structured hotel results for frontend rendering
                     reply_text = formatted
@@ -639,7 +682,7 @@ class TTravelsChatbot:
             if is_general_greeting:
                 history = self.conversation_history.get(conversation_id, [])
                 full_prompt = self._build_context_prompt(user_message, history)
-                reply_text = gemini_service.generate_chat_response(full_prompt)
+                reply_text = self._chat_completion(full_prompt, on_token)
                 
                 if not reply_text:
                     reply_text = "Hello! How can I help you plan your trip today?"
@@ -662,6 +705,7 @@ class TTravelsChatbot:
                 # Get tasks and details from extracted data
                 tasks = extracted.get("tasks", [])
                 details = extracted.get("details", {})
+                turn_details = self._extracted_details(extracted)
                 
                 # If user requests a "full trip plan", automatically include all tasks
                 if is_full_trip_plan_request:
@@ -677,56 +721,11 @@ class TTravelsChatbot:
                 # Get existing context from session and conversation history
                 context = session.get('trip_context', {}) or {}
                 
-                # Also check conversation history for previously mentioned details
-                history = self.conversation_history.get(conversation_id, [])
-                for msg in history[-10:]:  # Check last 10 messages
-                    if msg.get("role") == "user":
-                        # Try to extract details from previous user messages
-                        prev_extracted = extract_trip_details(msg.get("content", ""), conversation_history=history[:history.index(msg)])
-                        if prev_extracted and isinstance(prev_extracted, dict):
-                            prev_details = prev_extracted.get("details", {})
-                            for k, v in prev_details.items():
-                                if v and not context.get(k):  # Only use if not already in context
-                                    context[k] = v
-                
-                # For full trip plan requests, also try to extract hotels/flights from conversation history
-                # Look for any hotel or flight mentions in the conversation
-                if is_full_trip_plan_request:
-                    # Try to find any hotel selections or mentions in previous messages
-                    hotel_context = {}
-                    flight_context = {}
-                    for msg in history[-15:]:  # Check last 15 messages
-                        msg_content = msg.get("content", "").lower()
-                        # Look for hotel mentions with destination context
-                        if any(word in msg_content for word in ["hotel", "accommodation", "stay", "booked", "selected"]):
-                            prev_extracted = extract_trip_details(msg.get("content", ""), conversation_history=history[:history.index(msg)] if msg in history else history)
-                            if prev_extracted and isinstance(prev_extracted, dict):
-                                prev_details = prev_extracted.get("details", {})
-                                if prev_details.get("destination"):
-                                    hotel_context["destination"] = prev_details.get("destination")
-                                if prev_details.get("departure_date"):
-                                    hotel_context["departure_date"] = prev_details.get("departure_date")
-                                if prev_details.get("return_date"):
-                                    hotel_context["return_date"] = prev_details.get("return_date")
-                        # Look for flight mentions
-                        if any(word in msg_content for word in ["flight", "fly", "airline", "departure", "arrival"]):
-                            prev_extracted = extract_trip_details(msg.get("content", ""), conversation_history=history[:history.index(msg)] if msg in history else history)
-                            if prev_extracted and isinstance(prev_extracted, dict):
-                                prev_details = prev_extracted.get("details", {})
-                                if prev_details.get("origin"):
-                                    flight_context["origin"] = prev_details.get("origin")
-                                if prev_details.get("destination"):
-                                    flight_context["destination"] = prev_details.get("destination")
-                                if prev_details.get("departure_date"):
-                                    flight_context["departure_date"] = prev_details.get("departure_date")
-                    
-                    # Merge hotel and flight context into main context if not already present
-                    for k, v in hotel_context.items():
-                        if v and not context.get(k):
-                            context[k] = v
-                    for k, v in flight_context.items():
-                        if v and not context.get(k):
-                            context[k] = v
+                # Fill gaps from the details stored on earlier turns (origin,
+                # dates and hotel/flight destinations included) without re-extracting them
+                for k, v in self._trip_context(history).items():
+                    if not context.get(k):
+                        context[k] = v
                 
                 # Merge new details into context (new details override old ones)
                 for k, v in (details or {}).items():
@@ -738,68 +737,37 @@ class TTravelsChatbot:
                     session.pop('trip_context', None)
                     reply_text = "Where would you like to go?"
                     # Update conversation history
-                    history = self.conversation_history.get(conversation_id, [])
-                    history.append({"role": "user", "content": user_message})
-                    history.append({"role": "assistant", "content": reply_text})
-                    self.conversation_history[conversation_id] = history[-20:]
+                    self._remember_turn(conversation_id, user_message, reply_text, turn_details)
                     return {"reply": reply_text}
 
                 if not context.get('days') and "plan_itinerary" in tasks:
                     session['trip_context'] = context
                     reply_text = "Sounds fun! How many days are you planning for?"
                     # Update conversation history
-                    history = self.conversation_history.get(conversation_id, [])
-                    history.append({"role": "user", "content": user_message})
-                    history.append({"role": "assistant", "content": reply_text})
-                    self.conversation_history[conversation_id] = history[-20:]
+                    self._remember_turn(conversation_id, user_message, reply_text, turn_details)
                     return {"reply": reply_text}
 
                 # Check if user is asking for budget info (not providing it)
-                user_asks_for_budget = bool(re.search(r"\b(give me|tell me|what is|what's|show me|need|want).*budget\b", user_text_lower))
+                user_asks_for_budget = intent["asks_budget"]
                 
                 if not context.get('budget') and "plan_itinerary" in tasks and not user_asks_for_budget:
                     session['trip_context'] = context
                     reply_text = "Got it. What's your approximate budget? You can say a number (like '50000' or '50k'), or a category like 'cheap', 'moderate', or 'luxury'."
                     # Update conversation history
-                    history = self.conversation_history.get(conversation_id, [])
-                    history.append({"role": "user", "content": user_message})
-                    history.append({"role": "assistant", "content": reply_text})
-                    self.conversation_history[conversation_id] = history[-20:]
+                    self._remember_turn(conversation_id, user_message, reply_text, turn_details)
                     return {"reply": reply_text}
 
                 # All info present: execute all tasks
                 full_plan = {"details": context}
                 
-                # For full trip plan requests, ensure we have origin if we have destination
-                # This helps with flight searches
-                if is_full_trip_plan_request and "find_flights" in tasks:
-                    if context.get("destination") and not context.get("origin"):
-                        # Try to infer origin from conversation or use a default
-                        # Look for any origin mentions in conversation
-                        for msg in history[-10:]:
-                            if msg.get("role") == "user":
-                                prev_extracted = extract_trip_details(msg.get("content", ""), conversation_history=history[:history.index(msg)] if msg in history else history)
-                                if prev_extracted and isinstance(prev_extracted, dict):
-                                    prev_details = prev_extracted.get("details", {})
-                                    if prev_details.get("origin"):
-                                        context["origin"] = prev_details.get("origin")
-                                        break
-                
-                # Execute each task
+                # Execute all tasks concurrently, then assemble whatever finished in time
+                task_results, timed_out = self._run_trip_tasks(tasks, context)
                 for task in tasks:
+                    if task not in task_results:
+                        continue
                     try:
                         if task == "plan_itinerary":
-                            itinerary_obj = build_itinerary(
-                                context.get("destination"),
-                                context.get("days"),
-                                context.get("interests") or [],
-                                context.get("budget"),
-                                context.get("origin"),
-                                context.get("transport"),
-                                context.get("passengers") or context.get("adults") or 1,
-                                context.get("departure_date"),
-                                context.get("return_date")
-                            )
+                            itinerary_obj = task_results[task]
                             full_plan["itinerary_object"] = itinerary_obj
                             # Get summary from itinerary_object, with fallback
                             summary = itinerary_obj.get("summary", "")
@@ -827,33 +795,24 @@ class TTravelsChatbot:
                             full_plan["itinerary_text"] = summary
                         
                         elif task == "find_hotels":
-                            hotel_options = get_hotel_options(
-                                context.get("destination"),
-                                context.get("departure_date"),
-                                context.get("return_date"),
-                                adults=context.get("adults") or context.get("passengers") or 2,
-                                budget=context.get("budget")
-                            )
+                            hotel_options = task_results[task]
                             if not isinstance(hotel_options, dict) or "error" not in hotel_options:
                                 full_plan["hotels"] = hotel_options if isinstance(hotel_options, list) else [hotel_options]
                         
                         elif task == "find_flights":
-                            flight_options = get_flight_options(
-                                context.get("origin"),
-                                context.get("destination"),
-                                context.get("departure_date"),
-                                context.get("return_date")
-                            )
+                            flight_options = task_results[task]
                             if not isinstance(flight_options, dict) or "error" not in flight_options:
                                 full_plan["flights"] = flight_options if isinstance(flight_options, list) else [flight_options]
                         
                         elif task == "find_attractions":
-                            attractions = get_attractions(context.get("destination"))
+                            attractions = task_results[task]
                             if not isinstance(attractions, dict) or "error" not in attractions:
                                 full_plan["attractions"] = attractions if isinstance(attractions, list) else [attractions]
                     except Exception as e:
                         print(f"Error executing task {task}: {e}")
                         # Continue with other tasks even if one fails
+                if timed_out:
+                    full_plan["incomplete_tasks"] = timed_out
                 
                 # Clear context
                 session.pop('trip_context', None)
@@ -865,7 +824,7 @@ class TTravelsChatbot:
                     itinerary_summary = itinerary_obj.get('summary', '') or full_plan.get('itinerary_text', '')
                     
                     # Check if user asked for budget info
-                    user_asks_for_budget = bool(re.search(r"\b(give me|tell me|what is|what's|show me|need|want).*budget\b", user_text_lower))
+                    user_asks_for_budget = intent["asks_budget"]
                     
                     if itinerary_summary:
                         summary_parts.append(f"Here's your {context.get('days', '')}-day trip plan to {context.get('destination', 'your destination')}:\n\n{itinerary_summary}")
@@ -882,6 +841,8 @@ class TTravelsChatbot:
                     summary_parts.append(f"I've found {len(full_plan.get('flights', []))} flight option(s) for you.")
                 if "find_attractions" in tasks and full_plan.get("attractions"):
                     summary_parts.append(f"I've found {len(full_plan.get('attractions', []))} attraction(s) to visit.")
+                if full_plan.get("incomplete_tasks"):
+                    summary_parts.append(self._format_incomplete_tasks(full_plan["incomplete_tasks"]))
                 
                 # For full trip plan requests, provide a more comprehensive summary
                 if is_full_trip_plan_request:
@@ -890,10 +851,7 @@ class TTravelsChatbot:
                     reply_text = "\n\n".join(summary_parts) if summary_parts else "I've prepared everything for your trip!"
                 
                 # Update conversation history
-                history = self.conversation_history.get(conversation_id, [])
-                history.append({"role": "user", "content": user_message})
-                history.append({"role": "assistant", "content": reply_text})
-                self.conversation_history[conversation_id] = history[-20:]
+                self._remember_turn(conversation_id, user_message, reply_text, turn_details)
                 
                 return {"reply": reply_text, "trip_plan": full_plan}
 
@@ -915,51 +873,35 @@ class TTravelsChatbot:
                     session.pop('trip_context', None)
                     reply_text = "Where would you like to go?"
                     # Update conversation history
-                    history = self.conversation_history.get(conversation_id, [])
-                    history.append({"role": "user", "content": user_message})
-                    history.append({"role": "assistant", "content": reply_text})
-                    self.conversation_history[conversation_id] = history[-20:]
+                    self._remember_turn(conversation_id, user_message, reply_text, self._extracted_details(new_details))
                     return {"reply": reply_text}
                 if not context.get('days'):
                     session['trip_context'] = context
                     reply_text = "Sounds fun! How many days are you planning for?"
                     # Update conversation history
-                    history = self.conversation_history.get(conversation_id, [])
-                    history.append({"role": "user", "content": user_message})
-                    history.append({"role": "assistant", "content": reply_text})
-                    self.conversation_history[conversation_id] = history[-20:]
+                    self._remember_turn(conversation_id, user_message, reply_text, self._extracted_details(new_details))
                     return {"reply": reply_text}
                 # Check if user is asking for budget info (not providing it)
-                user_asks_for_budget = bool(re.search(r"\b(give me|tell me|what is|what's|show me|need|want).*budget\b", user_text_lower))
+                user_asks_for_budget = intent["asks_budget"]
                 
                 if not context.get('budget') and not user_asks_for_budget:
                     session['trip_context'] = context
                     reply_text = "Got it. What's your approximate budget? You can say a number (like '50000' or '50k'), or a category like 'cheap', 'moderate', or 'luxury'."
                     # Update conversation history
-                    history = self.conversation_history.get(conversation_id, [])
-                    history.append({"role": "user", "content": user_message})
-                    history.append({"role": "assistant", "content": reply_text})
-                    self.conversation_history[conversation_id] = history[-20:]
+                    self._remember_turn(conversation_id, user_message, reply_text, self._extracted_details(new_details))
                     return {"reply": reply_text}
                 
                 # Execute tasks (same orchestrator logic as above)
                 tasks = extracted.get("tasks", ["plan_itinerary"]) if isinstance(extracted, dict) else ["plan_itinerary"]
                 full_plan = {"details": context}
                 
+                task_results, timed_out = self._run_trip_tasks(tasks, context)
                 for task in tasks:
+                    if task not in task_results:
+                        continue
                     try:
                         if task == "plan_itinerary":
-                            itinerary_obj = build_itinerary(
-                                context.get("destination"),
-                                context.get("days"),
-                                context.get("interests") or [],
-                                context.get("budget"),
-                                context.get("origin"),
-                                context.get("transport"),
-                                context.get("passengers") or context.get("adults") or 1,
-                                context.get("departure_date"),
-                                context.get("return_date")
-                            )
+                            itinerary_obj = task_results[task]
                             full_plan["itinerary_object"] = itinerary_obj
                             # Get summary from itinerary_object, with fallback
                             summary = itinerary_obj.get("summary", "")
@@ -981,25 +923,21 @@ class TTravelsChatbot:
                                 summary = "\n".join(summary_parts) if summary_parts else f"Here's your {context.get('days', '')}-day trip plan to {context.get('destination', 'your destination')}."
                             full_plan["itinerary_text"] = summary
                         elif task == "find_hotels":
-                            hotel_options = get_hotel_options(
-                                context.get("destination"),
-                                context.get("departure_date"),
-                                context.get("return_date"),
-                                adults=context.get("adults") or context.get("passengers") or 2,
-                                budget=context.get("budget")
-                            )
+                            hotel_options = task_results[task]
                             if not isinstance(hotel_options, dict) or "error" not in hotel_options:
                                 full_plan["hotels"] = hotel_options if isinstance(hotel_options, list) else [hotel_options]
                         elif task == "find_flights":
-                            flight_options = get_flight_options(context.get("origin"), context.get("destination"), context.get("departure_date"), context.get("return_date"))
+                            flight_options = task_results[task]
                             if not isinstance(flight_options, dict) or "error" not in flight_options:
                                 full_plan["flights"] = flight_options if isinstance(flight_options, list) else [flight_options]
                         elif task == "find_attractions":
-                            attractions = get_attractions(context.get("destination"))
+                            attractions = task_results[task]
                             if not isinstance(attractions, dict) or "error" not in attractions:
                                 full_plan["attractions"] = attractions if isinstance(attractions, list) else [attractions]
                     except Exception as e:
                         print(f"Error executing task {task}: {e}")
+                if timed_out:
+                    full_plan["incomplete_tasks"] = timed_out
                 
                 session.pop('trip_context', None)
                 
@@ -1017,6 +955,8 @@ class TTravelsChatbot:
                     summary_parts.append(f"I've found {len(full_plan.get('flights', []))} flight option(s) for you.")
                 if "find_attractions" in tasks and full_plan.get("attractions"):
                     summary_parts.append(f"I've found {len(full_plan.get('attractions', []))} attraction(s) to visit.")
+                if full_plan.get("incomplete_tasks"):
+                    summary_parts.append(self._format_incomplete_tasks(full_plan["incomplete_tasks"]))
                 
                 # For full trip plan requests, provide a more comprehensive summary
                 if is_full_trip_plan_request:
@@ -1025,10 +965,7 @@ class TTravelsChatbot:
                     reply_text = "\n\n".join(summary_parts) if summary_parts else "I've prepared everything for your trip!"
                 
                 # Update conversation history
-                history = self.conversation_history.get(conversation_id, [])
-                history.append({"role": "user", "content": user_message})
-                history.append({"role": "assistant", "content": reply_text})
-                self.conversation_history[conversation_id] = history[-20:]
+                self._remember_turn(conversation_id, user_message, reply_text, self._extracted_details(new_details))
                 
                 return {"reply": reply_text, "trip_plan": full_plan}
 
@@ -1038,7 +975,7 @@ class TTravelsChatbot:
             # If it's not a planning request, just have a normal chat.
             history = self.conversation_history.get(conversation_id, [])
             full_prompt = self._build_context_prompt(user_message, history)
-            reply_text = gemini_service.generate_chat_response(full_prompt)
+            reply_text = self._chat_completion(full_prompt, on_token)
 
             if not reply_text:
                 raise Exception("Failed to get a valid reply from Gemini service.")
@@ -1054,6 +991,107 @@ class TTravelsChatbot:
             logger.exception(f"Error in TTravelsChatbot.generate_response: {e}") # <-- NEW (logs full traceback)
             return {"reply": "I'm sorry, I encountered an error. Please try again.", "error": str(e)}
 
+    def _chat_completion(self, prompt: str, on_token: Optional[Callable[[str], None]] = None) -> str:
+        """
+        Get a free-form chat reply, streaming chunks to on_token when given.
+
+        Args:
+            prompt: Full prompt including history
+            on_token: Optional callback receiving each text chunk
+
+        Returns:
+            The complete reply text
+        """
+        if on_token is None:
+            # Conversation should not replay a cached reply
+            return gemini_service.generate_chat_response(prompt, cache=False, task="chat")
+        parts = []
+        for chunk in gemini_service.stream_chat_response(prompt, task="chat"):
+            parts.append(chunk)
+            on_token(chunk)
+        return "".join(parts).strip()
+
+    def _execute_trip_task(self, task: str, context: Dict[str, Any]) -> Any:
+        """Run a single trip-plan task against the merged trip context."""
+        if task == "plan_itinerary":
+            return build_itinerary(
+                context.get("destination"),
+                context.get("days"),
+                context.get("interests") or [],
+                context.get("budget"),
+                context.get("origin"),
+                context.get("transport"),
+                context.get("passengers") or context.get("adults") or 1,
+                context.get("departure_date"),
+                context.get("return_date")
+            )
+        if task == "find_hotels":
+            return get_hotel_options(
+                context.get("destination"),
+                context.get("departure_date"),
+                context.get("return_date"),
+                adults=context.get("adults") or context.get("passengers") or 2,
+                budget=context.get("budget")
+            )
+        if task == "find_flights":
+            return get_flight_options(
+                context.get("origin"),
+                context.get("destination"),
+                context.get("departure_date"),
+                context.get("return_date")
+            )
+        if task == "find_attractions":
+            return get_attractions(context.get("destination"))
+        raise ValueError(f"Unknown task: {task}")
+
+    def _run_trip_tasks(self, tasks: List[str], context: Dict[str, Any]) -> Tuple[Dict[str, Any], List[str]]:
+        """
+        Run trip-plan tasks concurrently, each bounded by its own deadline.
+
+        Args:
+            tasks: Task names such as "plan_itinerary" or "find_hotels"
+            context: Merged trip details passed to every task
+
+        Returns:
+            Tuple of (results keyed by task, tasks that missed their deadline).
+            Tasks that raised are logged and left out of both.
+        """
+        started = time.monotonic()
+        # Each task gets its own snapshot so a slow task can't observe later edits
+        futures = {
+            task: _task_executor.submit(self._execute_trip_task, task, dict(context))
+            for task in dict.fromkeys(tasks)
+        }
+
+        results = {}
+        timed_out = []
+        for task, future in futures.items():
+            deadline = started + TASK_DEADLINES.get(task, 30)
+            try:
+                results[task] = future.result(timeout=max(0.0, deadline - time.monotonic()))
+            except FuturesTimeoutError:
+                # The worker keeps running in the background (its SerpAPI result still
+                # lands in the shared cache) but this reply no longer waits for it.
+                future.cancel()
+                timed_out.append(task)
+                print(f"Task {task} exceeded its {TASK_DEADLINES.get(task, 30)}s deadline")
+            except Exception as e:
+                print(f"Error executing task {task}: {e}")
+
+        logger.info(f"Trip tasks {list(futures)} finished in {time.monotonic() - started:.2f}s (timed out: {timed_out})")
+        return results, timed_out
+
+    def _format_incomplete_tasks(self, tasks: List[str]) -> str:
+        """Tell the user which parts of the plan didn't make it in time."""
+        labels = {
+            "plan_itinerary": "the itinerary",
+            "find_hotels": "hotels",
+            "find_flights": "flights",
+            "find_attractions": "attractions",
+        }
+        names = ", ".join(labels.get(t, t) for t in tasks)
+        return f"Searching for {names} is taking longer than usual. Ask me again in a moment and I'll add them to your plan."
+
     def _format_flight_response(self, flights, origin, destination, date, return_date=None) -> str:
         """Create a human-friendly summary of flight options."""
         try:
@@ -3,7 +3,14 @@ from appwrite.services.databases import Databases
 from appwrite.id import ID
 from appwrite.exception import AppwriteException
 from appwrite.query import Query
+from appwrite.input_file import InputFile
+from appwrite.encoders.value_class_encoder import ValueClassEncoder
 import os
+import json
+import threading
+import requests
+from http.cookiejar import DefaultCookiePolicy
+from requests.adapters import HTTPAdapter
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -14,13 +21,139 @@ API_KEY = os.getenv("APPWRITE_API_KEY")
 DATABASE_ID = os.getenv("APPWRITE_DATABASE_ID")
 COLLECTION_ID = os.getenv("APPWRITE_COLLECTION_ID")
 
-def create_user_document(fname, lname, email, mobile):
-    client = Client()
-    client.set_endpoint(ENDPOINT)
-    client.set_project(PROJECT_ID)
-    client.set_key(API_KEY)
+# Connection pool settings for the shared Appwrite client
+POOL_SIZE = int(os.getenv("APPWRITE_POOL_SIZE", "10"))
+CONNECT_TIMEOUT = float(os.getenv("APPWRITE_CONNECT_TIMEOUT", "5"))
+READ_TIMEOUT = float(os.getenv("APPWRITE_READ_TIMEOUT", "30"))
+
+
+class PooledClient(Client):
+    """
+    Appwrite client that sends every request over one keep-alive
+    requests.Session instead of a fresh connection per call.
+
+    call() mirrors Client.call from the pinned SDK (appwrite==11.0.0);
+    only the transport line differs.
+    """
+
+    def __init__(self, pool_size=POOL_SIZE, timeout=(CONNECT_TIMEOUT, READ_TIMEOUT)):
+        super().__init__()
+        self._timeout = timeout
+        self._http = requests.Session()
+        # The server authenticates with the API key; never let one user's
+        # session cookie (e.g. from a login call) ride along on later requests
+        self._http.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self._http.mount("https://", adapter)
+        self._http.mount("http://", adapter)
+
+    def call(self, method, path='', headers=None, params=None, response_type='json'):
+        if headers is None:
+            headers = {}
+
+        if params is None:
+            params = {}
+
+        params = {k: v for k, v in params.items() if v is not None}
+
+        data = {}
+        files = {}
+        stringify = False
+
+        headers = {**self._global_headers, **headers}
+
+        if method != 'get':
+            data = params
+            params = {}
+
+        if headers['content-type'].startswith('application/json'):
+            data = json.dumps(data, cls=ValueClassEncoder)
+
+        if headers['content-type'].startswith('multipart/form-data'):
+            del headers['content-type']
+            stringify = True
+            for key in data.copy():
+                if isinstance(data[key], InputFile):
+                    files[key] = (data[key].filename, data[key].data)
+                    del data[key]
+            data = self.flatten(data, stringify=stringify)
+
+        response = None
+        try:
+            response = self._http.request(
+                method=method,
+                url=self._endpoint + path,
+                params=self.flatten(params, stringify=stringify),
+                data=data,
+                files=files,
+                headers=headers,
+                verify=(not self._self_signed),
+                allow_redirects=False if response_type == 'location' else True,
+                timeout=self._timeout
+            )
+
+            response.raise_for_status()
+
+            warnings = response.headers.get('x-appwrite-warning')
+            if warnings:
+                for warning in warnings.split(';'):
+                    print(f'Warning: {warning}')
+
+            content_type = response.headers['Content-Type']
+
+            if response_type == 'location':
+                return response.headers.get('Location')
 
-    databases = Databases(client)
+            if content_type.startswith('application/json'):
+                return response.json()
+
+            return response._content
+        except Exception as e:
+            if response is not None:
+                content_type = response.headers['Content-Type']
+                if content_type.startswith('application/json'):
+                    raise AppwriteException(response.json()['message'], response.status_code, response.json().get('type'), response.text)
+                else:
+                    raise AppwriteException(response.text, response.status_code, None, response.text)
+            else:
+                raise AppwriteException(e)
+
+
+_client = None
+_databases = None
+_client_lock = threading.Lock()
+
+
+def get_appwrite_client():
+    """
+    Return the process-wide Appwrite client, creating it on first use.
+    Safe to share across Flask's request threads.
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                client = PooledClient()
+                if ENDPOINT:
+                    client.set_endpoint(ENDPOINT)
+                client.set_project(PROJECT_ID)
+                client.set_key(API_KEY)
+                _client = client
+    return _client
+
+
+def get_databases():
+    """Return the process-wide Databases service bound to the shared client."""
+    global _databases
+    if _databases is None:
+        client = get_appwrite_client()
+        with _client_lock:
+            if _databases is None:
+                _databases = Databases(client)
+    return _databases
+
+def create_user_document(fname, lname, email, mobile):
+    databases = get_databases()
 
     try:
         response = databases.create_document(
@@ -47,12 +180,7 @@ def insert_booking_document(booking_data):
     """
     booking_data: dict with keys matching the bookings table schema
     """
-    client = Client()
-    client.set_endpoint(ENDPOINT)
-    client.set_project(PROJECT_ID)
-    client.set_key(API_KEY)
-
-    databases = Databases(client)
+    databases = get_databases()
     try:
         response = databases.create_document(
             database_id=DATABASE_ID,
@@ -76,12 +204,7 @@ def insert_payment_document(payment_data):
     """
     payment_data: dict with keys matching the payments table schema
     """
-    client = Client()
-    client.set_endpoint(ENDPOINT)
-    client.set_project(PROJECT_ID)
-    client.set_key(API_KEY)
-
-    databases = Databases(client)
+    databases = get_databases()
     try:
         response = databases.create_document(
             database_id=DATABASE_ID,
@@ -105,12 +228,7 @@ def save_trip_plan_document(trip_plan_data):
     """
     trip_plan_data: dict with keys such as user_id, trip_plan (dict or json-string), title, metadata, created_at
     """
-    client = Client()
-    client.set_endpoint(ENDPOINT)
-    client.set_project(PROJECT_ID)
-    client.set_key(API_KEY)
-
-    databases = Databases(client)
+    databases = get_databases()
     # Allow overriding collection id via env var, fallback to 'saved_trip_plans'
     collection_id = os.getenv("SAVED_TRIP_PLANS_COLLECTION_ID", "saved_trip_plans")
     try:
@@ -138,12 +256,7 @@ def get_saved_trip_plans_for_user(user_id, limit=50, offset=0):
     - limit: max documents to return
     - offset: pagination offset
     """
-    client = Client()
-    client.set_endpoint(ENDPOINT)
-    client.set_project(PROJECT_ID)
-    client.set_key(API_KEY)
-
-    databases = Databases(client)
+    databases = get_databases()
     collection_id = os.getenv("SAVED_TRIP_PLANS_COLLECTION_ID", "saved_trip_plans")
     try:
         # Use Query.equal to filter by user_id
@@ -166,12 +279,7 @@ def get_trip_plan_document(document_id):
     Retrieve a saved trip plan document by its Appwrite document id.
     Returns the document dict or an error dict.
     """
-    client = Client()
-    client.set_endpoint(ENDPOINT)
-    client.set_project(PROJECT_ID)
-    client.set_key(API_KEY)
-
-    databases = Databases(client)
+    databases = get_databases()
     collection_id = os.getenv("SAVED_TRIP_PLANS_COLLECTION_ID", "saved_trip_plans")
     try:
         result = databases.get_document(
@@ -194,12 +302,7 @@ def update_trip_plan_document(document_id, trip_plan_data):
     trip_plan_data: dict with keys such as trip_plan (dict or json-string), title, metadata
     Returns the updated document dict or an error dict.
     """
-    client = Client()
-    client.set_endpoint(ENDPOINT)
-    client.set_project(PROJECT_ID)
-    client.set_key(API_KEY)
-
-    databases = Databases(client)
+    databases = get_databases()
     collection_id = os.getenv("SAVED_TRIP_PLANS_COLLECTION_ID", "saved_trip_plans")
     try:
         import json as _json
@@ -245,12 +348,7 @@ def delete_trip_plan_document(document_id):
     Delete a saved trip plan document by its Appwrite document id.
     Returns deleted document info on success or an error dict.
     """
-    client = Client()
-    client.set_endpoint(ENDPOINT)
-    client.set_project(PROJECT_ID)
-    client.set_key(API_KEY)
-
-    databases = Databases(client)
+    databases = get_databases()
     collection_id = os.getenv("SAVED_TRIP_PLANS_COLLECTION_ID", "saved_trip_plans")
     try:
         result = databases.delete_document(
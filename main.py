@@ -1,26 +1,33 @@
-from flask import Flask, render_template, request, jsonify, session, redirect, send_from_directory, url_for
+from flask import Flask, render_template, request, jsonify, session, redirect, send_from_directory, send_file, url_for, Response, stream_with_context, copy_current_request_context
 # Whisper Speech-to-Text API
 import os
 
 import requests
-from appwrite.client import Client
 from appwrite.services.account import Account
-from appwrite.services.databases import Databases
 from appwrite.id import ID
-from db import create_user_document, insert_booking_document, insert_payment_document, save_trip_plan_document, get_saved_trip_plans_for_user, get_trip_plan_document, update_trip_plan_document
+from db import get_appwrite_client, get_databases, create_user_document, insert_booking_document, insert_payment_document, save_trip_plan_document, get_saved_trip_plans_for_user, get_trip_plan_document, update_trip_plan_document
 from auth import Auth, AdminAuth
 from appwrite.exception import AppwriteException
 import secrets
 import os
 from dotenv import load_dotenv
-from serpapi import GoogleSearch
+from services.serp_cache import cached_search, serp_cache
+from services.geocoder import hotel_geocoder
+from services.hotel_store import hotel_store
+from services.train_search import train_index, SORT_KEYS
+from services.autocomplete import load_index
+import io
 import json
+import queue
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 import random
 from functools import wraps
 # from chatbot import get_gemini_response, chatbot
 # from services.speech_to_text import stt_service
 # from services.text_to_speech import tts_service
+from services.tts_jobs import tts_jobs, tts_stream_tickets, tts_job_id
+from services.tts_cache import tts_audio_cache
 # from services.translate import translation_service
 # from services.notification import notification_service
 # from flask_mail import Mail, Message
@@ -32,6 +39,12 @@ from services.text_to_speech import tts_service
 
 # Speech-to-text and translate service (used in other endpoints)
 from services.speech_to_text import stt_service
+from services.transcription_queue import transcription_queue, TranscriptionQueueFull
+from services.vad import vad, NoSpeechDetected
+from services.gemini_cache import gemini_cache
+from services.conversation_store import conversation_store
+from services.trip_parser import fast_trip_parser
+from services.intent_classifier import intent_classifier
 from services.translate import translation_service
 from services.notification import notification_service
 
@@ -43,7 +56,8 @@ app = Flask(__name__)
 # import secrets
 # print(secrets.token_hex(32))
 # Replace 'your-secret-key-here' with the generated value.
-app.secret_key = secrets.token_hex(32)  # Required for sessions
+# Required for sessions; set FLASK_SECRET_KEY so every worker accepts the same cookies
+app.secret_key = os.getenv("FLASK_SECRET_KEY") or secrets.token_hex(32)
 
 # Initialize Flask-Mail
 app.config['MAIL_SERVER'] = os.getenv('MAIL_SERVER', 'smtp.gmail.com')
@@ -77,15 +91,13 @@ app.config['MAIL_DEFAULT_SENDER'] = os.getenv('MAIL_DEFAULT_SENDER', 'noreply@tt
 
 
 # # ---- Appwrite Setup ----
-client = Client()
 load_dotenv()
 
-client.set_endpoint(os.getenv("APPWRITE_ENDPOINT"))
-client.set_project(os.getenv("APPWRITE_PROJECT_ID"))
-client.set_key(os.getenv("APPWRITE_API_KEY"))
+# One pooled, keep-alive client shared with db.py, auth.py and the notification service
+client = get_appwrite_client()
 
 account = Account(client)
-databases = Databases(client)
+databases = get_databases()
 
 SERPAPI_KEY = os.getenv("SERPAPI_KEY")
 
@@ -94,26 +106,16 @@ SERPAPI_KEY = os.getenv("SERPAPI_KEY")
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
 # Path to the trains.json file
-JSON_PATH = os.path.join(BASE_DIR, "static", "js", "trains.json")
-
-# Load train data once
-try:
-    with open(JSON_PATH, "r") as f:
-        train_data = json.load(f)
-    print(f"Loaded {len(train_data)} trains from {JSON_PATH}")
-except Exception as e:
-    print(f"Error loading train data: {e}")
-    train_data = []
+JSON_PATH = train_index.json_path
 
 # Load stations data
 STATIONS_JSON_PATH = os.path.join(BASE_DIR, "static", "js", "stations.json")
-try:
-    with open(STATIONS_JSON_PATH, "r") as f:
-        stations_data = json.load(f)
-    print(f"Loaded {len(stations_data)} stations from {STATIONS_JSON_PATH}")
-except Exception as e:
-    print(f"Error loading stations data: {e}")
-    stations_data = []
+# Busier stations (more trains calling) rank first among equal matches
+station_index = load_index(
+    STATIONS_JSON_PATH, "stations",
+    output_fields=("code", "name", "city", "state"),
+    popularity=lambda station: len(train_index.trains_at_station(station.get("code", "")))
+)
 # ------------------------
 
 # ---------------------------SESSION MANAGEMENT--------------
@@ -139,13 +141,11 @@ def login_required(f):
 #------Flight data load------------
 # Load airport data once
 AIRPORTS_JSON_PATH = os.path.join(BASE_DIR, "static", "js", "airports.json")
-try:
-    with open(AIRPORTS_JSON_PATH, "r") as f:
-        airport_data = json.load(f)
-    print(f"Loaded {len(airport_data)} airports from {AIRPORTS_JSON_PATH}")
-except Exception as e:
-    print(f"Error loading airport data: {e}")
-    airport_data = []
+# airports.json is ordered by traffic, which is the tie-break among equal matches
+airport_index = load_index(
+    AIRPORTS_JSON_PATH, "airports",
+    output_fields=("code", "name", "city", "state", "country")
+)
 #----------End----------------------
 
 @app.route("/")
@@ -302,8 +302,7 @@ def search():
             }
             
         
-        search = GoogleSearch(params)
-        results = search.get_dict()
+        results = cached_search(params)
 
         # Check for API errors
         if "error" in results:
@@ -452,22 +451,10 @@ def trains_page():
 def get_stations():
     """API endpoint to get all stations for autocomplete"""
     try:
-        search = request.args.get('q', '').lower()
+        search = request.args.get('q', '')
         limit = min(int(request.args.get('limit', '10')), 50)  # Limit max results to 50
         
-        filtered_stations = []
-        for station in stations_data:
-            if (search in station['code'].lower() or 
-                search in station['name'].lower() or 
-                search in station['city'].lower()):
-                filtered_stations.append({
-                    'code': station['code'],
-                    'name': station['name'],
-                    'city': station['city'],
-                    'state': station['state']
-                })
-                if len(filtered_stations) >= limit:
-                    break
+        filtered_stations = station_index.search(search, limit)
                     
         return jsonify({
             'success': True,
@@ -480,6 +467,24 @@ def get_stations():
             'error': 'Failed to fetch stations'
         }), 500
 
+@app.route("/api/airports")
+def get_airports():
+    """API endpoint to get airports for autocomplete"""
+    try:
+        search = request.args.get('q', '')
+        limit = min(int(request.args.get('limit', '10')), 50)  # Limit max results to 50
+
+        return jsonify({
+            'success': True,
+            'data': airport_index.search(search, limit)
+        })
+    except Exception as e:
+        print(f"Error in get_airports: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': 'Failed to fetch airports'
+        }), 500
+
 @app.route("/search_trains", methods=["POST"])
 def search_trains():
     try:
@@ -499,12 +504,21 @@ def search_trains():
         
         if not source or not destination:
             return jsonify({"error": "Source and destination are required"}), 400
-        
-        # Filter trains (case-insensitive)
-        results = []
-        for train in train_data:
-            if train["source"].upper() == source and train["destination"].upper() == destination:
-                results.append(train)
+
+        sort_by = data.get("sort_by") or None
+        if sort_by and sort_by not in SORT_KEYS:
+            return jsonify({"error": f"sort_by must be one of {', '.join(SORT_KEYS)}"}), 400
+        
+        # Indexed lookup (case-insensitive), optional via/time/class filters
+        results = train_index.search(
+            source,
+            destination,
+            via=data.get("via"),
+            depart_after=data.get("depart_after"),
+            depart_before=data.get("depart_before"),
+            travel_class=data.get("travel_class") or data.get("class"),
+            sort_by=sort_by
+        )
         
         print(f"Found {len(results)} trains")
         
@@ -523,11 +537,48 @@ def serve_static(filename):
 @app.route("/debug/trains")
 def debug_trains():
     return jsonify({
-        "total_trains": len(train_data),
-        "trains": train_data,
+        "total_trains": len(train_index.trains),
+        "trains": train_index.trains,
         "json_path": JSON_PATH,
-        "file_exists": os.path.exists(JSON_PATH)
+        "file_exists": os.path.exists(JSON_PATH),
+        "index": train_index.get_stats()
     })
+
+@app.route("/debug/serp-cache")
+def debug_serp_cache():
+    return jsonify({**serp_cache.get_stats(), "geocoder": hotel_geocoder.get_stats(), "hotel_store": hotel_store.get_stats()})
+
+@app.route("/debug/tts")
+def debug_tts():
+    return jsonify({**tts_jobs.get_stats(), "stream_tickets": tts_stream_tickets.get_stats()})
+
+@app.route("/debug/gemini")
+def debug_gemini():
+    return jsonify(gemini_service.get_stats())
+
+@app.route("/debug/gemini-cache")
+def debug_gemini_cache():
+    return jsonify(gemini_cache.get_stats())
+
+@app.route("/debug/intents")
+def debug_intents():
+    return jsonify(intent_classifier.get_stats())
+
+@app.route("/debug/trip-parser")
+def debug_trip_parser():
+    return jsonify(fast_trip_parser.get_stats())
+
+@app.route("/debug/conversations")
+def debug_conversations():
+    return jsonify(conversation_store.get_stats())
+
+@app.route("/debug/translate")
+def debug_translate():
+    return jsonify(translation_service.get_stats())
+
+@app.route("/debug/stt")
+def debug_stt():
+    return jsonify({**stt_service.get_stats(), "queue": transcription_queue.get_stats(), "vad": vad.get_stats()})
 #------------------------
 
 #------------------------Hotel Routes & Search ------------
@@ -536,6 +587,30 @@ import re
 # def hotels():
 #     return render_template("hotels.html")
 
+def _google_hotels_params(destination, check_in, check_out, adults):
+    """Build the google_hotels SerpAPI params shared by the hotel endpoints."""
+    return {
+        "engine": "google_hotels",
+        "q": destination,
+        "check_in_date": check_in,
+        "check_out_date": check_out,
+        "adults": adults,
+        "currency": "INR",
+        "gl": "us",
+        "hl": "en",
+        "api_key": SERPAPI_KEY
+    }
+
+def _store_hotel_search(params):
+    """Run a google_hotels search and keep the full result set server-side.
+    Returns (search_id, results); search_id is None when SerpApi returned an error.
+    """
+    results = cached_search(params)
+    if "error" in results:
+        return None, results
+    search_id = hotel_store.put(params, results.get("properties", []))
+    return search_id, results
+
 @app.route("/hotels.html", methods=["GET", "POST"])
 def hotels_search():
     hotels = None
@@ -556,64 +631,31 @@ def hotels_search():
         adults_match = re.search(r"(\d+)", guests)
         adults = int(adults_match.group(1)) if adults_match else 2
         
-        params = {
-            "engine": "google_hotels",
-            "q": destination,
-            "check_in_date": check_in,
-            "check_out_date": check_out,
-            "adults": adults,
-            "currency": "INR",
-            "gl": "us",
-            "hl": "en",
-            "api_key": SERPAPI_KEY
-        }
+        params = _google_hotels_params(destination, check_in, check_out, adults)
         try:
             print(f"[DEBUG] Hotel search params: {params}")
-            search = GoogleSearch(params)
-            results = search.get_dict()
+            search_id, results = _store_hotel_search(params)
             print(f"[DEBUG] API response keys: {list(results.keys())}")
-            all_hotels = results.get("properties", [])
-            
-            # Calculate pagination
-            total_hotels = len(all_hotels)
-            total_pages = (total_hotels + per_page - 1) // per_page
-            start_idx = (page - 1) * per_page
-            end_idx = start_idx + per_page
-            hotels = all_hotels[start_idx:end_idx]
+            result_page = hotel_store.get_page(search_id, page, per_page)
+            hotels = result_page["hotels"] if result_page else []
+            total_hotels = result_page["total_hotels"] if result_page else 0
+            total_pages = result_page["total_pages"] if result_page else 0
             
-            # Get coordinates for hotels using Google Maps API
-            for hotel in hotels:
-                if not hotel.get('gps_coordinates'):
-                    try:
-                        # Search for hotel location
-                        map_params = {
-                            "engine": "google_maps",
-                            "q": f"{hotel.get('name', '')} {destination}",
-                            "type": "search",
-                            "api_key": SERPAPI_KEY
-                        }
-                        map_search = GoogleSearch(map_params)
-                        map_results = map_search.get_dict()
-                        local_results = map_results.get("local_results", [])
-                        
-                        if local_results:
-                            coords = local_results[0].get("gps_coordinates")
-                            if coords:
-                                hotel['gps_coordinates'] = coords
-                    except Exception as e:
-                        print(f"[WARNING] Could not get coordinates for {hotel.get('name', '')}: {e}")
-                        # Set default coordinates
-                        hotel['gps_coordinates'] = {
-                            "latitude": 48.8566 + (len(hotels) * 0.01),
-                            "longitude": 2.3522 + (len(hotels) * 0.01)
-                        }
+            # Get coordinates for hotels on this page (deduped, stored, looked up concurrently)
+            hotel_geocoder.geocode_hotels(hotels, destination, api_key=SERPAPI_KEY, default_coords={
+                "latitude": 48.8566 + (len(hotels) * 0.01),
+                "longitude": 2.3522 + (len(hotels) * 0.01)
+            })
             
-            # Store search parameters in session for pagination
+            # Store search parameters in session for pagination; the results
+            # themselves stay server-side under search_id
             session['hotel_search'] = {
+                'search_id': search_id,
                 'destination': destination,
                 'check_in': check_in,
                 'check_out': check_out,
                 'guests': guests,
+                'adults': adults,
                 'total_hotels': total_hotels,
                 'total_pages': total_pages
             }
@@ -634,25 +676,22 @@ def hotels_search():
             total_hotels = search_data.get('total_hotels', 0)
             total_pages = search_data.get('total_pages', 0)
             
-            # Re-run the search to get all hotels for pagination
-            params = {
-                "engine": "google_hotels",
-                "q": destination,
-                "check_in_date": check_in,
-                "check_out_date": check_out,
-                "adults": 2,  # Default value
-                "currency": "INR",
-                "gl": "us",
-                "hl": "en",
-                "api_key": SERPAPI_KEY
-            }
             try:
-                search = GoogleSearch(params)
-                results = search.get_dict()
-                all_hotels = results.get("properties", [])
-                start_idx = (page - 1) * per_page
-                end_idx = start_idx + per_page
-                hotels = all_hotels[start_idx:end_idx]
+                # Serve the page from the stored result set
+                result_page = hotel_store.get_page(search_data.get('search_id'), page, per_page)
+                if result_page is None:
+                    # Stored results expired: search again with the user's real party size
+                    params = _google_hotels_params(destination, check_in, check_out, search_data.get('adults', 2))
+                    search_id, _ = _store_hotel_search(params)
+                    result_page = hotel_store.get_page(search_id, page, per_page)
+                    session['hotel_search'] = {**search_data, 'search_id': search_id}
+                if result_page:
+                    hotels = result_page["hotels"]
+                    total_hotels = result_page["total_hotels"]
+                    total_pages = result_page["total_pages"]
+                else:
+                    hotels = []
+                hotel_geocoder.geocode_hotels(hotels, destination, api_key=SERPAPI_KEY)
             except Exception as e:
                 print(f"[ERROR] Hotel pagination failed: {e}")
                 hotels = []
@@ -699,8 +738,7 @@ def get_hotels():
     }
 
     try:
-        search = GoogleSearch(params)
-        results = search.get_dict()
+        results = cached_search(params)
 
         local_results = results.get("local_results", [])
         
@@ -730,31 +768,44 @@ def hotel_search():
     """API endpoint for AJAX hotel search"""
     try:
         data = request.json
-        destination = data.get("destination", "Paris, France")
-        check_in = data.get("check_in", "")
-        check_out = data.get("check_out", "")
-        adults = data.get("adults", 2)
-        
-        params = {
-            "engine": "google_hotels",
-            "q": destination,
-            "check_in_date": check_in,
-            "check_out_date": check_out,
-            "adults": adults,
-            "currency": "INR",
-            "gl": "us",
-            "hl": "en",
-            "api_key": SERPAPI_KEY
-        }
-        
-        search = GoogleSearch(params)
-        results = search.get_dict()
-        
-        return jsonify({
+        page = data.get("page")
+        per_page = data.get("per_page", 6)
+
+        # Follow-up requests for an earlier search are served from the stored result set
+        record = hotel_store.get(data.get("search_id"))
+        if record is None:
+            destination = data.get("destination", "Paris, France")
+            check_in = data.get("check_in", "")
+            check_out = data.get("check_out", "")
+            adults = data.get("adults", 2)
+
+            params = _google_hotels_params(destination, check_in, check_out, adults)
+            search_id, results = _store_hotel_search(params)
+            if not search_id:
+                print(f"[ERROR] SerpApi hotel search error: {results['error']}")
+                return jsonify({"success": True, "hotels": [], "total_hotels": 0})
+            record = hotel_store.get(search_id)
+            if record is None:
+                # Evicted before we could read it back; serve the fresh results directly
+                record = {"search_id": search_id, "properties": results.get("properties", [])}
+
+        properties = record["properties"]
+        response = {
             "success": True,
-            "hotels": results.get("properties", []),
-            "total_hotels": len(results.get("properties", []))
-        })
+            "search_id": record["search_id"],
+            "hotels": properties,
+            "total_hotels": len(properties)
+        }
+        if page:
+            # Slice the record in hand; it may expire from the store meanwhile
+            page, per_page = max(1, int(page)), int(per_page)
+            start_idx = (page - 1) * per_page
+            response.update({
+                "hotels": properties[start_idx:start_idx + per_page],
+                "page": page,
+                "total_pages": (len(properties) + per_page - 1) // per_page
+            })
+        return jsonify(response)
         
     except Exception as e:
         print(f"[ERROR] Hotel search failed: {e}")
@@ -763,6 +814,10 @@ def hotel_search():
             "error": str(e)
         }), 500
     
+# Fields only the SerpApi property-details response carries (read by templates/booking/hotel.html)
+HOTEL_DETAIL_FIELDS = ("other_reviews", "nearby_places")
+
+
 # API endpoint to fetch hotel details from SerpApi by property_token
 @app.route('/api/hotel-details', methods=['GET'])
 def api_hotel_details():
@@ -778,6 +833,13 @@ def api_hotel_details():
     if not property_token:
         print("[ERROR] Missing property_token")
         return jsonify({'error': 'Missing property_token'}), 400
+
+    # Serve the property straight from the stored search once its details were merged in
+    search_id = request.args.get('search_id') or session.get('hotel_search', {}).get('search_id')
+    stored_property = hotel_store.find_property(search_id, property_token)
+    if stored_property and all(field in stored_property for field in HOTEL_DETAIL_FIELDS):
+        return jsonify(stored_property)
+
     try:
         params = {
             "engine": "google_hotels",
@@ -792,8 +854,7 @@ def api_hotel_details():
             "api_key": SERPAPI_KEY
         }
         print(f"[DEBUG] SerpApi params: {params}")
-        search = GoogleSearch(params)
-        results = search.get_dict()
+        results = cached_search(params)
         print(f"[DEBUG] SerpApi response: {json.dumps(results)[:500]}")
         if 'error' in results:
             print(f"[ERROR] SerpApi error: {results['error']}")
@@ -801,6 +862,11 @@ def api_hotel_details():
         if not results:
             print("[ERROR] Empty response from SerpApi")
             return jsonify({'error': 'No hotel details found'}), 404
+        if stored_property:
+            # Enrich the stored property so later detail views skip SerpApi
+            stored_property.update(results)
+            for field in HOTEL_DETAIL_FIELDS:
+                stored_property.setdefault(field, [])
         return jsonify(results)
     except Exception as e:
         print(f"[ERROR] Failed to fetch hotel details: {e}")
@@ -822,8 +888,7 @@ def map_search():
             "api_key": SERPAPI_KEY
         }
         
-        search = GoogleSearch(params)
-        results = search.get_dict()
+        results = cached_search(params)
         
         # Extract local results
         local_results = results.get("local_results", [])
@@ -951,7 +1016,7 @@ def enhanced_chat():
         user_message = data.get("message", "")
         user_id = session.get('user_id')
         language = data.get("language", "en")
-        conversation_id = data.get("conversation_id", "default")
+        conversation_id = _scoped_conversation_id(data.get("conversation_id"))
         
         if not user_message:
             return jsonify({"error": "No message provided."}), 400
@@ -970,6 +1035,18 @@ def enhanced_chat():
         print(f"Enhanced chat error: {str(e)}")
         return jsonify({"error": "Internal server error", "details": str(e)}), 500
 
+# Longest a request waits for its queued transcription
+STT_TIMEOUT = float(os.getenv("STT_TIMEOUT", "120"))
+
+
+def _transcription_busy(error):
+    """429 response telling the client to retry once the transcription backlog drains."""
+    response = jsonify({"error": "Speech recognition is busy, please try again shortly", "details": str(error)})
+    response.status_code = 429
+    response.headers['Retry-After'] = '2'
+    return response
+
+
 # Speech-to-Text endpoint
 @app.route('/api/speech-to-text', methods=['POST'])
 def speech_to_text():
@@ -984,9 +1061,10 @@ def speech_to_text():
         if not audio_file.filename:
             return jsonify({"error": "No audio file selected"}), 400
         
-        # Transcribe audio
-        transcribed_text, metadata = stt_service.transcribe_audio_file(
-            audio_file, language
+        # Transcribe audio (queued; concurrent uploads share the Whisper workers)
+        suffix = os.path.splitext(audio_file.filename)[1] or '.webm'
+        transcribed_text, metadata = transcription_queue.transcribe(
+            audio_file.read(), language, suffix, timeout=STT_TIMEOUT
         )
         
         return jsonify({
@@ -995,6 +1073,10 @@ def speech_to_text():
             "success": True
         })
         
+    except TranscriptionQueueFull as e:
+        return _transcription_busy(e)
+    except NoSpeechDetected as e:
+        return jsonify({"error": str(e)}), 422
     except Exception as e:
         print(f"Speech-to-text error: {str(e)}")
         return jsonify({"error": "Speech-to-text failed", "details": str(e)}), 500
@@ -1059,15 +1141,39 @@ def text_to_speech():
         traceback.print_exc()
         return jsonify({"error": "Text-to-speech failed", "details": str(e)}), 500
 
+# Most strings accepted by one batch translation request
+TRANSLATE_BATCH_MAX = int(os.getenv("TRANSLATE_BATCH_MAX", "200"))
+
+
 # Translation endpoint
 @app.route('/api/translate', methods=['POST'])
 def translate_text():
-    """Translate text between languages."""
+    """Translate text between languages.
+
+    Send "texts" (a list of strings) instead of "text" to translate many
+    strings in one call; the response then carries "translations" in the
+    same order.
+    """
     try:
         data = request.get_json()
         text = data.get("text", "")
         target_language = data.get("target_language", "en")
         source_language = data.get("source_language")  # Optional
+
+        texts = data.get("texts")
+        if texts is not None:
+            if not isinstance(texts, list) or not all(isinstance(t, str) for t in texts):
+                return jsonify({"error": "texts must be a list of strings"}), 400
+            if len(texts) > TRANSLATE_BATCH_MAX:
+                return jsonify({"error": f"Too many texts (max {TRANSLATE_BATCH_MAX})"}), 400
+            # Without a source language the translator detects it per string
+            translations = translation_service.translate_batch(texts, source_language or "auto", target_language)
+            return jsonify({
+                "translations": translations,
+                "source_language": source_language or "auto",
+                "target_language": target_language,
+                "success": True
+            })
         
         if not text:
             return jsonify({"error": "No text provided"}), 400
@@ -1140,9 +1246,40 @@ def get_languages():
 
 
 # ===== New separate endpoints: /api/chat-text and /api/chat-voice =====
+def _queue_reply_audio(ai_response_text):
+    """Start background TTS for an assistant reply. Returns the audio URL, or None if TTS is unavailable."""
+    if not ai_response_text:
+        return None
+    voice_id = getattr(tts_service, 'voice_id', '')
+    model_id = getattr(tts_service, 'model_id', '')
+    if not getattr(tts_service, 'client', None):
+        # No ElevenLabs client, but clips synthesized earlier can still be served
+        job_id = tts_job_id(ai_response_text, voice_id, model_id)
+        return url_for('tts_audio', job_id=job_id) if tts_audio_cache.contains(job_id) else None
+    try:
+        job_id = tts_jobs.submit(ai_response_text, voice_id=voice_id, model_id=model_id)
+        return url_for('tts_audio', job_id=job_id)
+    except Exception as e:
+        # TTS is best-effort — log and continue
+        print(f"TTS job error (pipeline): {e}")
+        return None
+
+
+def _scoped_conversation_id(client_id):
+    """Namespace a client-supplied conversation id with the browser session.
+
+    Clients pick ids freely (most send "default"), so without this unrelated
+    users would share one history.
+    """
+    session_key = session.get('chat_session')
+    if not session_key:
+        session_key = session['chat_session'] = secrets.token_hex(16)
+    return f"{session_key}:{str(client_id or 'default')[:64]}"
+
+
 def _chat_pipeline(user_text, conversation_id='default'):
-    """Core pipeline: generate AI response and (optionally) TTS audio bytes.
-    Returns a dict: { reply_text, audio (data-uri or None), response_data }
+    """Core pipeline: generate AI response and queue its TTS audio.
+    Returns a dict: { reply_text, audio (URL or None), response_data }
     """
     # Generate AI response (chatbot returns a dict or a string)
     response_data = chatbot.generate_response(user_text, conversation_id)
@@ -1151,39 +1288,9 @@ def _chat_pipeline(user_text, conversation_id='default'):
     if not ai_response_text:
         raise ValueError('AI response empty')
 
-    audio_base64 = None
-    try:
-        # Prefer explicit text_to_speech api
-        if hasattr(tts_service, 'text_to_speech'):
-            res = tts_service.text_to_speech(ai_response_text)
-            if res:
-                # Backwards-compatible: res may be bytes or (bytes, metadata)
-                if isinstance(res, tuple) and len(res) >= 1:
-                    audio_bytes, metadata = res[0], res[1] if len(res) > 1 else {}
-                else:
-                    audio_bytes, metadata = res, {}
-                # Determine mime
-                mime = metadata.get('mime') if isinstance(metadata, dict) and metadata.get('mime') else 'audio/mpeg'
-                import base64
-                audio_base64_raw = base64.b64encode(audio_bytes).decode('utf-8')
-                # Send as data URI to frontend for simplicity
-                audio_base64 = f"data:{mime};base64,{audio_base64_raw}"
-        elif hasattr(tts_service, 'generate_speech'):
-            res = tts_service.generate_speech(ai_response_text)
-            if isinstance(res, tuple) and res[0]:
-                import base64
-                audio_base64_raw = base64.b64encode(res[0]).decode('utf-8')
-                mime = res[1].get('mime') if isinstance(res[1], dict) and res[1].get('mime') else 'audio/mpeg'
-                audio_base64 = f"data:{mime};base64,{audio_base64_raw}"
-            elif isinstance(res, (bytes, bytearray)):
-                import base64
-                audio_base64_raw = base64.b64encode(res).decode('utf-8')
-                audio_base64 = f"data:audio/mpeg;base64,{audio_base64_raw}"
-    except Exception as e:
-        # TTS is best-effort — log and continue
-        print(f"TTS conversion error (pipeline): {e}")
+    audio_url = _queue_reply_audio(ai_response_text)
 
-    return { 'reply_text': ai_response_text, 'audio': audio_base64, 'response_data': response_data }
+    return { 'reply_text': ai_response_text, 'audio': audio_url, 'response_data': response_data }
 
 
 @app.route('/api/chat-text', methods=['POST'])
@@ -1196,7 +1303,7 @@ def chat_text():
         if not user_message or not str(user_message).strip():
             return jsonify({"error": "No message provided"}), 400
 
-        conversation_id = data.get('conversation_id', 'default')
+        conversation_id = _scoped_conversation_id(data.get('conversation_id'))
 
         result = _chat_pipeline(user_message, conversation_id)
 
@@ -1226,6 +1333,207 @@ def chat_text():
         return jsonify({"error": "Chat (text) failed", "details": str(e)}), 500
 
 
+# Workers running chatbot.generate_response for streaming requests
+_chat_stream_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("CHAT_STREAM_WORKERS", "16")),
+    thread_name_prefix="chat-stream"
+)
+# How long the view waits for the first token before it starts the stream anyway
+CHAT_STREAM_FIRST_EVENT_TIMEOUT = float(os.getenv("CHAT_STREAM_FIRST_EVENT_TIMEOUT", "120"))
+CHAT_STREAM_KEEPALIVE = 15
+
+
+def _sse(event, data):
+    """Format one Server-Sent Event frame."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@app.route('/api/chat-text-stream', methods=['POST'])
+def chat_text_stream():
+    """Streaming variant of /api/chat-text over Server-Sent Events.
+
+    Events, in order:
+      token  {"text": ...}        reply chunks as Gemini generates them (free-form chat only)
+      reply  {reply, response_data, trip_plan?}   the complete chat-text payload, without audio
+      audio  {"audio": url|null}                  URL of the reply's TTS audio, sent after the text
+      done   {}
+    or a single error {"error": ...} event.
+    """
+    data = request.get_json(silent=True)
+    if not data:
+        return jsonify({"error": "No message provided"}), 400
+    user_message = data.get('message', '')
+    if not user_message or not str(user_message).strip():
+        return jsonify({"error": "No message provided"}), 400
+    conversation_id = _scoped_conversation_id(data.get('conversation_id'))
+
+    events = queue.Queue()
+
+    @copy_current_request_context
+    def run_chat():
+        try:
+            response_data = chatbot.generate_response(
+                user_message, conversation_id,
+                on_token=lambda text: events.put(("token", text))
+            )
+            events.put(("reply", response_data))
+        except Exception as e:
+            print(f"chat-text-stream error: {e}")
+            events.put(("error", str(e)))
+
+    _chat_stream_executor.submit(run_chat)
+
+    # Hold the response until the first event. Free-form chat streams tokens
+    # right away; structured replies (trip plans, hotels) finish first, so any
+    # trip_context they store in the cookie session is still sent with the headers.
+    try:
+        first_event = events.get(timeout=CHAT_STREAM_FIRST_EVENT_TIMEOUT)
+    except queue.Empty:
+        first_event = None
+
+    def generate():
+        event = first_event
+        while True:
+            if event is None:
+                try:
+                    event = events.get(timeout=CHAT_STREAM_KEEPALIVE)
+                except queue.Empty:
+                    # Comment frame keeps proxies from closing an idle stream
+                    yield ": keepalive\n\n"
+                    continue
+            kind, value = event
+            event = None
+
+            if kind == "token":
+                yield _sse("token", {"text": value})
+            elif kind == "error":
+                yield _sse("error", {"error": "Chat (text) failed", "details": value})
+                return
+            elif kind == "reply":
+                response_data = value if isinstance(value, dict) else {"reply": str(value)}
+                reply_text = response_data.get('reply') or ''
+                payload = {
+                    'reply': reply_text,
+                    'reply_text': reply_text,
+                    'response_data': response_data,
+                    'success': True
+                }
+                if response_data.get('trip_plan'):
+                    payload['trip_plan'] = response_data['trip_plan']
+                yield _sse("reply", payload)
+                # Speech is synthesized in the background and fetched from this URL
+                yield _sse("audio", {"audio": _queue_reply_audio(reply_text)})
+                yield _sse("done", {})
+                return
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+
+# Longest a request for not-yet-synthesized audio blocks before getting 202
+TTS_AUDIO_WAIT = float(os.getenv("TTS_AUDIO_WAIT", "30"))
+
+
+@app.route('/api/tts-audio/<job_id>')
+def tts_audio(job_id):
+    """Serve the audio of a background TTS job, with HTTP range support.
+
+    Waits up to TTS_AUDIO_WAIT seconds for a pending job so the URL can be
+    handed to an <audio> element right away.
+    """
+    if not re.fullmatch(r"[0-9a-f]{32}", job_id or ""):
+        return jsonify({"error": "Invalid audio id"}), 400
+    job = tts_jobs.get(job_id, wait=TTS_AUDIO_WAIT)
+    if job is None:
+        return jsonify({"error": "Audio not found or expired"}), 404
+    if job["status"] == "pending":
+        response = jsonify({"status": "pending"})
+        response.status_code = 202
+        response.headers['Retry-After'] = '2'
+        return response
+    if job["status"] == "failed":
+        return jsonify({"error": "Speech synthesis failed", "details": job.get("error")}), 502
+
+    # Content-addressed, so the bytes behind an id never change
+    response = send_file(
+        io.BytesIO(job["audio"]),
+        mimetype=job["mime"],
+        conditional=True,
+        etag=job_id,
+        max_age=86400
+    )
+    return response
+
+
+# Upper bound on text per streamed utterance
+TTS_STREAM_MAX_CHARS = int(os.getenv("TTS_STREAM_MAX_CHARS", "5000"))
+
+
+@app.route('/api/tts-stream', methods=['POST'])
+def tts_stream():
+    """Register text for streamed speech and return a short-lived audio URL.
+
+    The text travels in the JSON body; the returned URL only carries a
+    random ticket, so it fits any request line and the text never shows up
+    in URLs or access logs. The POST itself is open like
+    /api/text-to-speech, bounded only by TTS_STREAM_MAX_CHARS.
+    """
+    text = str((request.get_json(silent=True) or {}).get("text", "") or "").strip()
+    if not text:
+        return jsonify({"error": "No text provided"}), 400
+    if len(text) > TTS_STREAM_MAX_CHARS:
+        return jsonify({"error": f"Text too long (max {TTS_STREAM_MAX_CHARS} characters)"}), 413
+    ticket = tts_stream_tickets.issue(text)
+    return jsonify({"audio_url": url_for('tts_stream_audio', ticket=ticket), "success": True})
+
+
+@app.route('/api/tts-stream/<ticket>')
+def tts_stream_audio(ticket):
+    """Relay ElevenLabs audio to the client chunk by chunk as it is synthesized.
+
+    The ticket comes from POST /api/tts-stream, so the URL can be an <audio>
+    src. The response is chunked audio/mpeg, so playback starts after the
+    first chunk instead of after the whole utterance.
+    """
+    if not re.fullmatch(r"[0-9a-f]{32}", ticket or ""):
+        return jsonify({"error": "Invalid audio id"}), 400
+    text = tts_stream_tickets.text_for(ticket)
+    if text is None:
+        return jsonify({"error": "Audio not found or expired"}), 404
+
+    try:
+        res = tts_service.stream_speech(text)
+        if not res:
+            return jsonify({"error": "Text-to-speech is not available"}), 503
+        chunks, metadata = res
+        chunks = iter(chunks)
+        # Pull the first chunk here so upstream failures still get a proper status
+        first = next(chunks, b"")
+    except Exception as e:
+        print(f"TTS stream error: {e}")
+        return jsonify({"error": "Speech synthesis failed", "details": str(e)}), 502
+    if not first:
+        return jsonify({"error": "Speech synthesis returned no audio"}), 502
+
+    def generate():
+        yield first
+        try:
+            for chunk in chunks:
+                yield chunk
+        except Exception as e:
+            # Headers are gone; the client just hears a shorter clip
+            print(f"TTS stream error (mid-stream): {e}")
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype=metadata.get("mime", "audio/mpeg"),
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no', 'X-TTS-Source': metadata.get("source", "")}
+    )
+
+
 @app.route('/api/chat-voice', methods=['POST'])
 def chat_voice():
     try:
@@ -1242,9 +1550,15 @@ def chat_voice():
         try:
             transcribed = None
             if hasattr(gemini_service, 'speech_to_text'):
-                transcribed = gemini_service.speech_to_text(audio_bytes, mime_type)
+                # Silence is trimmed first: Gemini bills audio by duration
+                upload_bytes, upload_mime = vad.prepare_upload(audio_bytes, mime_type)
+                transcribed = gemini_service.speech_to_text(upload_bytes, upload_mime)
             else:
-                transcribed, _ = stt_service.transcribe_audio_file(audio_file, None)
+                transcribed, _ = transcription_queue.transcribe(audio_bytes, None, timeout=STT_TIMEOUT)
+        except TranscriptionQueueFull as e:
+            return _transcription_busy(e)
+        except NoSpeechDetected as e:
+            return jsonify({"error": str(e)}), 422
         except Exception as e:
             print(f"STT error: {e}")
             transcribed = None
@@ -1252,7 +1566,7 @@ def chat_voice():
         if not transcribed:
             return jsonify({"error": "Could not transcribe audio"}), 500
 
-        conversation_id = request.form.get('conversation_id', 'default')
+        conversation_id = _scoped_conversation_id(request.form.get('conversation_id'))
         result = _chat_pipeline(transcribed, conversation_id)
 
         # Normalize response and lift trip_plan to top-level
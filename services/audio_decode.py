@@ -0,0 +1,174 @@
+import io
+import wave
+import shutil
+import logging
+import subprocess
+from typing import Optional
+
+import numpy as np
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Whisper's expected input: 16 kHz mono float32 in [-1, 1]
+SAMPLE_RATE = 16000
+
+FFMPEG_TIMEOUT = 60
+
+# Containers ffmpeg can't demux from a pipe because their index may sit at the end
+_NEEDS_SEEK = {"mp4"}
+
+try:
+    import soundfile
+except ImportError:
+    soundfile = None
+
+
+def sniff_format(data: bytes) -> Optional[str]:
+    """
+    Guess the container of an audio upload from its magic bytes.
+
+    Args:
+        data: Raw upload bytes
+
+    Returns:
+        "wav", "flac", "ogg", "webm", "mp3", "mp4" or None
+    """
+    head = data[:16]
+    if head[:4] == b"RIFF" and head[8:12] == b"WAVE":
+        return "wav"
+    if head[:4] == b"fLaC":
+        return "flac"
+    if head[:4] == b"OggS":
+        return "ogg"
+    if head[:4] == b"\x1a\x45\xdf\xa3":
+        return "webm"
+    if head[:3] == b"ID3" or (len(head) > 1 and head[0] == 0xFF and head[1] & 0xE0 == 0xE0):
+        return "mp3"
+    if head[4:8] == b"ftyp":
+        return "mp4"
+    return None
+
+
+def to_mono_16k(samples: np.ndarray, sample_rate: int) -> np.ndarray:
+    """
+    Downmix to mono and resample to SAMPLE_RATE.
+
+    Linear interpolation is plenty for speech recognition input and needs
+    nothing beyond NumPy.
+
+    Args:
+        samples: Float array shaped (frames,) or (frames, channels)
+        sample_rate: Rate of samples in Hz
+
+    Returns:
+        1-D float32 array at SAMPLE_RATE
+    """
+    if samples.ndim > 1:
+        samples = samples.mean(axis=1)
+    samples = samples.astype(np.float32, copy=False)
+    if sample_rate == SAMPLE_RATE or len(samples) == 0:
+        return samples
+    n_out = int(round(len(samples) * SAMPLE_RATE / sample_rate))
+    positions = np.arange(n_out, dtype=np.float64) * (sample_rate / SAMPLE_RATE)
+    return np.interp(positions, np.arange(len(samples)), samples).astype(np.float32)
+
+
+def decode_wav(data: bytes) -> np.ndarray:
+    """Decode integer PCM WAV with the standard library."""
+    with wave.open(io.BytesIO(data), "rb") as wav:
+        channels = wav.getnchannels()
+        width = wav.getsampwidth()
+        rate = wav.getframerate()
+        frames = wav.readframes(wav.getnframes())
+
+    if width == 1:
+        samples = (np.frombuffer(frames, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+    elif width == 2:
+        samples = np.frombuffer(frames, dtype="<i2").astype(np.float32) / 32768.0
+    elif width == 3:
+        raw = np.frombuffer(frames, dtype=np.uint8).reshape(-1, 3)
+        ints = (raw[:, 0].astype(np.int32) | (raw[:, 1].astype(np.int32) << 8) | (raw[:, 2].astype(np.int32) << 16))
+        ints = np.where(ints >= 1 << 23, ints - (1 << 24), ints)
+        samples = ints.astype(np.float32) / float(1 << 23)
+    elif width == 4:
+        samples = np.frombuffer(frames, dtype="<i4").astype(np.float32) / float(1 << 31)
+    else:
+        raise ValueError(f"Unsupported WAV sample width: {width}")
+    return to_mono_16k(samples.reshape(-1, channels), rate)
+
+
+def encode_wav(samples: np.ndarray, sample_rate: int = SAMPLE_RATE) -> bytes:
+    """
+    Encode float samples as 16-bit mono PCM WAV.
+
+    Args:
+        samples: 1-D float array in [-1, 1]
+        sample_rate: Rate of samples in Hz
+
+    Returns:
+        WAV file bytes
+    """
+    pcm = (np.clip(samples, -1.0, 1.0) * 32767).astype("<i2")
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(pcm.tobytes())
+    return buffer.getvalue()
+
+
+def _decode_soundfile(data: bytes) -> np.ndarray:
+    samples, rate = soundfile.read(io.BytesIO(data), dtype="float32", always_2d=True)
+    return to_mono_16k(samples, rate)
+
+
+def _decode_ffmpeg_pipe(data: bytes) -> np.ndarray:
+    """Decode through ffmpeg using stdin/stdout pipes instead of files."""
+    cmd = ["ffmpeg", "-loglevel", "error", "-i", "pipe:0",
+           "-f", "s16le", "-ac", "1", "-acodec", "pcm_s16le", "-ar", str(SAMPLE_RATE), "-"]
+    out = subprocess.run(cmd, input=data, capture_output=True, check=True, timeout=FFMPEG_TIMEOUT).stdout
+    return np.frombuffer(out, dtype=np.int16).astype(np.float32) / 32768.0
+
+
+def decode_audio(data: bytes) -> Optional[np.ndarray]:
+    """
+    Decode an audio upload to 16 kHz mono float32 without touching disk.
+
+    WAV is decoded in-process; FLAC/OGG too when soundfile is installed.
+    Compressed formats (webm/opus, mp3, ...) are piped through ffmpeg.
+
+    Args:
+        data: Raw upload bytes
+
+    Returns:
+        Samples ready for Whisper, or None if the format has to be read
+        from a file (e.g. MP4/M4A, or no decoder could handle it)
+    """
+    if not data:
+        return None
+    fmt = sniff_format(data)
+
+    if fmt == "wav":
+        try:
+            return decode_wav(data)
+        except (wave.Error, ValueError, EOFError) as e:
+            # e.g. IEEE float WAV; try the general decoders below
+            logger.info(f"Standard-library WAV decode failed ({e}); trying other decoders")
+
+    if soundfile is not None and fmt in ("wav", "flac", "ogg"):
+        try:
+            return _decode_soundfile(data)
+        except Exception as e:
+            logger.info(f"soundfile could not decode {fmt} upload: {e}")
+
+    if fmt in _NEEDS_SEEK or shutil.which("ffmpeg") is None:
+        return None
+    try:
+        return _decode_ffmpeg_pipe(data)
+    except (subprocess.CalledProcessError, subprocess.TimeoutExpired) as e:
+        stderr = getattr(e, "stderr", b"") or b""
+        logger.info(f"ffmpeg pipe decode failed for {fmt or 'unknown'} upload: {stderr.decode(errors='ignore').strip()[:200]}")
+        return None
@@ -0,0 +1,342 @@
+import re
+import json
+import logging
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+MAX_LIMIT = 50
+
+# Match tiers, best first
+TIER_EXACT_CODE = 0
+TIER_FIELD_PREFIX = 1
+TIER_WORD_PREFIX = 2
+TIER_SUBSTRING = 3
+TIER_FUZZY = 4
+
+_NON_ALNUM = re.compile(r"[^0-9a-z]+")
+
+
+def normalize(text: Any) -> str:
+    """Lower-case, strip accents and collapse punctuation/whitespace to single spaces."""
+    text = unicodedata.normalize("NFKD", str(text or ""))
+    text = "".join(c for c in text if not unicodedata.combining(c)).lower()
+    return _NON_ALNUM.sub(" ", text).strip()
+
+
+def _trigrams(text: str) -> set:
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class _TrieNode:
+    __slots__ = ("children", "ranked", "_best")
+
+    def __init__(self):
+        self.children = {}
+        self.ranked = []   # entry ids, best first, filled by _finalize
+        self._best = {}    # entry id -> best tier while building
+
+    def _finalize(self, sort_key):
+        self.ranked = sorted(self._best, key=lambda i: (self._best[i], sort_key(i)))[:MAX_LIMIT]
+        self.ranked = [(self._best[i], i) for i in self.ranked]
+        self._best = None
+        for child in self.children.values():
+            child._finalize(sort_key)
+
+
+class AutocompleteIndex:
+    def __init__(self, entries: Sequence[dict], search_fields: Sequence[str] = ("code", "name", "city"),
+                 output_fields: Optional[Sequence[str]] = None,
+                 popularity: Optional[Callable[[dict], float]] = None, cache_size: int = 2048):
+        """
+        Initialize a precomputed autocomplete index.
+
+        Every prefix of a field (and of each word inside it) is stored in a
+        trie whose nodes hold their best matches already ranked, so the common
+        keystroke is a walk of len(query) nodes. Infix queries fall back to a
+        trigram index and misspelled ones (one edit) to a constrained walk
+        of the same trie.
+
+        Ranking: exact code, field prefix, word prefix, substring, typo;
+        within a tier higher popularity wins, then file order.
+
+        Args:
+            entries: Records such as stations or airports
+            search_fields: Fields matched against the query; the first is treated as the code
+            output_fields: Fields returned per match (all fields if None)
+            popularity: Callable returning a weight per entry (default 0)
+            cache_size: Number of recent query results memoized
+        """
+        self.search_fields = tuple(search_fields)
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._queries = 0
+        self._cache_hits = 0
+
+        self._outputs = []
+        self._popularity = []
+        self._texts = []      # entry id -> [normalized field values]
+        self._by_code = {}    # normalized code -> entry id
+        self._root = _TrieNode()
+        self._grams = {}      # trigram -> set(entry ids)
+
+        for idx, entry in enumerate(entries):
+            if output_fields:
+                self._outputs.append({f: entry.get(f) for f in output_fields})
+            else:
+                self._outputs.append(dict(entry))
+            self._popularity.append(float(popularity(entry)) if popularity else 0.0)
+
+            texts = [normalize(entry.get(f, "")) for f in self.search_fields]
+            self._texts.append(texts)
+            if texts[0]:
+                self._by_code.setdefault(texts[0], idx)
+
+            for text in texts:
+                if not text:
+                    continue
+                self._insert(text, idx, TIER_FIELD_PREFIX)
+                words = text.split(" ")
+                for pos in range(1, len(words)):
+                    self._insert(" ".join(words[pos:]), idx, TIER_WORD_PREFIX)
+                for gram in _trigrams(text):
+                    self._grams.setdefault(gram, set()).add(idx)
+
+        rank_key = lambda i: (-self._popularity[i], i)
+        self._root._finalize(rank_key)
+        # Same postings in rank order, so infix lookups can stop after `limit` hits
+        self._ranked_grams = {gram: sorted(ids, key=rank_key) for gram, ids in self._grams.items()}
+
+    def _insert(self, text: str, idx: int, tier: int):
+        node = self._root
+        for char in text:
+            node = node.children.setdefault(char, _TrieNode())
+            if tier < node._best.get(idx, TIER_FUZZY + 1):
+                node._best[idx] = tier
+
+    def __len__(self) -> int:
+        return len(self._outputs)
+
+    def search(self, query: str, limit: int = 10) -> List[dict]:
+        """
+        Return the best matches for a partial query.
+
+        Args:
+            query: Text typed so far
+            limit: Maximum results (capped at 50)
+
+        Returns:
+            List of output dicts, best first
+        """
+        limit = max(1, min(int(limit), MAX_LIMIT))
+        q = normalize(query)
+        key = (q, limit)
+        with self._cache_lock:
+            self._queries += 1
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                self._cache_hits += 1
+                return list(cached)
+
+        results = [self._outputs[i] for i in self._rank(q, limit)]
+
+        if self.cache_size > 0:
+            with self._cache_lock:
+                self._cache[key] = results
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return list(results)
+
+    def _rank(self, q: str, limit: int) -> List[int]:
+        """Return ranked entry ids for a normalized query."""
+        popularity = self._popularity
+        if not q:
+            return sorted(range(len(self._outputs)), key=lambda i: (-popularity[i], i))[:limit]
+
+        found = {}
+        exact = self._by_code.get(q)
+        if exact is not None:
+            found[exact] = TIER_EXACT_CODE
+
+        node = self._root
+        for char in q:
+            node = node.children.get(char)
+            if node is None:
+                break
+        if node is not None:
+            for tier, idx in node.ranked:
+                found.setdefault(idx, tier)
+
+        if len(found) < limit and len(q) >= 3:
+            self._substring_matches(q, found, limit)
+        if len(found) < limit and len(q) >= 4:
+            self._typo_matches(q, found)
+
+        ranked = sorted(found, key=lambda i: (found[i], -popularity[i], i))
+        return ranked[:limit]
+
+    def _substring_matches(self, q: str, found: Dict[int, int], limit: int):
+        """Add the best-ranked infix matches to found via the trigram index."""
+        # Inner trigrams only: a substring need not start a word or end the field
+        grams = {g for g in _trigrams(q) if " " not in g}
+        if not grams or not all(g in self._grams for g in grams):
+            return
+        rarest = min(grams, key=lambda g: len(self._grams[g]))
+        others = [self._grams[g] for g in grams if g != rarest]
+        wanted = limit
+        for idx in self._ranked_grams[rarest]:
+            if idx in found or not all(idx in posting for posting in others):
+                continue
+            if any(q in text for text in self._texts[idx]):
+                found[idx] = TIER_SUBSTRING
+                wanted -= 1
+                if wanted == 0:
+                    break
+
+    def _walk(self, node: Optional[_TrieNode], text: str) -> Optional[_TrieNode]:
+        """Follow text down the trie from node."""
+        for char in text:
+            if node is None:
+                return None
+            node = node.children.get(char)
+        return node
+
+    def _typo_matches(self, q: str, found: Dict[int, int]):
+        """
+        Add entries whose field or word starts one edit away from q.
+
+        Instead of scoring every candidate, spell q through the trie with one
+        deletion, swap, substitution or insertion at each position, using
+        only branches that actually exist; every node reached that way
+        already holds its ranked completions.
+        """
+        reached = []
+        node = self._root
+        for i in range(len(q)):
+            if node is None:
+                break
+            rest = q[i + 1:]
+            reached.append(self._walk(node, rest))  # q[i] typed by mistake
+            if rest:
+                reached.append(self._walk(node, rest[0] + q[i] + rest[1:]))  # swapped pair
+            for char, child in node.children.items():
+                if char != q[i]:
+                    reached.append(self._walk(child, rest))   # wrong letter
+                    reached.append(self._walk(child, q[i:]))  # letter left out
+            node = node.children.get(q[i])
+        for hit in reached:
+            if hit is not None:
+                for _, idx in hit.ranked:
+                    found.setdefault(idx, TIER_FUZZY)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get index counters.
+
+        Returns:
+            Dictionary with entry/trigram counts and query cache hit rate
+        """
+        with self._cache_lock:
+            return {
+                "entries": len(self._outputs),
+                "trigrams": len(self._grams),
+                "queries": self._queries,
+                "cache_hits": self._cache_hits,
+                "cache_size": len(self._cache),
+                "hit_rate": round(self._cache_hits / self._queries, 4) if self._queries else 0.0,
+            }
+
+
+def load_index(json_path: str, label: str, **kwargs) -> AutocompleteIndex:
+    """
+    Build an index from a JSON list file, logging like the other startup loaders.
+
+    Args:
+        json_path: Path to a JSON file holding a list of records
+        label: Name used in log lines, e.g. "stations"
+        **kwargs: Passed to AutocompleteIndex
+
+    Returns:
+        AutocompleteIndex (empty if the file could not be read)
+    """
+    try:
+        with open(json_path, "r") as f:
+            entries = json.load(f)
+        print(f"Loaded {len(entries)} {label} from {json_path}")
+    except Exception as e:
+        print(f"Error loading {label} data: {e}")
+        entries = []
+    return AutocompleteIndex(entries, **kwargs)
+
+
+if __name__ == "__main__":
+    # Micro-benchmark: python services/autocomplete.py [entries] [queries]
+    import random
+    import string
+    import sys
+    import time
+
+    n_entries = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    n_queries = int(sys.argv[2]) if len(sys.argv) > 2 else 20000
+    rng = random.Random(42)
+    syllables = ["an", "pur", "ba", "del", "hi", "ma", "ra", "na", "gar", "bad", "kot", "ga", "la", "sha", "vi", "jay"]
+
+    def word():
+        return "".join(rng.choice(syllables) for _ in range(rng.randint(2, 4))).capitalize()
+
+    entries = []
+    for i in range(n_entries):
+        city = word()
+        entries.append({
+            "code": "".join(rng.choice(string.ascii_uppercase) for _ in range(rng.choice((3, 4)))),
+            "name": f"{city} {rng.choice(['Junction', 'Central', 'Road', 'Cantt', 'International Airport'])}",
+            "city": city,
+            "state": word(),
+            "popularity": rng.random(),
+        })
+
+    start = time.perf_counter()
+    index = AutocompleteIndex(entries, output_fields=("code", "name", "city", "state"),
+                              popularity=lambda e: e["popularity"], cache_size=0)
+    print(f"Built index over {n_entries} entries in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    def typo(text):
+        if len(text) < 4:
+            return text
+        pos = rng.randrange(1, len(text) - 1)
+        return text[:pos] + text[pos + 1] + text[pos] + text[pos + 2:]
+
+    queries = []
+    for _ in range(n_queries):
+        entry = rng.choice(entries)
+        kind = rng.random()
+        if kind < 0.6:
+            text = entry["name"] if rng.random() < 0.7 else entry["code"]
+            queries.append(text[:rng.randint(1, min(len(text), 8))])
+        elif kind < 0.8:
+            text = entry["city"]
+            start_pos = rng.randrange(0, max(1, len(text) - 3))
+            queries.append(text[start_pos:start_pos + rng.randint(3, 5)])
+        else:
+            queries.append(typo(entry["city"][:rng.randint(4, 8)]))
+
+    timings = []
+    for q in queries:
+        start = time.perf_counter()
+        index.search(q, 10)
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+
+    def pct(p):
+        return timings[min(len(timings) - 1, int(len(timings) * p))]
+
+    print(f"{n_queries} uncached queries: p50 {pct(0.50):.3f} ms, p95 {pct(0.95):.3f} ms, "
+          f"p99 {pct(0.99):.3f} ms, max {timings[-1]:.3f} ms")
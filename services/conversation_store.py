@@ -0,0 +1,311 @@
+import os
+import json
+import time
+import sqlite3
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_SQLITE_PATH = os.path.join(_ROOT, ".cache", "conversations.sqlite3")
+
+
+def _encode(messages: List[dict]) -> str:
+    return json.dumps(messages, ensure_ascii=False, default=str, separators=(",", ":"))
+
+
+class MemoryConversationBackend:
+    """Per-process backend: an OrderedDict in write order, so the oldest entries sit at the front."""
+
+    def __init__(self):
+        self._entries = OrderedDict()  # conversation id -> (encoded, updated_at)
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def load(self, conversation_id: str, cutoff: float) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(conversation_id)
+            if entry is None or entry[1] < cutoff:
+                return None
+            return entry[0]
+
+    def save(self, conversation_id: str, encoded: str, now: float):
+        with self._lock:
+            previous = self._entries.pop(conversation_id, None)
+            if previous is not None:
+                self._bytes -= len(previous[0])
+            self._entries[conversation_id] = (encoded, now)
+            self._bytes += len(encoded)
+
+    def delete(self, conversation_id: str):
+        with self._lock:
+            previous = self._entries.pop(conversation_id, None)
+            if previous is not None:
+                self._bytes -= len(previous[0])
+
+    def evict(self, cutoff: float, max_bytes: int) -> int:
+        """Drop idle conversations, then the oldest until within max_bytes. Returns the number dropped."""
+        dropped = 0
+        with self._lock:
+            while self._entries:
+                conversation_id, (encoded, updated_at) = next(iter(self._entries.items()))
+                if updated_at >= cutoff and self._bytes <= max_bytes:
+                    break
+                del self._entries[conversation_id]
+                self._bytes -= len(encoded)
+                dropped += 1
+        return dropped
+
+    def size(self) -> Dict[str, int]:
+        with self._lock:
+            return {"conversations": len(self._entries), "bytes": self._bytes}
+
+
+class SqliteConversationBackend:
+    """SQLite file backend, shared by every worker process on the host."""
+
+    def __init__(self, path: str = DEFAULT_SQLITE_PATH):
+        self.path = path
+        self._local = threading.local()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connection() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS conversations ("
+                " id TEXT PRIMARY KEY, messages TEXT NOT NULL,"
+                " size INTEGER NOT NULL, updated_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS conversations_updated ON conversations (updated_at)")
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            # WAL lets readers in other workers proceed while one writes
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def load(self, conversation_id: str, cutoff: float) -> Optional[str]:
+        row = self._connection().execute(
+            "SELECT messages FROM conversations WHERE id = ? AND updated_at >= ?", (conversation_id, cutoff)
+        ).fetchone()
+        return row[0] if row else None
+
+    def save(self, conversation_id: str, encoded: str, now: float):
+        with self._connection() as conn:
+            conn.execute(
+                "INSERT INTO conversations (id, messages, size, updated_at) VALUES (?, ?, ?, ?)"
+                " ON CONFLICT(id) DO UPDATE SET messages = excluded.messages,"
+                " size = excluded.size, updated_at = excluded.updated_at",
+                (conversation_id, encoded, len(encoded), now),
+            )
+
+    def delete(self, conversation_id: str):
+        with self._connection() as conn:
+            conn.execute("DELETE FROM conversations WHERE id = ?", (conversation_id,))
+
+    def evict(self, cutoff: float, max_bytes: int) -> int:
+        with self._connection() as conn:
+            dropped = conn.execute("DELETE FROM conversations WHERE updated_at < ?", (cutoff,)).rowcount
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM conversations").fetchone()[0]
+            if total > max_bytes:
+                # Oldest first until the running total of the survivors fits
+                rows = conn.execute("SELECT id, size FROM conversations ORDER BY updated_at").fetchall()
+                doomed = []
+                for conversation_id, size in rows:
+                    if total <= max_bytes:
+                        break
+                    doomed.append((conversation_id,))
+                    total -= size
+                conn.executemany("DELETE FROM conversations WHERE id = ?", doomed)
+                dropped += len(doomed)
+        return dropped
+
+    def size(self) -> Dict[str, int]:
+        count, total = self._connection().execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM conversations"
+        ).fetchone()
+        return {"conversations": count, "bytes": total}
+
+
+class ConversationStore:
+    def __init__(self, backend=None, idle_ttl: int = 6 * 3600, max_messages: int = 20,
+                 max_bytes: int = 64 * 1024 * 1024, sweep_interval: float = 5.0):
+        """
+        Initialize the bounded conversation history store.
+
+        Histories are stored as JSON; a conversation idle for idle_ttl
+        seconds is dropped, each keeps only its last max_messages messages,
+        and the oldest conversations are evicted once all histories together
+        exceed max_bytes.
+
+        Supports the dict operations TTravelsChatbot uses on its history
+        (get, [] assignment, in, del). Returned histories are private
+        copies; write them back to persist changes.
+
+        Args:
+            backend: MemoryConversationBackend (default) or SqliteConversationBackend
+            idle_ttl: Seconds without a write before a conversation expires
+            max_messages: Messages kept per conversation
+            max_bytes: Cap on the encoded size of all conversations
+            sweep_interval: Minimum seconds between eviction sweeps
+        """
+        self.backend = backend or MemoryConversationBackend()
+        self.idle_ttl = idle_ttl
+        self.max_messages = max(1, max_messages)
+        self.max_bytes = max_bytes
+        self.sweep_interval = sweep_interval
+        self._lock = threading.Lock()
+        self._last_sweep = 0.0
+        self._reads = 0
+        self._writes = 0
+        self._evicted = 0
+        self._truncated = 0
+
+    def get(self, conversation_id: str, default: Optional[List[dict]] = None) -> List[dict]:
+        """
+        Load a conversation's messages.
+
+        Args:
+            conversation_id: Conversation key
+            default: Returned when the conversation is unknown or expired
+
+        Returns:
+            List of {"role", "content", ...} dicts
+        """
+        messages = self._load(conversation_id)
+        if messages is None:
+            return [] if default is None else default
+        return messages
+
+    def _load(self, conversation_id: str) -> Optional[List[dict]]:
+        with self._lock:
+            self._reads += 1
+        encoded = self.backend.load(conversation_id, time.time() - self.idle_ttl)
+        if encoded is None:
+            return None
+        try:
+            return json.loads(encoded)
+        except ValueError:
+            logger.error(f"Dropping unreadable history for conversation {conversation_id}")
+            self.backend.delete(conversation_id)
+            return None
+
+    def set(self, conversation_id: str, messages: List[dict]):
+        """
+        Replace a conversation's messages, keeping the newest max_messages.
+
+        Args:
+            conversation_id: Conversation key
+            messages: Full message list
+        """
+        if len(messages) > self.max_messages:
+            messages = messages[-self.max_messages:]
+            with self._lock:
+                self._truncated += 1
+        now = time.time()
+        self.backend.save(conversation_id, _encode(messages), now)
+        with self._lock:
+            self._writes += 1
+            sweep = now - self._last_sweep >= self.sweep_interval
+            if sweep:
+                self._last_sweep = now
+        if sweep:
+            self.sweep(now)
+
+    def append(self, conversation_id: str, *messages: dict) -> List[dict]:
+        """
+        Add messages to a conversation.
+
+        Args:
+            conversation_id: Conversation key
+            *messages: Messages to add
+
+        Returns:
+            The stored (possibly truncated) history
+        """
+        history = self.get(conversation_id) + list(messages)
+        self.set(conversation_id, history)
+        return history[-self.max_messages:]
+
+    def delete(self, conversation_id: str):
+        """Forget a conversation."""
+        self.backend.delete(conversation_id)
+
+    def sweep(self, now: Optional[float] = None) -> int:
+        """
+        Evict idle conversations and enforce the global size cap.
+
+        Returns:
+            Number of conversations dropped
+        """
+        dropped = self.backend.evict((now or time.time()) - self.idle_ttl, self.max_bytes)
+        if dropped:
+            with self._lock:
+                self._evicted += dropped
+        return dropped
+
+    def __getitem__(self, conversation_id: str) -> List[dict]:
+        messages = self._load(conversation_id)
+        if messages is None:
+            raise KeyError(conversation_id)
+        return messages
+
+    def __setitem__(self, conversation_id: str, messages: List[dict]):
+        self.set(conversation_id, messages)
+
+    def __delitem__(self, conversation_id: str):
+        self.delete(conversation_id)
+
+    def __contains__(self, conversation_id: str) -> bool:
+        return self.backend.load(conversation_id, time.time() - self.idle_ttl) is not None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get store counters.
+
+        Returns:
+            Dictionary with backend, conversation count, stored bytes and limits
+        """
+        size = self.backend.size()
+        with self._lock:
+            return {
+                "backend": type(self.backend).__name__,
+                **size,
+                "max_bytes": self.max_bytes,
+                "max_messages": self.max_messages,
+                "idle_ttl": self.idle_ttl,
+                "reads": self._reads,
+                "writes": self._writes,
+                "evicted": self._evicted,
+                "truncated": self._truncated,
+            }
+
+
+def _backend_from_env():
+    """CONVERSATION_STORE=sqlite shares histories between worker processes on one host."""
+    kind = os.getenv("CONVERSATION_STORE", "memory").lower()
+    if kind == "sqlite":
+        path = os.getenv("CONVERSATION_STORE_PATH", DEFAULT_SQLITE_PATH)
+        try:
+            return SqliteConversationBackend(path)
+        except (sqlite3.Error, OSError) as e:
+            logger.error(f"Falling back to in-memory conversation store, cannot open {path}: {e}")
+    return MemoryConversationBackend()
+
+
+# Global instance
+conversation_store = ConversationStore(
+    _backend_from_env(),
+    idle_ttl=int(os.getenv("CONVERSATION_IDLE_TTL", str(6 * 3600))),
+    max_messages=int(os.getenv("CONVERSATION_MAX_MESSAGES", "20")),
+    max_bytes=int(os.getenv("CONVERSATION_MAX_BYTES", str(64 * 1024 * 1024))),
+)
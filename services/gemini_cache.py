@@ -0,0 +1,170 @@
+import os
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from services.serp_cache import SingleFlight
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class GeminiResponseCache:
+    def __init__(self, max_entries: int = 256, ttl: int = 6 * 3600, max_chars: int = 2_000_000,
+                 singleflight: Optional[SingleFlight] = None):
+        """
+        Initialize the Gemini prompt/response cache.
+
+        Entries are keyed by model and a hash of the whitespace-normalized
+        prompt, so templated planner prompts that differ only in
+        indentation share one entry. Bounded by entry count and total
+        response characters, evicting least-recently-used first.
+
+        Args:
+            max_entries: Maximum cached responses
+            ttl: Seconds a response stays valid
+            max_chars: Maximum total characters of cached responses
+            singleflight: Coalescer for concurrent misses on the same prompt
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_chars = max_chars
+        self.singleflight = singleflight or SingleFlight()
+        self._entries = OrderedDict()  # key -> (expires_at, response)
+        self._chars = 0
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expired = 0
+
+    def make_key(self, prompt: str, model: str) -> str:
+        """
+        Build the cache key for a prompt.
+
+        Args:
+            prompt: Full prompt text
+            model: Model name, e.g. "gemini-2.5-pro"
+
+        Returns:
+            Hex digest key
+        """
+        normalized = " ".join(str(prompt or "").split())
+        return hashlib.sha256(f"{model}\x00{normalized}".encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Look up a cached response.
+
+        Args:
+            key: Key from make_key
+
+        Returns:
+            Response text, or None on miss/expiry
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            expires_at, response = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self._chars -= len(response)
+                self._expired += 1
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return response
+
+    def set(self, key: str, response: str):
+        """
+        Store a response.
+
+        Args:
+            key: Key from make_key
+            response: Response text
+        """
+        if self.ttl <= 0 or self.max_entries <= 0 or len(response) > self.max_chars:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._chars -= len(previous[1])
+            self._entries[key] = (time.monotonic() + self.ttl, response)
+            self._chars += len(response)
+            while len(self._entries) > self.max_entries or self._chars > self.max_chars:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._chars -= len(evicted)
+                self._evictions += 1
+
+    def get_or_generate(self, prompt: str, model: str, generate) -> str:
+        """
+        Return the cached response for prompt, generating it on a miss.
+
+        Concurrent misses for the same prompt share one model call.
+
+        Args:
+            prompt: Full prompt text
+            model: Model name
+            generate: Zero-argument callable returning (response_text, cacheable)
+
+        Returns:
+            Response text
+        """
+        key = self.make_key(prompt, model)
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+
+        def fetch():
+            response, cacheable = generate()
+            if cacheable:
+                self.set(key, response)
+            return response
+
+        response, _ = self.singleflight.do(key, fetch)
+        return response
+
+    def clear(self):
+        """Drop all cached responses."""
+        with self._lock:
+            self._entries.clear()
+            self._chars = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get cache counters.
+
+        Returns:
+            Dictionary with size, hits, misses, hit_rate, evictions and expired
+        """
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "chars": self._chars,
+                "max_chars": self.max_chars,
+                "ttl": self.ttl,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+                "evictions": self._evictions,
+                "expired": self._expired,
+                "singleflight": self.singleflight.get_stats(),
+            }
+
+
+# Global instance
+gemini_cache = GeminiResponseCache(
+    max_entries=int(os.getenv("GEMINI_CACHE_MAX_ENTRIES", "256")),
+    ttl=int(os.getenv("GEMINI_CACHE_TTL", str(6 * 3600))),
+    max_chars=int(os.getenv("GEMINI_CACHE_MAX_CHARS", "2000000")),
+    singleflight=SingleFlight(wait_timeout=float(os.getenv("GEMINI_SINGLEFLIGHT_TIMEOUT", "120"))),
+)
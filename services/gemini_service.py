@@ -96,12 +96,80 @@
 
 # File: services/gemini_service.py
 import os
+import re
+import json
+import time
+import threading
+from collections import deque
 import google.generativeai as genai
 import google.ai.generativelanguage as glm
+from services.gemini_cache import gemini_cache
+
+# Model tiers, cheapest first; a call escalates up this ladder
+TIER_ORDER = ("flash", "pro")
+DEFAULT_TIER_MODELS = {"flash": "gemini-2.5-flash", "pro": "gemini-2.5-pro"}
+
+# Task class each call site declares -> tier it starts on
+#   parse:     JSON slot extraction from a user message
+#   classify:  picking a label/intent, small JSON
+#   chat:      conversational replies and small talk
+#   long_form: itineraries and whole-plan rewrites
+DEFAULT_TASK_TIERS = {"parse": "flash", "classify": "flash", "chat": "flash", "long_form": "pro"}
+
+_LATENCY_SAMPLES = 500
+
+
+def load_json_reply(text):
+    """Parses the JSON object in a model reply.
+
+    Code fences are stripped; if the rest is not JSON as a whole, the
+    outermost {...} is tried, so "Sure! Here it is: {...}" still parses.
+    Callers that read JSON replies should use this, so they accept exactly
+    what parses_as_json lets through to the cache.
+
+    Returns:
+        The object as a dict, or None
+    """
+    cleaned = (text or "").strip().replace("```json", "").replace("```", "")
+    try:
+        data = json.loads(cleaned)
+    except ValueError:
+        match = re.search(r"\{.*\}", cleaned, re.DOTALL)
+        if not match:
+            return None
+        try:
+            data = json.loads(match.group(0))
+        except ValueError:
+            return None
+    return data if isinstance(data, dict) else None
+
+
+def parses_as_json(text):
+    """Reply validator for generate_chat_response: True if load_json_reply can read it."""
+    return load_json_reply(text) is not None
+
 
 class GeminiService:
-    def __init__(self):
-        """Initializes the Gemini client and models."""
+    def __init__(self, tier_models=None, task_tiers=None):
+        """Initializes the Gemini client and the model tier router.
+
+        Args:
+            tier_models: Tier name -> model name (defaults to DEFAULT_TIER_MODELS)
+            task_tiers: Task class -> starting tier (defaults to DEFAULT_TASK_TIERS)
+        """
+        self.tier_models = dict(DEFAULT_TIER_MODELS, **(tier_models or {}))
+        self.task_tiers = dict(DEFAULT_TASK_TIERS)
+        for task, tier in (task_tiers or {}).items():
+            if tier in TIER_ORDER:
+                self.task_tiers[task] = tier
+            else:
+                print(f"❌ Ignoring Gemini tier {tier!r} for task {task!r}; expected one of {TIER_ORDER}")
+        self._models = {}  # tier -> GenerativeModel
+        self._lock = threading.Lock()
+        self._tier_stats = {tier: {"calls": 0, "errors": 0, "rejected": 0, "prompt_tokens": 0,
+                                   "output_tokens": 0, "latency_ms": deque(maxlen=_LATENCY_SAMPLES)}
+                            for tier in TIER_ORDER}
+        self._task_stats = {task: {"calls": 0, "escalations": 0} for task in self.task_tiers}
         self.stt_model = None
         self.chat_model = None
         try:
@@ -111,9 +179,11 @@ class GeminiService:
             genai.configure(api_key=gemini_api_key)
 
             # Use the correct models available to your key
-            self.stt_model = genai.GenerativeModel('gemini-2.5-flash')
-            self.chat_model = genai.GenerativeModel('gemini-2.5-pro')
-            print("✅ Gemini Service Initialized successfully.")
+            self.stt_model = genai.GenerativeModel(self.tier_models["flash"])
+            for tier in TIER_ORDER:
+                self._models[tier] = genai.GenerativeModel(self.tier_models[tier])
+            self.chat_model = self._models["pro"]
+            print(f"✅ Gemini Service Initialized successfully (tiers: {self.tier_models}).")
         except Exception as e:
             print(f"❌ Error initializing Gemini Service: {e}")
 
@@ -130,16 +200,154 @@ class GeminiService:
             print(f"❌ Gemini STT Error: {e}")
             return None
 
-    def generate_chat_response(self, prompt):
-        """Generates a conversational response from a full prompt."""
-        if not self.chat_model:
+    def _tier_for(self, task):
+        # Unknown task classes get the largest model rather than a worse answer
+        return self.task_tiers.get(task, TIER_ORDER[-1])
+
+    def generate_chat_response(self, prompt, cache=True, task="long_form", validate=None):
+        """Generates a response from a full prompt on the tier configured for task.
+
+        If the call fails, or validate(reply) is False, the same prompt is
+        retried on the next larger tier. Identical prompts (after
+        whitespace normalization) for the same starting model are answered
+        from gemini_cache; pass cache=False where replies should vary, such
+        as free-form conversation. Error and rejected replies are never
+        cached.
+
+        Args:
+            prompt: Full prompt text
+            cache: Whether to use gemini_cache
+            task: "parse", "classify", "chat" or "long_form" (the default,
+                which keeps the largest model)
+            validate: Optional check of the reply text, e.g. parses_as_json
+
+        Returns:
+            Reply text
+        """
+        if not self._models:
             return "Error: Chat model not initialized."
+        tier = self._tier_for(task)
+        with self._lock:
+            self._task_stats.setdefault(task, {"calls": 0, "escalations": 0})["calls"] += 1
+        if not cache:
+            return self._generate_routed(prompt, task, tier, validate)[0]
+        return gemini_cache.get_or_generate(prompt, self.tier_models[tier],
+                                            lambda: self._generate_routed(prompt, task, tier, validate))
+
+    def _generate_routed(self, prompt, task, tier, validate):
+        """Calls tier, escalating on failure. Returns (text, acceptable)."""
+        for position in range(TIER_ORDER.index(tier), len(TIER_ORDER)):
+            current = TIER_ORDER[position]
+            text, ok = self._generate(prompt, current)
+            if ok and validate is not None and not validate(text):
+                ok = False
+                with self._lock:
+                    self._tier_stats[current]["rejected"] += 1
+            if ok or position == len(TIER_ORDER) - 1:
+                return text, ok
+            print(f"[WARNING] Gemini {current} reply unusable for {task}; escalating")
+            with self._lock:
+                self._task_stats[task]["escalations"] += 1
+
+    def _generate(self, prompt, tier="pro"):
+        """Calls one tier once. Returns (text, succeeded)."""
+        started = time.perf_counter()
         try:
-            response = self.chat_model.generate_content(prompt)
-            return response.text.strip()
+            response = self._models[tier].generate_content(prompt)
+            text = response.text.strip()
         except Exception as e:
-            print(f"❌ Gemini Conversation Error: {e}")
-            return "Sorry, I encountered an error. Please try again."
+            print(f"❌ Gemini Conversation Error ({tier}): {e}")
+            self._record(tier, started, error=True)
+            return "Sorry, I encountered an error. Please try again.", False
+        self._record(tier, started, getattr(response, "usage_metadata", None))
+        return text, True
+
+    def _record(self, tier, started, usage=None, error=False):
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        with self._lock:
+            stats = self._tier_stats[tier]
+            stats["calls"] += 1
+            stats["latency_ms"].append(elapsed_ms)
+            if error:
+                stats["errors"] += 1
+            if usage is not None:
+                stats["prompt_tokens"] += getattr(usage, "prompt_token_count", 0) or 0
+                stats["output_tokens"] += getattr(usage, "candidates_token_count", 0) or 0
+
+    def stream_chat_response(self, prompt, task="chat"):
+        """Generates a conversational response, yielding text chunks as Gemini produces them."""
+        if not self._models:
+            yield "Error: Chat model not initialized."
+            return
+        tier = self._tier_for(task)
+        with self._lock:
+            self._task_stats.setdefault(task, {"calls": 0, "escalations": 0})["calls"] += 1
+        started = time.perf_counter()
+        produced = False
+        usage = None
+        try:
+            for chunk in self._models[tier].generate_content(prompt, stream=True):
+                # The final chunk carries the token counts for the whole reply
+                usage = getattr(chunk, "usage_metadata", None) or usage
+                try:
+                    text = chunk.text
+                except ValueError:
+                    # Chunks without text parts (e.g. safety/finish metadata)
+                    continue
+                if text:
+                    produced = True
+                    yield text
+        except Exception as e:
+            print(f"❌ Gemini Conversation Error (stream, {tier}): {e}")
+            self._record(tier, started, usage, error=True)
+            if not produced:
+                yield "Sorry, I encountered an error. Please try again."
+            return
+        self._record(tier, started, usage)
+
+    def get_stats(self):
+        """Returns per-tier call, error, token and latency counters and per-task escalations."""
+        def pct(samples, p):
+            if not samples:
+                return None
+            ordered = sorted(samples)
+            return round(ordered[min(len(ordered) - 1, int(len(ordered) * p))], 1)
+
+        with self._lock:
+            tiers = {}
+            for tier, stats in self._tier_stats.items():
+                latency = stats["latency_ms"]
+                tiers[tier] = {
+                    "model": self.tier_models[tier],
+                    "calls": stats["calls"],
+                    "errors": stats["errors"],
+                    "rejected": stats["rejected"],
+                    "prompt_tokens": stats["prompt_tokens"],
+                    "output_tokens": stats["output_tokens"],
+                    "latency_ms": {"p50": pct(latency, 0.5), "p95": pct(latency, 0.95)},
+                }
+            return {
+                "tiers": tiers,
+                "task_tiers": dict(self.task_tiers),
+                "tasks": {task: dict(stats) for task, stats in self._task_stats.items()},
+            }
+
+
+def _task_tiers_from_env():
+    """GEMINI_TIER_PARSE=pro etc. moves a task class to another tier."""
+    overrides = {}
+    for task in DEFAULT_TASK_TIERS:
+        tier = os.getenv(f"GEMINI_TIER_{task.upper()}")
+        if tier:
+            overrides[task] = tier.lower()
+    return overrides
+
 
 # Create a single instance to be used across the app
-gemini_service = GeminiService()
\ No newline at end of file
+gemini_service = GeminiService(
+    tier_models={
+        "flash": os.getenv("GEMINI_FLASH_MODEL", DEFAULT_TIER_MODELS["flash"]),
+        "pro": os.getenv("GEMINI_PRO_MODEL", DEFAULT_TIER_MODELS["pro"]),
+    },
+    task_tiers=_task_tiers_from_env(),
+)
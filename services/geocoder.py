@@ -0,0 +1,191 @@
+import os
+import time
+import sqlite3
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+from services.serp_cache import cached_search
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_DB_PATH = os.path.join(_ROOT, ".cache", "hotel_geocodes.sqlite3")
+
+
+class HotelGeocoder:
+    def __init__(self, db_path: str = DEFAULT_DB_PATH, max_workers: int = 4):
+        """
+        Initialize the hotel geocoder.
+
+        Coordinates are resolved through the SerpAPI google_maps engine and
+        remembered in a SQLite table keyed by (hotel name, destination), so a
+        hotel is looked up upstream at most once.
+
+        Args:
+            db_path: Path of the SQLite file holding known coordinates
+            max_workers: Maximum concurrent google_maps lookups
+        """
+        self.db_path = db_path
+        self.max_workers = max(1, max_workers)
+        self._lock = threading.Lock()
+        self._conn = None
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="geocode")
+        self._stored_hits = 0
+        self._upstream_lookups = 0
+        self._failures = 0
+        self._init_db()
+
+    def _init_db(self):
+        """Open the coordinates table, creating it if needed."""
+        try:
+            os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS hotel_coordinates ("
+                " name_key TEXT NOT NULL,"
+                " destination_key TEXT NOT NULL,"
+                " latitude REAL NOT NULL,"
+                " longitude REAL NOT NULL,"
+                " created_at REAL NOT NULL,"
+                " PRIMARY KEY (name_key, destination_key))"
+            )
+            self._conn.commit()
+        except Exception as e:
+            # Geocoding still works without persistence, just not across restarts
+            logger.error(f"Failed to open geocode table at {self.db_path}: {e}")
+            self._conn = None
+
+    @staticmethod
+    def _normalize(value: str) -> str:
+        return " ".join((value or "").lower().split())
+
+    def _load(self, keys: List[Tuple[str, str]]) -> Dict[Tuple[str, str], Dict[str, float]]:
+        """Fetch stored coordinates for (name_key, destination_key) pairs."""
+        found = {}
+        if not self._conn or not keys:
+            return found
+        with self._lock:
+            for name_key, destination_key in keys:
+                row = self._conn.execute(
+                    "SELECT latitude, longitude FROM hotel_coordinates WHERE name_key = ? AND destination_key = ?",
+                    (name_key, destination_key)
+                ).fetchone()
+                if row:
+                    found[(name_key, destination_key)] = {"latitude": row[0], "longitude": row[1]}
+        return found
+
+    def _save(self, rows: Dict[Tuple[str, str], Dict[str, float]]):
+        """Persist newly resolved coordinates."""
+        if not self._conn or not rows:
+            return
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO hotel_coordinates VALUES (?, ?, ?, ?, ?)",
+                [(n, d, c["latitude"], c["longitude"], now) for (n, d), c in rows.items()]
+            )
+            self._conn.commit()
+
+    def _lookup_upstream(self, name: str, destination: str, api_key: Optional[str]) -> Optional[Dict[str, float]]:
+        """Resolve one hotel via the google_maps engine."""
+        map_params = {
+            "engine": "google_maps",
+            "q": f"{name} {destination}",
+            "type": "search",
+            "api_key": api_key
+        }
+        map_results = cached_search(map_params)
+        local_results = map_results.get("local_results", [])
+        if local_results:
+            coords = local_results[0].get("gps_coordinates")
+            if coords and "latitude" in coords and "longitude" in coords:
+                return {"latitude": coords["latitude"], "longitude": coords["longitude"]}
+        return None
+
+    def geocode_hotels(self, hotels: List[dict], destination: str, api_key: Optional[str] = None,
+                       default_coords: Optional[Dict[str, float]] = None) -> int:
+        """
+        Fill in gps_coordinates for hotels that don't have them.
+
+        Hotel names are deduplicated, stored coordinates are used first and
+        only the remaining names are looked up upstream, concurrently.
+
+        Args:
+            hotels: SerpAPI hotel dicts, updated in place
+            destination: Destination the hotels were searched in
+            api_key: SerpAPI key
+            default_coords: Coordinates applied when an upstream lookup fails
+
+        Returns:
+            Number of upstream lookups performed
+        """
+        missing = {}
+        for hotel in hotels or []:
+            if hotel.get("gps_coordinates") or not hotel.get("name"):
+                continue
+            key = (self._normalize(hotel["name"]), self._normalize(destination))
+            missing.setdefault(key, []).append(hotel)
+        if not missing:
+            return 0
+
+        resolved = self._load(list(missing))
+        self._stored_hits += len(resolved)
+
+        pending = [key for key in missing if key not in resolved]
+        failed = set()
+        fresh = {}
+        if pending:
+            futures = {
+                key: self._executor.submit(self._lookup_upstream, missing[key][0]["name"], destination, api_key)
+                for key in pending
+            }
+            for key, future in futures.items():
+                try:
+                    coords = future.result()
+                    if coords:
+                        fresh[key] = coords
+                except Exception as e:
+                    print(f"[WARNING] Could not get coordinates for {missing[key][0].get('name', '')}: {e}")
+                    failed.add(key)
+            self._upstream_lookups += len(pending)
+            self._failures += len(failed)
+            self._save(fresh)
+            resolved.update(fresh)
+
+        for key, group in missing.items():
+            coords = resolved.get(key)
+            if coords is None and key in failed and default_coords:
+                coords = default_coords
+            if coords:
+                for hotel in group:
+                    hotel["gps_coordinates"] = dict(coords)
+        return len(pending)
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Get geocoding counters.
+
+        Returns:
+            Dictionary with stored hits, upstream lookups, failures and stored rows
+        """
+        stored_rows = 0
+        if self._conn:
+            with self._lock:
+                stored_rows = self._conn.execute("SELECT COUNT(*) FROM hotel_coordinates").fetchone()[0]
+        return {
+            "stored_hits": self._stored_hits,
+            "upstream_lookups": self._upstream_lookups,
+            "failures": self._failures,
+            "stored_rows": stored_rows,
+            "max_workers": self.max_workers,
+        }
+
+
+# Global instance
+hotel_geocoder = HotelGeocoder(
+    db_path=os.getenv("GEOCODE_DB_PATH", DEFAULT_DB_PATH),
+    max_workers=int(os.getenv("GEOCODE_MAX_WORKERS", "4")),
+)
@@ -0,0 +1,258 @@
+import os
+import json
+import time
+import secrets
+import logging
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class HotelResultStore:
+    def __init__(self, ttl: int = 1800, max_entries: int = 200, spill_dir: Optional[str] = None):
+        """
+        Initialize the server-side hotel search result store.
+
+        Each google_hotels result set is kept under a random search ID so
+        pagination and detail lookups can be served without re-querying
+        SerpAPI. Entries pushed out of memory by the size bound are written
+        to spill_dir (when configured) and reloaded on demand until they expire.
+
+        Args:
+            ttl: Seconds a search result stays valid
+            max_entries: Maximum result sets kept in memory
+            spill_dir: Optional directory for result sets evicted from memory
+        """
+        self.ttl = ttl
+        self.max_entries = max(1, max_entries)
+        self.spill_dir = spill_dir
+        self._entries = OrderedDict()  # search_id -> record
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._spilled = 0
+
+        if self.spill_dir:
+            try:
+                os.makedirs(self.spill_dir, exist_ok=True)
+            except OSError as e:
+                logger.error(f"Hotel store spill disabled, cannot create {self.spill_dir}: {e}")
+                self.spill_dir = None
+
+    def put(self, query: Dict[str, Any], properties: List[dict]) -> str:
+        """
+        Store a hotel result set.
+
+        Args:
+            query: Search parameters the results belong to (without api_key)
+            properties: Hotel property dicts from SerpAPI
+
+        Returns:
+            The new search ID
+        """
+        search_id = secrets.token_urlsafe(16)
+        record = {
+            "search_id": search_id,
+            "query": {k: v for k, v in query.items() if k != "api_key"},
+            "properties": list(properties or []),
+            "expires_at": time.time() + self.ttl,
+        }
+        with self._lock:
+            self._entries[search_id] = record
+            evicted = self._evict_locked()
+        self._spill_evicted(evicted)
+        return search_id
+
+    def get(self, search_id: Optional[str]) -> Optional[Dict[str, Any]]:
+        """
+        Fetch a stored result set.
+
+        The returned record is the stored one, so in-place enrichment of its
+        properties (e.g. gps_coordinates) is kept for later pages.
+
+        Args:
+            search_id: ID returned by put()
+
+        Returns:
+            Record dict with query, properties and expires_at, or None
+        """
+        if not search_id:
+            return None
+        with self._lock:
+            record = self._entries.get(search_id)
+            if record is not None:
+                if record["expires_at"] <= time.time():
+                    del self._entries[search_id]
+                    record = None
+                else:
+                    self._entries.move_to_end(search_id)
+
+        if record is None:
+            record = self._load_spilled(search_id)
+            if record is not None:
+                with self._lock:
+                    self._entries[search_id] = record
+                    evicted = self._evict_locked()
+                self._spill_evicted(evicted)
+
+        with self._lock:
+            if record is None:
+                self._misses += 1
+            else:
+                self._hits += 1
+        return record
+
+    def get_page(self, search_id: Optional[str], page: int, per_page: int) -> Optional[Dict[str, Any]]:
+        """
+        Slice one page out of a stored result set.
+
+        Args:
+            search_id: ID returned by put()
+            page: 1-based page number
+            per_page: Results per page
+
+        Returns:
+            Dict with hotels, total_hotels, total_pages and query, or None if unknown/expired
+        """
+        record = self.get(search_id)
+        if record is None:
+            return None
+        properties = record["properties"]
+        page = max(1, page)
+        start_idx = (page - 1) * per_page
+        return {
+            "search_id": record["search_id"],
+            "query": record["query"],
+            "hotels": properties[start_idx:start_idx + per_page],
+            "total_hotels": len(properties),
+            "total_pages": (len(properties) + per_page - 1) // per_page,
+        }
+
+    def find_property(self, search_id: Optional[str], property_token: str) -> Optional[dict]:
+        """
+        Find one property in a stored result set by its property_token.
+
+        Args:
+            search_id: ID returned by put()
+            property_token: SerpAPI property token
+
+        Returns:
+            Property dict or None
+        """
+        record = self.get(search_id)
+        if record is None or not property_token:
+            return None
+        for prop in record["properties"]:
+            if prop.get("property_token") == property_token:
+                return prop
+        return None
+
+    def _evict_locked(self) -> List[Tuple[str, Dict[str, Any]]]:
+        """
+        Enforce the memory bound. Caller must hold the lock.
+
+        Returns:
+            (search_id, record) pairs still worth spilling; pass them to
+            _spill_evicted after releasing the lock so disk I/O never blocks
+            other readers and writers
+        """
+        evicted = []
+        while len(self._entries) > self.max_entries:
+            search_id, record = self._entries.popitem(last=False)
+            if self.spill_dir and record["expires_at"] > time.time():
+                evicted.append((search_id, record))
+        return evicted
+
+    def _spill_evicted(self, evicted: List[Tuple[str, Dict[str, Any]]]):
+        """Write records returned by _evict_locked to disk. Call without the lock held."""
+        for search_id, record in evicted:
+            self._spill(search_id, record)
+
+    def _spill_path(self, search_id: str) -> str:
+        return os.path.join(self.spill_dir, f"{search_id}.json")
+
+    def _spill(self, search_id: str, record: Dict[str, Any]):
+        """Write a record to disk atomically."""
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.spill_dir, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(record, f)
+            os.replace(tmp_path, self._spill_path(search_id))
+        except Exception as e:
+            logger.error(f"Failed to spill hotel search {search_id}: {e}")
+            return
+        with self._lock:
+            self._spilled += 1
+            sweep = self._spilled % 50 == 0
+        # Spilled searches that are never revisited would otherwise pile up
+        if sweep:
+            self._sweep_spill_dir()
+
+    def _sweep_spill_dir(self):
+        """Delete spilled files older than the TTL."""
+        cutoff = time.time() - self.ttl
+        try:
+            for name in os.listdir(self.spill_dir):
+                path = os.path.join(self.spill_dir, name)
+                try:
+                    if os.path.getmtime(path) < cutoff:
+                        os.unlink(path)
+                except OSError:
+                    continue
+        except OSError as e:
+            logger.error(f"Failed to sweep hotel store spill dir: {e}")
+
+    def _load_spilled(self, search_id: str) -> Optional[Dict[str, Any]]:
+        """Load a spilled record, dropping it if expired."""
+        if not self.spill_dir:
+            return None
+        # IDs come from clients; only accept the shape put() generates
+        if not all(c.isalnum() or c in "-_" for c in search_id):
+            return None
+        path = self._spill_path(search_id)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                record = json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.error(f"Failed to read spilled hotel search {search_id}: {e}")
+            return None
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+        if record.get("expires_at", 0) <= time.time():
+            return None
+        return record
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get store counters.
+
+        Returns:
+            Dictionary with in-memory size, hits, misses and spilled count
+        """
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl": self.ttl,
+                "hits": self._hits,
+                "misses": self._misses,
+                "spilled": self._spilled,
+                "spill_dir": self.spill_dir,
+            }
+
+
+# Global instance
+hotel_store = HotelResultStore(
+    ttl=int(os.getenv("HOTEL_STORE_TTL", "1800")),
+    max_entries=int(os.getenv("HOTEL_STORE_MAX_ENTRIES", "200")),
+    spill_dir=os.getenv("HOTEL_STORE_SPILL_DIR") or None,
+)
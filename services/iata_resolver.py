@@ -0,0 +1,291 @@
+import os
+import re
+import copy
+import json
+import difflib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_AIRPORTS_PATH = os.path.join(_ROOT, "static", "js", "airports.json")
+
+# Former names, spellings and nearby cities travellers commonly use.
+# Entries whose code is missing from airports.json are ignored.
+CITY_ALIASES = {
+    "bombay": "BOM",
+    "bengaluru": "BLR",
+    "calcutta": "CCU",
+    "madras": "MAA",
+    "poona": "PNQ",
+    "new delhi": "DEL",
+    "gurgaon": "DEL",
+    "gurugram": "DEL",
+    "noida": "DEL",
+    "navi mumbai": "BOM",
+    "cochin": "COK",
+    "ernakulam": "COK",
+    "trivandrum": "TRV",
+    "trichy": "TRZ",
+    "vizag": "VTZ",
+    "baroda": "BDQ",
+    "banaras": "VNS",
+    "benares": "VNS",
+    "kashi": "VNS",
+    "prayagraj": "IXD",
+    "mangaluru": "IXE",
+    "belagavi": "IXG",
+    "mysore": "MYQ",
+    "calicut": "CCJ",
+    "pondicherry": "PNY",
+    "thoothukudi": "TCR",
+    "chhatrapati sambhajinagar": "IXU",
+    "manali": "KUU",
+    "bodh gaya": "GAY",
+    "panaji": "GOI",
+    "nyc": "JFK",
+}
+
+_PAREN_CODE = re.compile(r"\(([A-Za-z]{3})\)")
+_NON_WORD = re.compile(r"[^a-z0-9 ]+")
+
+# Match scores, best first
+SCORE_CODE = 1.0
+SCORE_EXACT = 0.98
+SCORE_ALIAS = 0.95
+SCORE_CITY_PREFIX = 0.85
+SCORE_NAME_PREFIX = 0.8
+SCORE_SUBSTRING = 0.7
+# Misspellings score similarity * SCORE_SUBSTRING, if similarity reaches the cutoff
+SPELLING_CUTOFF = 0.6
+
+# A fuzzy winner must lead the runner-up by this much to be picked on its own
+AMBIGUITY_MARGIN = 0.05
+
+
+def _normalize(value: Any) -> str:
+    return " ".join(_NON_WORD.sub(" ", str(value or "").lower()).split())
+
+
+class IataResolver:
+    def __init__(self, airports: List[dict], aliases: Optional[Dict[str, str]] = None, cache_size: int = 1024):
+        """
+        Initialize the city/airport -> IATA code resolver.
+
+        Exact lookups by code, city, airport name and alias are hash-map hits
+        built once here. Anything else goes through a ranked fuzzy pass
+        (prefix, substring, then spelling similarity) whose result, including
+        the candidate list, is memoized per normalized input.
+
+        Args:
+            airports: Records from airports.json (code, name, city, ...)
+            aliases: Mapping of alternative city name -> IATA code
+            cache_size: Number of lookups memoized
+        """
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self._lookups = 0
+        self._cache_hits = 0
+
+        self._airports = {}   # code -> airport record (first occurrence wins)
+        self._by_city = {}    # normalized city -> [codes in file order]
+        self._by_name = {}    # normalized airport name -> code
+        for airport in airports or []:
+            code = str(airport.get("code") or "").strip().upper()
+            if len(code) != 3 or code in self._airports:
+                continue
+            self._airports[code] = airport
+            city = _normalize(airport.get("city"))
+            if city:
+                self._by_city.setdefault(city, []).append(code)
+            name = _normalize(airport.get("name"))
+            if name:
+                self._by_name.setdefault(name, code)
+
+        self._aliases = {}
+        for alias, code in (aliases or {}).items():
+            if code in self._airports:
+                self._aliases[_normalize(alias)] = code
+            else:
+                logger.warning(f"Ignoring IATA alias {alias!r}: unknown code {code}")
+
+        self._cities = list(self._by_city)
+
+    def _candidate(self, code: str, score: float, matched: str) -> Dict[str, Any]:
+        airport = self._airports.get(code, {})
+        return {
+            "code": code,
+            "city": airport.get("city"),
+            "name": airport.get("name"),
+            "country": airport.get("country"),
+            "score": round(score, 3),
+            "matched": matched,
+        }
+
+    def lookup(self, value: Optional[str]) -> Dict[str, Any]:
+        """
+        Resolve free text to an IATA code, keeping the alternatives.
+
+        Args:
+            value: City, airport name, alias, code or "City (XXX)"
+
+        Returns:
+            Dict with "code" (None when unknown or ambiguous), "status"
+            ("code", "exact", "alias", "fuzzy", "ambiguous" or "not_found")
+            and ranked "candidates" (code, city, name, country, score, matched)
+        """
+        raw = str(value or "").strip()
+        m = _PAREN_CODE.search(raw)
+        # "Kolkata, India" -> "kolkata"
+        key = m.group(1).upper() if m else _normalize(raw.split(",")[0])
+        with self._lock:
+            self._lookups += 1
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                self._cache_hits += 1
+                return copy.deepcopy(cached)
+
+        result = self._resolve(key, explicit_code=bool(m))
+
+        if self.cache_size > 0:
+            with self._lock:
+                self._cache[key] = result
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return copy.deepcopy(result)
+
+    def _resolve(self, key: str, explicit_code: bool) -> Dict[str, Any]:
+        if not key:
+            return {"code": None, "status": "not_found", "candidates": []}
+
+        upper = key.upper()
+        if explicit_code or (len(key) == 3 and key.isalpha() and upper in self._airports):
+            return {"code": upper, "status": "code", "candidates": [self._candidate(upper, SCORE_CODE, "code")]}
+
+        exact = self._by_city.get(key)
+        if exact:
+            return {"code": exact[0], "status": "exact",
+                    "candidates": [self._candidate(c, SCORE_EXACT, "city") for c in exact]}
+        if key in self._by_name:
+            code = self._by_name[key]
+            return {"code": code, "status": "exact", "candidates": [self._candidate(code, SCORE_EXACT, "name")]}
+        if key in self._aliases:
+            code = self._aliases[key]
+            return {"code": code, "status": "alias", "candidates": [self._candidate(code, SCORE_ALIAS, "alias")]}
+
+        candidates = self._fuzzy_candidates(key)
+        if not candidates:
+            if len(key) == 3 and key.isalpha():
+                # A code we don't list (e.g. a small foreign airport); let SerpAPI judge it
+                return {"code": upper, "status": "code", "candidates": []}
+            return {"code": None, "status": "not_found", "candidates": []}
+
+        best = candidates[0]
+        runner_up = candidates[1]["score"] if len(candidates) > 1 else 0.0
+        if best["score"] - runner_up >= AMBIGUITY_MARGIN:
+            return {"code": best["code"], "status": "fuzzy", "candidates": candidates}
+        return {"code": None, "status": "ambiguous", "candidates": candidates}
+
+    def _fuzzy_candidates(self, key: str, limit: int = 5) -> List[Dict[str, Any]]:
+        """Rank airports loosely matching key, best first, one entry per code."""
+        scores = {}  # code -> (score, matched)
+
+        def offer(code, score, matched):
+            if score > scores.get(code, (0.0, ""))[0]:
+                scores[code] = (score, matched)
+
+        for alias, code in self._aliases.items():
+            if alias.startswith(key):
+                offer(code, SCORE_CITY_PREFIX, "alias")
+            elif key in alias:
+                offer(code, SCORE_SUBSTRING, "alias")
+        for city, codes in self._by_city.items():
+            if city.startswith(key):
+                for code in codes:
+                    offer(code, SCORE_CITY_PREFIX, "city")
+            elif key in city:
+                for code in codes:
+                    offer(code, SCORE_SUBSTRING, "city")
+        for name, code in self._by_name.items():
+            if name.startswith(key) or any(word.startswith(key) for word in name.split()):
+                offer(code, SCORE_NAME_PREFIX, "name")
+            elif key in name:
+                offer(code, SCORE_SUBSTRING, "name")
+
+        # Misspellings: "banglore", "hydrabad", "ahmdabad"
+        if len(key) >= 4:
+            pool = self._cities + list(self._aliases)
+            for match in difflib.get_close_matches(key, pool, n=limit, cutoff=SPELLING_CUTOFF):
+                # Stays below the deterministic tiers so a real prefix/substring hit wins
+                score = SCORE_SUBSTRING * difflib.SequenceMatcher(None, key, match).ratio()
+                codes = self._by_city.get(match) or [self._aliases[match]]
+                for code in codes:
+                    offer(code, score, "spelling")
+
+        order = {code: i for i, code in enumerate(self._airports)}
+        ranked = sorted(scores.items(), key=lambda item: (-item[1][0], order.get(item[0], 0)))
+        return [self._candidate(code, score, matched) for code, (score, matched) in ranked[:limit]]
+
+    def resolve(self, value: Optional[str]) -> Optional[str]:
+        """
+        Resolve free text to a single IATA code.
+
+        Args:
+            value: City, airport name, alias, code or "City (XXX)"
+
+        Returns:
+            IATA code, or None if unknown or ambiguous (see candidates())
+        """
+        return self.lookup(value)["code"]
+
+    def candidates(self, value: Optional[str], limit: int = 5) -> List[Dict[str, Any]]:
+        """
+        List ranked airport candidates for free text, for disambiguation prompts.
+
+        Args:
+            value: City, airport name, alias or code
+            limit: Maximum candidates
+
+        Returns:
+            List of candidate dicts, best first
+        """
+        return self.lookup(value)["candidates"][:limit]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get resolver counters.
+
+        Returns:
+            Dictionary with airport/alias counts and lookup cache hits
+        """
+        with self._lock:
+            return {
+                "airports": len(self._airports),
+                "aliases": len(self._aliases),
+                "lookups": self._lookups,
+                "cache_hits": self._cache_hits,
+                "cache_size": len(self._cache),
+            }
+
+
+def _load_airports(path: str) -> List[dict]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception as e:
+        print(f"Warning: could not load airports.json for mapping: {e}")
+        return []
+
+
+# Global instance
+iata_resolver = IataResolver(
+    _load_airports(os.getenv("AIRPORTS_JSON_PATH", DEFAULT_AIRPORTS_PATH)),
+    aliases=CITY_ALIASES,
+)
@@ -0,0 +1,194 @@
+import re
+import logging
+import threading
+from typing import Any, Dict, Set
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Whole-word features, all found in one pass over the message.
+# feature -> words or short phrases (matched between word boundaries)
+WORD_FEATURES = {
+    "plan_keyword": ("plan", "itinerary", "trip"),
+    "destination_or_duration": ("to", "for", "day", "days"),  # plus any 1-2 digit number
+    "greeting": ("hi", "hello", "hey", "greetings", "good morning", "good afternoon", "good evening"),
+    "flight_word": ("flight", "flights"),
+    "flight_connective": ("from", "to", "on", "depart"),
+    "hotel_word": ("hotel", "hotels", "accommodation", "stay", "room"),
+}
+
+# Features spanning several words. Each regex only runs when the message
+# contains one of its gate substrings, which every match must include.
+# feature -> (gate substrings, pattern)
+PHRASE_FEATURES = {
+    # Also covers "now/then/please ... create ... full ... plan", which always contains this
+    "full_plan_phrase": (
+        ("create", "make", "generate", "build"),
+        r"\b(create|make|generate|build).*(full|complete|entire|whole|comprehensive).*(trip|plan|itinerary)\b",
+    ),
+    "hotel_phrase": (("hotel",), r"\b(find|show|add).*hotel\b"),
+    "add_hotels_phrase": (
+        ("hotel", "accommodation", "stay"),
+        r"\b(add|find|show|get|search for).*(hotel|hotels|accommodation|stay)\b",
+    ),
+    "asks_budget": (("budget",), r"\b(give me|tell me|what is|what's|show me|need|want).*budget\b"),
+}
+
+# Intents, evaluated in order over the detected features (and earlier intents).
+# intent -> predicate(features)
+INTENT_RULES = (
+    ("full_trip_plan", lambda f: "full_plan_phrase" in f),
+    ("plan", lambda f: "plan_keyword" in f and ("destination_or_duration" in f or "full_trip_plan" in f)),
+    ("greeting", lambda f: "greeting" in f and "plan_keyword" not in f),
+    ("flight_search", lambda f: "flight_word" in f and "flight_connective" in f),
+    ("hotel_search", lambda f: "hotel_word" in f or "hotel_phrase" in f),
+    ("add_hotels", lambda f: "add_hotels_phrase" in f and "plan" not in f),
+    ("asks_budget", lambda f: "asks_budget" in f),
+)
+
+INTENTS = tuple(name for name, _ in INTENT_RULES)
+
+# Labeled messages for the benchmark below: (message, intents expected)
+LABELED_CORPUS = (
+    ("hi", {"greeting"}),
+    ("Hello there, good morning!", {"greeting"}),
+    ("hey can you plan a trip to goa", {"plan"}),
+    ("plan a trip to Goa for 5 days", {"plan"}),
+    ("Plan a 4 day itinerary for Jaipur", {"plan"}),
+    ("I want a trip", set()),
+    ("Now please create a complete trip plan", {"full_trip_plan", "plan"}),
+    ("make the whole itinerary", {"full_trip_plan", "plan"}),
+    ("find flights from Delhi to Mumbai on 2025-11-15", {"flight_search"}),
+    ("any flights tomorrow?", set()),
+    ("show flights to Pune", {"flight_search"}),
+    ("show hotels in Goa", {"hotel_search", "add_hotels"}),
+    ("add hotels to my plan", {"hotel_search", "plan"}),
+    ("find a homestay near the beach", {"add_hotels"}),
+    ("I need a room for 2 nights", {"hotel_search"}),
+    ("plan a trip to Manali for 3 days and find hotels", {"plan", "hotel_search"}),
+    ("plan a trip to Mumbai for 4 days and give me budget", {"plan", "asks_budget"}),
+    ("what is the budget for this", {"asks_budget"}),
+    ("my budget is 50000", set()),
+    ("thanks, that's all", set()),
+    ("which trains go to Chennai", set()),
+    ("book a flight from Bangalore", {"flight_search"}),
+)
+
+
+class IntentClassifier:
+    def __init__(self, word_features: Dict[str, tuple] = WORD_FEATURES,
+                 phrase_features: Dict[str, tuple] = PHRASE_FEATURES,
+                 intent_rules: tuple = INTENT_RULES):
+        """
+        Initialize the rule-based chat intent classifier.
+
+        Word features are compiled into a single alternation (longest
+        phrases first) mapped back to their features by a dict lookup, so
+        one scan finds all of them. Phrase features keep their own regex but
+        are skipped unless a cheap substring gate passes.
+
+        Args:
+            word_features: Feature -> whole words/phrases
+            phrase_features: Feature -> (gate substrings, regex)
+            intent_rules: Ordered (intent, predicate over features) pairs
+        """
+        self._word_map = {}  # word -> features it signals
+        for feature, words in word_features.items():
+            for word in words:
+                self._word_map.setdefault(word, set()).add(feature)
+        self._word_map = {word: frozenset(features) for word, features in self._word_map.items()}
+        self._number_features = frozenset({"destination_or_duration"})
+        alternation = "|".join(re.escape(w) for w in sorted(self._word_map, key=len, reverse=True))
+        self._word_pattern = re.compile(rf"\b(?:{alternation}|\d+)\b")
+        self._phrases = [(feature, gates, re.compile(pattern))
+                         for feature, (gates, pattern) in phrase_features.items()]
+        self._rules = intent_rules
+        self._lock = threading.Lock()
+        self._classified = 0
+        self._counts = {name: 0 for name, _ in intent_rules}
+
+    def features(self, text: str) -> Set[str]:
+        """
+        Detect the features present in a message.
+
+        Args:
+            text: Message, lowercased
+
+        Returns:
+            Set of feature names
+        """
+        found = set()
+        word_map = self._word_map
+        for m in self._word_pattern.finditer(text):
+            token = m.group(0)
+            features = word_map.get(token)
+            if features is not None:
+                found |= features
+            elif len(token) <= 2 and token.isdigit():
+                found |= self._number_features
+        for feature, gates, pattern in self._phrases:
+            if any(g in text for g in gates) and pattern.search(text):
+                found.add(feature)
+        return found
+
+    def classify(self, text: str) -> Dict[str, bool]:
+        """
+        Classify a chat message.
+
+        Args:
+            text: User message (any case)
+
+        Returns:
+            Dict of intent name -> bool for every intent in the rule table
+        """
+        found = self.features(str(text or "").lower())
+        result = {}
+        for name, predicate in self._rules:
+            hit = predicate(found)
+            if hit:
+                found.add(name)
+            result[name] = hit
+        with self._lock:
+            self._classified += 1
+            for name, hit in result.items():
+                if hit:
+                    self._counts[name] += 1
+        return result
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get classifier counters.
+
+        Returns:
+            Dictionary with messages classified and matches per intent
+        """
+        with self._lock:
+            return {"classified": self._classified, "intents": dict(self._counts)}
+
+
+# Global instance
+intent_classifier = IntentClassifier()
+
+
+if __name__ == "__main__":
+    # Accuracy on the labeled corpus and micro-benchmark: python services/intent_classifier.py
+    import time
+
+    classifier = IntentClassifier()
+    failures = 0
+    for message, expected in LABELED_CORPUS:
+        got = {name for name, hit in classifier.classify(message).items() if hit}
+        if got != expected:
+            failures += 1
+            print(f"MISMATCH {message!r}: expected {sorted(expected)}, got {sorted(got)}")
+    print(f"{len(LABELED_CORPUS) - failures}/{len(LABELED_CORPUS)} corpus messages classified as labeled")
+
+    rounds = 5000
+    messages = [message for message, _ in LABELED_CORPUS]
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for message in messages:
+            classifier.classify(message)
+    per_call = (time.perf_counter() - start) / (rounds * len(messages)) * 1e6
+    print(f"{per_call:.1f} µs per classification")
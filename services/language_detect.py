@@ -0,0 +1,320 @@
+import bisect
+import logging
+import threading
+import unicodedata
+from collections import Counter
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# (first, last, language) for scripts that identify a language on their own.
+# Devanagari and Arabic script are refined below (Marathi/Nepali, Urdu).
+SCRIPT_RANGES = (
+    (0x0900, 0x097F, "hi"),
+    (0x0980, 0x09FF, "bn"),
+    (0x0A00, 0x0A7F, "pa"),
+    (0x0A80, 0x0AFF, "gu"),
+    (0x0B00, 0x0B7F, "or"),
+    (0x0B80, 0x0BFF, "ta"),
+    (0x0C00, 0x0C7F, "te"),
+    (0x0C80, 0x0CFF, "kn"),
+    (0x0D00, 0x0D7F, "ml"),
+    (0x0D80, 0x0DFF, "si"),
+    (0x0E00, 0x0E7F, "th"),
+    (0x0600, 0x06FF, "ar"),
+    (0x0750, 0x077F, "ar"),
+    (0xFB50, 0xFDFF, "ar"),
+    (0xFE70, 0xFEFF, "ar"),
+    (0x0590, 0x05FF, "iw"),  # deep_translator's code for Hebrew
+    (0x0370, 0x03FF, "el"),
+    (0x0400, 0x04FF, "ru"),
+    (0x1100, 0x11FF, "ko"),
+    (0x3130, 0x318F, "ko"),
+    (0xAC00, 0xD7AF, "ko"),
+    (0x3040, 0x30FF, "ja"),
+    (0x4E00, 0x9FFF, "zh"),
+)
+
+# Letters used by Urdu but not Arabic
+_URDU_LETTERS = set("ٹڈڑںےۓھہگچپژک")
+# Common function words telling Marathi and Nepali apart from Hindi
+_DEVANAGARI_MARKERS = {
+    "mr": {"आहे", "आणि", "आहेत", "मला", "तुम्ही", "काय", "नाही", "आम्ही", "कसे", "पाहिजे"},
+    "ne": {"छ", "छन्", "हो", "गर्न", "मेरो", "तपाईं", "र", "पनि", "गर्नुहोस्", "कति"},
+}
+
+# Small samples per Latin-script language; their character trigrams are the model.
+LATIN_SAMPLES = {
+    "en": "I want to book a train ticket from Mumbai to Delhi for next Friday. What is the cheapest flight "
+          "and how long does the journey take? Please show me hotels near the station with free breakfast. "
+          "Can you plan a three day trip for my family? We would like to see the old city and the beach, "
+          "and we need a taxi from the airport. The weather should be good this week and the prices are "
+          "lower than usual. Thank you for your help, that sounds great. Hello, hi there! Yes, okay, "
+          "where can I find the cheapest hotels?",
+    # Romanized Hindi (Hinglish), the most common way users type Hindi here. Kept
+    # free of English loanwords and place names, which English queries share.
+    "hi": "Mujhe kal subah jana hai, sabse sasti gaadi kaun si hai? Kya aap mere liye yeh kaam kar sakte "
+          "ho? Mere paas das hazaar rupaye hain. Humein teen din ke liye rehne ki jagah chahiye, paas mein "
+          "ho toh accha hai. Wahan ghoomne ki kya jagah hai, batao na. Bhai, kitna samay lagega aur kiraya "
+          "kitna hoga? Theek hai, dhanyavaad, bahut accha laga. Mujhe apne parivaar ke saath jaana hai, hum "
+          "chaar log hain. Aaj raat ko koi gaadi milegi kya? Haan ji, mujhe yeh wala pasand hai, isko pakka "
+          "kar do. Nahi, mujhe waapas aana hai agle hafte. Kahan se kahan tak, aur kab nikalna hai?",
+    "es": "Quiero reservar un billete de tren de Madrid a Barcelona para el próximo viernes. ¿Cuál es el "
+          "vuelo más barato y cuánto dura el viaje? Por favor, muéstrame hoteles cerca de la estación con "
+          "desayuno incluido. ¿Puedes planificar un viaje de tres días para mi familia? Nos gustaría ver "
+          "la ciudad antigua y la playa, y necesitamos un taxi desde el aeropuerto. Muchas gracias por tu ayuda.",
+    "fr": "Je voudrais réserver un billet de train de Paris à Lyon pour vendredi prochain. Quel est le vol "
+          "le moins cher et combien de temps dure le voyage ? Montrez-moi des hôtels près de la gare avec "
+          "le petit déjeuner compris. Pouvez-vous organiser un voyage de trois jours pour ma famille ? Nous "
+          "aimerions voir la vieille ville et la plage, et nous avons besoin d'un taxi depuis l'aéroport. Merci beaucoup.",
+    "de": "Ich möchte eine Zugfahrkarte von Berlin nach München für nächsten Freitag buchen. Welcher Flug "
+          "ist am günstigsten und wie lange dauert die Reise? Bitte zeigen Sie mir Hotels in der Nähe des "
+          "Bahnhofs mit Frühstück. Können Sie eine dreitägige Reise für meine Familie planen? Wir würden "
+          "gerne die Altstadt und den Strand sehen, und wir brauchen ein Taxi vom Flughafen. Vielen Dank für Ihre Hilfe.",
+    "it": "Vorrei prenotare un biglietto del treno da Roma a Milano per venerdì prossimo. Qual è il volo più "
+          "economico e quanto dura il viaggio? Per favore mostrami degli alberghi vicino alla stazione con la "
+          "colazione inclusa. Puoi organizzare un viaggio di tre giorni per la mia famiglia? Vorremmo vedere "
+          "la città vecchia e la spiaggia, e ci serve un taxi dall'aeroporto. Grazie mille per il tuo aiuto.",
+    "pt": "Eu quero reservar uma passagem de trem de Lisboa para o Porto na próxima sexta-feira. Qual é o voo "
+          "mais barato e quanto tempo dura a viagem? Por favor, mostre-me hotéis perto da estação com café da "
+          "manhã incluído. Você pode planejar uma viagem de três dias para a minha família? Gostaríamos de ver "
+          "a cidade velha e a praia, e precisamos de um táxi do aeroporto. Muito obrigado pela sua ajuda.",
+    "nl": "Ik wil een treinkaartje van Amsterdam naar Utrecht boeken voor volgende vrijdag. Wat is de "
+          "goedkoopste vlucht en hoe lang duurt de reis? Laat me alstublieft hotels zien in de buurt van het "
+          "station met ontbijt. Kunt u een reis van drie dagen voor mijn gezin plannen? We willen graag de oude "
+          "stad en het strand zien, en we hebben een taxi vanaf het vliegveld nodig. Hartelijk dank voor uw hulp.",
+    "sv": "Jag vill boka en tågbiljett från Stockholm till Göteborg nästa fredag. Vilket är det billigaste "
+          "flyget och hur lång tid tar resan? Visa mig hotell nära stationen med frukost. Kan du planera en "
+          "resa på tre dagar för min familj? Vi skulle vilja se gamla stan och stranden, och vi behöver en "
+          "taxi från flygplatsen. Tack så mycket för hjälpen, det låter bra.",
+    "da": "Jeg vil gerne bestille en togbillet fra København til Aarhus på fredag. Hvad er det billigste fly, "
+          "og hvor lang tid tager rejsen? Vis mig venligst hoteller tæt på stationen med morgenmad. Kan du "
+          "planlægge en rejse på tre dage for min familie? Vi vil gerne se den gamle by og stranden, og vi har "
+          "brug for en taxa fra lufthavnen. Mange tak for hjælpen, det lyder godt.",
+    "no": "Jeg vil bestille en togbillett fra Oslo til Bergen neste fredag. Hva er den billigste flyreisen, og "
+          "hvor lang tid tar reisen? Vis meg hoteller i nærheten av stasjonen med frokost. Kan du planlegge en "
+          "tur på tre dager for familien min? Vi vil gjerne se gamlebyen og stranden, og vi trenger en drosje "
+          "fra flyplassen. Tusen takk for hjelpen, det høres bra ut.",
+    "fi": "Haluan varata junalipun Helsingistä Tampereelle ensi perjantaiksi. Mikä on halvin lento ja kuinka "
+          "kauan matka kestää? Näytä minulle hotelleja aseman läheltä, joissa on aamiainen. Voitko suunnitella "
+          "kolmen päivän matkan perheelleni? Haluaisimme nähdä vanhankaupungin ja rannan, ja tarvitsemme taksin "
+          "lentokentältä. Kiitos paljon avustasi, se kuulostaa hyvältä.",
+    "pl": "Chcę zarezerwować bilet na pociąg z Warszawy do Krakowa na przyszły piątek. Który lot jest "
+          "najtańszy i jak długo trwa podróż? Proszę pokaż mi hotele w pobliżu dworca ze śniadaniem. Czy "
+          "możesz zaplanować trzydniową wycieczkę dla mojej rodziny? Chcielibyśmy zobaczyć stare miasto i "
+          "plażę, i potrzebujemy taksówki z lotniska. Dziękuję bardzo za pomoc, to brzmi świetnie.",
+    "tr": "Gelecek cuma için İstanbul'dan Ankara'ya bir tren bileti ayırtmak istiyorum. En ucuz uçuş hangisi "
+          "ve yolculuk ne kadar sürüyor? Lütfen bana istasyonun yakınında kahvaltılı oteller göster. Ailem için "
+          "üç günlük bir gezi planlayabilir misin? Eski şehri ve plajı görmek istiyoruz, ve havalimanından bir "
+          "taksiye ihtiyacımız var. Yardımın için çok teşekkür ederim, harika görünüyor.",
+    "vi": "Tôi muốn đặt vé tàu từ Hà Nội đến Thành phố Hồ Chí Minh vào thứ sáu tới. Chuyến bay nào rẻ nhất "
+          "và hành trình mất bao lâu? Vui lòng cho tôi xem các khách sạn gần nhà ga có bữa sáng. Bạn có thể lên "
+          "kế hoạch cho chuyến đi ba ngày cho gia đình tôi không? Chúng tôi muốn xem phố cổ và bãi biển, và "
+          "chúng tôi cần một chiếc taxi từ sân bay. Cảm ơn bạn rất nhiều vì sự giúp đỡ.",
+}
+
+# Words only romanized Hindi uses; Latin text is never called "hi" without one
+_HINGLISH_MARKERS = {
+    "hai", "hain", "mujhe", "mera", "mere", "meri", "humein", "hum", "kya", "kaise", "kahan", "kab",
+    "kitna", "kitne", "se", "ke", "ki", "ka", "ko", "mein", "nahi", "nahin", "chahiye", "jana", "jaana",
+    "karna", "kar", "aur", "bhai", "accha", "acha", "theek", "haan", "aap", "yeh", "woh", "wala", "batao",
+}
+
+# Labeled inputs for the check below: (text, expected language or None for "below threshold")
+LABELED_CASES = (
+    ("mujhe kal delhi se mumbai jana hai", "hi"),
+    ("kya aap mere liye hotel book kar sakte ho", "hi"),
+    ("hotel in mumbai", "en"),
+    ("book hotel in goa", "en"),
+    ("book train ticket", "en"),
+    ("train to mumbai", "en"),
+    ("Show me the cheapest trains to Chennai tomorrow morning", "en"),
+    ("Je cherche un hôtel pas cher à Marseille", "fr"),
+    ("मुझे कल सुबह दिल्ली से मुंबई की ट्रेन चाहिए", "hi"),
+)
+# Confidence the translation service requires before trusting a local result
+LABELED_MIN_CONFIDENCE = 0.7
+
+# Trigram evidence beyond this many grams no longer sharpens confidence
+_EVIDENCE_CAP = 12
+
+
+_RANGES_SORTED = sorted(SCRIPT_RANGES)
+_RANGE_STARTS = [first for first, _, _ in _RANGES_SORTED]
+
+
+def _script_of(char: str) -> Optional[str]:
+    cp = ord(char)
+    i = bisect.bisect_right(_RANGE_STARTS, cp) - 1
+    if i >= 0 and cp <= _RANGES_SORTED[i][1]:
+        return _RANGES_SORTED[i][2]
+    return None
+
+
+def _latin_trigrams(text: str):
+    # Pad words so beginnings and endings ("th", "ez ") count as features
+    for word in text.split():
+        padded = f" {word} "
+        for i in range(len(padded) - 2):
+            yield padded[i:i + 3]
+
+
+def _letters_only(text: str) -> str:
+    return "".join(c if c.isalpha() or c == "'" else " " for c in text.lower())
+
+
+class LanguageDetector:
+    def __init__(self, samples: Dict[str, str] = LATIN_SAMPLES):
+        """
+        Initialize the in-process language detector.
+
+        Non-Latin scripts are identified by Unicode range (with marker
+        words/letters for Marathi, Nepali and Urdu). Latin-script text is
+        scored with a naive Bayes model over character trigrams built from
+        the samples.
+
+        Args:
+            samples: Language code -> sample text for Latin-script languages
+        """
+        self._languages = list(samples)
+        self._hi_index = self._languages.index("hi") if "hi" in self._languages else None
+        counts = [Counter(_latin_trigrams(_letters_only(text))) for text in samples.values()]
+        vocabulary = sorted(set().union(*counts))
+        self._gram_index = {gram: i for i, gram in enumerate(vocabulary)}
+        # Row per trigram (last row: unseen), column per language: log P(trigram | language)
+        table = np.zeros((len(vocabulary) + 1, len(self._languages)))
+        for col, counter in enumerate(counts):
+            total = sum(counter.values()) + len(vocabulary) + 1
+            for gram, n in counter.items():
+                table[self._gram_index[gram], col] = n
+            table[:, col] = np.log((table[:, col] + 1) / total)
+        self._log_probs = table
+        self._lock = threading.Lock()
+        self._detections = 0
+
+    def detect(self, text: str) -> Tuple[Optional[str], float]:
+        """
+        Detect the language of text.
+
+        Args:
+            text: Text to classify
+
+        Returns:
+            Tuple of (language_code or None, confidence in [0, 1])
+        """
+        with self._lock:
+            self._detections += 1
+        text = unicodedata.normalize("NFC", text or "")
+
+        scripts = Counter()
+        latin = 0
+        for char in text:
+            if char < "ɐ" or "\u1e00" <= char <= "\u1eff":
+                latin += char.isalpha()
+                continue
+            # Counts vowel signs too: Indic matras are not isalpha()
+            lang = _script_of(char)
+            if lang and unicodedata.category(char)[0] in "LM":
+                scripts[lang] += 1
+        letters = latin + sum(scripts.values())
+        if letters == 0:
+            return None, 0.0
+
+        if scripts:
+            lang, count = scripts.most_common(1)[0]
+            # Latin words (place names, brands) inside Indic text are common, so a
+            # non-Latin script decides as soon as it is a sizeable share
+            if count / letters >= 0.25:
+                return self._refine_script(lang, text), round(min(1.0, 0.6 + 0.4 * count / letters), 3)
+            if latin == 0:
+                return lang, round(count / letters, 3)
+
+        return self._detect_latin(text)
+
+    def _refine_script(self, lang: str, text: str) -> str:
+        if lang == "ar" and any(c in _URDU_LETTERS for c in text):
+            return "ur"
+        if lang == "ja" or lang == "zh":
+            # Kanji are shared; kana only appear in Japanese
+            return "ja" if any(0x3040 <= ord(c) <= 0x30FF for c in text) else "zh"
+        if lang == "hi":
+            words = set(text.replace("।", " ").split())
+            hits = {code: len(words & markers) for code, markers in _DEVANAGARI_MARKERS.items()}
+            best = max(hits, key=hits.get)
+            if hits[best] > 0:
+                return best
+        return lang
+
+    def _detect_latin(self, text: str) -> Tuple[Optional[str], float]:
+        grams = list(_latin_trigrams(_letters_only(text)))
+        if not grams:
+            return None, 0.0
+        unseen = len(self._gram_index)
+        rows = [self._gram_index.get(gram, unseen) for gram in grams]
+        scores = self._log_probs[rows].sum(axis=0)
+
+        # Posterior with evidence tempered to _EVIDENCE_CAP grams, so short
+        # inputs ("ok", "hotel") come out uncertain instead of overconfident
+        scale = min(1.0, _EVIDENCE_CAP / len(grams))
+        weights = np.exp((scores - scores.max()) * scale)
+        if self._hi_index is not None and not _HINGLISH_MARKERS.intersection(_letters_only(text).split()):
+            # Shared loanwords and place names alone never make text Hindi
+            weights[self._hi_index] = 0.0
+        best = int(weights.argmax())
+        return self._languages[best], round(float(weights[best] / weights.sum()), 3)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get detector counters.
+
+        Returns:
+            Dictionary with Latin model languages and detections run
+        """
+        with self._lock:
+            return {"latin_languages": sorted(self._languages), "detections": self._detections}
+
+
+# Global instance
+language_detector = LanguageDetector()
+
+
+if __name__ == "__main__":
+    # Labeled check and micro-benchmark: python services/language_detect.py
+    import time
+
+    detector = LanguageDetector()
+    failures = 0
+    for text, expected in LABELED_CASES:
+        lang, confidence = detector.detect(text)
+        got = lang if confidence >= LABELED_MIN_CONFIDENCE else None
+        # English may also come out below the threshold and go to the network detector
+        if got != expected and not (expected == "en" and got is None):
+            failures += 1
+            print(f"MISMATCH {text!r}: expected {expected}, got {lang} ({confidence})")
+    print(f"{len(LABELED_CASES) - failures}/{len(LABELED_CASES)} labeled cases detected as expected")
+
+    samples = [
+        "Show me the cheapest trains to Chennai tomorrow morning",
+        "मुझे कल सुबह दिल्ली से मुंबई की ट्रेन चाहिए",
+        "मला उद्या पुण्याला जायचे आहे",
+        "আমি কাল কলকাতা যেতে চাই",
+        "நாளை சென்னைக்கு ரயில் வேண்டும்",
+        "¿Hay vuelos baratos a Sevilla este fin de semana?",
+        "Je cherche un hôtel pas cher à Marseille",
+        "Wie komme ich am besten zum Hauptbahnhof?",
+        "مجھے کل لاہور جانا ہے",
+        "東京から大阪までの新幹線はいくらですか",
+    ]
+    for sample in samples:
+        print(f"{detector.detect(sample)!s:16} {sample}")
+    rounds = 2000
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for sample in samples:
+            detector.detect(sample)
+    per_call = (time.perf_counter() - start) / (rounds * len(samples)) * 1e6
+    print(f"{per_call:.1f} µs per detection")
@@ -3,8 +3,7 @@ import logging
 from typing import Dict, List, Optional, Any
 from datetime import datetime, timedelta
 from flask_mail import Mail, Message
-from appwrite.client import Client
-from appwrite.services.databases import Databases
+from db import get_appwrite_client, get_databases
 from appwrite.query import Query
 import json
 
@@ -32,11 +31,8 @@ class NotificationService:
     def _init_appwrite(self):
         """Initialize Appwrite client for database operations."""
         try:
-            self.client = Client()
-            self.client.set_endpoint(os.getenv("APPWRITE_ENDPOINT"))
-            self.client.set_project(os.getenv("APPWRITE_PROJECT_ID"))
-            self.client.set_key(os.getenv("APPWRITE_API_KEY"))
-            self.databases = Databases(self.client)
+            self.client = get_appwrite_client()
+            self.databases = get_databases()
             logger.info("Appwrite client initialized successfully")
         except Exception as e:
             logger.error(f"Failed to initialize Appwrite client: {e}")
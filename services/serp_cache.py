@@ -0,0 +1,282 @@
+import os
+import copy
+import json
+import time
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Dict, Optional, Tuple
+from serpapi import GoogleSearch
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Per-engine freshness windows (seconds). Fares move quickly, places don't.
+DEFAULT_ENGINE_TTLS = {
+    "google_flights": 300,
+    "google_hotels": 900,
+    "google_maps": 86400,
+}
+DEFAULT_TTL = 600
+
+# Params that never change the upstream result and must not split the cache
+_IGNORED_PARAMS = {"api_key"}
+
+
+class SingleFlight:
+    def __init__(self, wait_timeout: Optional[float] = None):
+        """
+        Coalesce concurrent calls that share a key into one execution.
+
+        The first caller for a key runs the function; callers that arrive
+        while it is in flight block on the same future and share its result.
+
+        Args:
+            wait_timeout: Max seconds a follower waits for the leader (None = no limit)
+        """
+        self.wait_timeout = wait_timeout
+        self._inflight = {}  # key -> Future
+        self._lock = threading.Lock()
+        self._executions = 0
+        self._coalesced = 0
+
+    def do(self, key: str, fn) -> Tuple[Any, bool]:
+        """
+        Run fn once per in-flight key.
+
+        Args:
+            key: Deduplication key
+            fn: Zero-argument callable doing the real work
+
+        Returns:
+            Tuple of (result, shared) where shared is True for followers
+        """
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._inflight[key] = future
+                self._executions += 1
+            else:
+                self._coalesced += 1
+
+        if not leader:
+            return future.result(timeout=self.wait_timeout), True
+
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result, False
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Get coalescing counters.
+
+        Returns:
+            Dictionary with upstream executions, coalesced (saved) calls and in-flight keys
+        """
+        with self._lock:
+            return {
+                "upstream_calls": self._executions,
+                "coalesced_calls": self._coalesced,
+                "inflight": len(self._inflight),
+            }
+
+
+class SerpCache:
+    def __init__(self, max_entries: int = 512, engine_ttls: Optional[Dict[str, int]] = None,
+                 default_ttl: int = DEFAULT_TTL, singleflight: Optional[SingleFlight] = None):
+        """
+        Initialize the shared SerpAPI response cache.
+
+        Args:
+            max_entries: Maximum number of responses kept before LRU eviction
+            engine_ttls: Mapping of SerpAPI engine name -> TTL in seconds
+            default_ttl: TTL used for engines without an explicit entry
+            singleflight: Coalescer for concurrent misses on the same key
+        """
+        self.max_entries = max_entries
+        self.engine_ttls = dict(DEFAULT_ENGINE_TTLS)
+        if engine_ttls:
+            self.engine_ttls.update(engine_ttls)
+        self.default_ttl = default_ttl
+        self.singleflight = singleflight or SingleFlight()
+
+        self._entries = OrderedDict()  # key -> (expires_at, engine, response)
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expired = 0
+
+    def make_key(self, params: Dict[str, Any]) -> str:
+        """
+        Build a stable cache key from SerpAPI params.
+
+        The api_key and empty values are dropped, numbers and strings are
+        normalized so that e.g. adults=2 and adults="2" share one entry.
+
+        Args:
+            params: SerpAPI request params
+
+        Returns:
+            Cache key string
+        """
+        normalized = {}
+        for k, v in params.items():
+            if k in _IGNORED_PARAMS or v is None or v == "":
+                continue
+            if isinstance(v, str):
+                v = " ".join(v.split())
+                # Free-text queries are case-insensitive upstream; tokens are not
+                if k == "q":
+                    v = v.lower()
+            elif isinstance(v, (int, float)) and not isinstance(v, bool):
+                v = str(v)
+            normalized[k] = v
+        return json.dumps(normalized, sort_keys=True, default=str)
+
+    def ttl_for(self, engine: Optional[str]) -> int:
+        """Return the TTL in seconds for a SerpAPI engine."""
+        return self.engine_ttls.get(engine or "", self.default_ttl)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached response.
+
+        Args:
+            key: Cache key from make_key
+
+        Returns:
+            A private copy of the cached response, or None on miss/expiry
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            expires_at, _, response = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self._expired += 1
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+        # Callers mutate results (e.g. adding gps_coordinates), so never hand out the stored object
+        return copy.deepcopy(response)
+
+    def set(self, key: str, response: Dict[str, Any], engine: Optional[str] = None):
+        """
+        Store a response under key with the TTL of its engine.
+
+        Args:
+            key: Cache key from make_key
+            response: SerpAPI response dict
+            engine: SerpAPI engine name used to pick the TTL
+        """
+        ttl = self.ttl_for(engine)
+        if ttl <= 0 or self.max_entries <= 0:
+            return
+        stored = copy.deepcopy(response)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, engine, stored)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def search(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Cached replacement for GoogleSearch(params).get_dict().
+
+        Concurrent misses for the same key share one upstream request.
+        Error responses are returned to the caller but never cached.
+
+        Args:
+            params: SerpAPI request params (including api_key)
+
+        Returns:
+            SerpAPI response dict
+        """
+        key = self.make_key(params)
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+
+        def fetch():
+            results = GoogleSearch(params).get_dict()
+            if isinstance(results, dict) and "error" not in results:
+                self.set(key, results, params.get("engine"))
+            return results
+
+        results, _ = self.singleflight.do(key, fetch)
+        # The leader's result object is shared with every follower
+        return copy.deepcopy(results)
+
+    def clear(self):
+        """Drop all cached responses."""
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get cache counters.
+
+        Returns:
+            Dictionary with size, hits, misses, hit_rate, evictions and expired
+        """
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+                "evictions": self._evictions,
+                "expired": self._expired,
+                "engine_ttls": dict(self.engine_ttls),
+                "singleflight": self.singleflight.get_stats(),
+            }
+
+
+def _ttls_from_env() -> Dict[str, int]:
+    """Read per-engine TTL overrides such as SERP_CACHE_TTL_GOOGLE_FLIGHTS=120."""
+    ttls = {}
+    for engine in DEFAULT_ENGINE_TTLS:
+        value = os.getenv(f"SERP_CACHE_TTL_{engine.upper()}")
+        if value and value.isdigit():
+            ttls[engine] = int(value)
+    return ttls
+
+
+# Global instance
+serp_cache = SerpCache(
+    max_entries=int(os.getenv("SERP_CACHE_MAX_ENTRIES", "512")),
+    engine_ttls=_ttls_from_env(),
+    singleflight=SingleFlight(wait_timeout=float(os.getenv("SERP_SINGLEFLIGHT_TIMEOUT", "30"))),
+)
+
+
+def cached_search(params: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Run a SerpAPI search through the shared cache.
+
+    Args:
+        params: SerpAPI request params
+
+    Returns:
+        SerpAPI response dict
+    """
+    return serp_cache.search(params)
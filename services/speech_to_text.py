@@ -1,35 +1,173 @@
 import os
-import whisper
+import time
+import queue
 import tempfile
 import logging
-from typing import Optional, Tuple
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional, Tuple
+from services.audio_decode import SAMPLE_RATE, decode_audio
+from services.vad import vad
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+
+def _rss_bytes() -> int:
+    """Current resident set size of this process (0 if unknown)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+        # Peak rather than current RSS; kilobytes on Linux
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    except Exception:
+        return 0
+
+
 class SpeechToTextService:
-    def __init__(self, model_size: str = "base"):
+    def __init__(self, model_size: str = "base", pool_size: int = 1, threads: int = 0,
+                 device: Optional[str] = None, prewarm: bool = False):
         """
         Initialize the Speech-to-Text service using OpenAI Whisper.
-        
+
+        Nothing is loaded here: whisper (and torch) are imported and the model
+        is loaded on first use, so workers that never transcribe locally stay
+        small and start fast. Up to pool_size model instances are loaded on
+        demand, each used by one transcription at a time.
+
         Args:
             model_size: Whisper model size ("tiny", "base", "small", "medium", "large")
+            pool_size: Maximum model instances (concurrent transcriptions)
+            threads: Torch CPU threads (0 = torch default)
+            device: Torch device such as "cpu" or "cuda" (None = whisper default)
+            prewarm: Load one model in a background thread right away
         """
         self.model_size = model_size
-        self.model = None
-        self._load_model()
-    
+        self.pool_size = max(1, pool_size)
+        self.threads = threads
+        self.device = device
+        self._idle = queue.LifoQueue()  # most recently used instance first
+        self._lock = threading.Lock()
+        self._loaded = 0
+        self._loading = 0
+        self._loads = []  # per instance: {"seconds", "rss_delta_bytes"}
+        self._transcriptions = 0
+        self._waits = 0
+        self._in_memory = 0
+        self._temp_files = 0
+        if prewarm:
+            threading.Thread(target=self.warm, name="whisper-prewarm", daemon=True).start()
+
     def _load_model(self):
-        """Load the Whisper model."""
+        """Load one Whisper model instance."""
+        import whisper
+
+        if self.threads > 0:
+            import torch
+            torch.set_num_threads(self.threads)
         try:
             logger.info(f"Loading Whisper model: {self.model_size}")
-            self.model = whisper.load_model(self.model_size)
-            logger.info("Whisper model loaded successfully")
+            rss_before = _rss_bytes()
+            started = time.perf_counter()
+            model = whisper.load_model(self.model_size, device=self.device)
+            seconds = time.perf_counter() - started
+            rss_delta = _rss_bytes() - rss_before
+            with self._lock:
+                self._loads.append({"seconds": round(seconds, 3), "rss_delta_bytes": rss_delta})
+            logger.info(f"Whisper model loaded successfully in {seconds:.2f}s "
+                        f"(RSS +{rss_delta / 2**20:.0f} MB, now {_rss_bytes() / 2**20:.0f} MB)")
+            return model
         except Exception as e:
             logger.error(f"Failed to load Whisper model: {e}")
             raise
-    
+
+    @contextmanager
+    def _model(self):
+        """Check out a model instance, loading one if the pool has room."""
+        try:
+            model = self._idle.get_nowait()
+        except queue.Empty:
+            model = None
+        waited = False
+        while model is None:
+            with self._lock:
+                grow = self._loaded + self._loading < self.pool_size
+                if grow:
+                    self._loading += 1
+                elif not waited:
+                    waited = True
+                    self._waits += 1
+            if grow:
+                try:
+                    model = self._load_model()
+                    with self._lock:
+                        self._loaded += 1
+                finally:
+                    with self._lock:
+                        self._loading -= 1
+            else:
+                # Re-check periodically in case an in-flight load failed
+                try:
+                    model = self._idle.get(timeout=1.0)
+                except queue.Empty:
+                    pass
+        try:
+            yield model
+        finally:
+            self._idle.put(model)
+
+    def warm(self, instances: int = 1):
+        """
+        Load model instances ahead of the first request.
+
+        Args:
+            instances: Number of instances to have loaded (capped at pool_size)
+        """
+        try:
+            with self._lock:
+                missing = min(instances, self.pool_size) - self._loaded - self._loading
+                self._loading += max(0, missing)
+            for _ in range(max(0, missing)):
+                try:
+                    model = self._load_model()
+                    with self._lock:
+                        self._loaded += 1
+                    self._idle.put(model)
+                finally:
+                    with self._lock:
+                        self._loading -= 1
+        except Exception as e:
+            logger.error(f"Whisper pre-warm failed: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get pool counters.
+
+        Returns:
+            Dictionary with model size, pool usage, per-load time/RSS and current RSS
+        """
+        with self._lock:
+            return {
+                "model_size": self.model_size,
+                "device": self.device,
+                "threads": self.threads,
+                "pool_size": self.pool_size,
+                "loaded": self._loaded,
+                "loading": self._loading,
+                "idle": self._idle.qsize(),
+                "loads": list(self._loads),
+                "transcriptions": self._transcriptions,
+                "waits": self._waits,
+                "in_memory_decodes": self._in_memory,
+                "temp_file_decodes": self._temp_files,
+                "rss_bytes": _rss_bytes(),
+            }
+
     def transcribe_audio(self, file_path: str, language: Optional[str] = None) -> Tuple[str, dict]:
         """
         Transcribe audio file to text using Whisper.
@@ -41,10 +179,69 @@ class SpeechToTextService:
         Returns:
             Tuple of (transcribed_text, metadata)
         """
+        if not os.path.exists(file_path):
+            logger.error(f"Transcription failed: audio file not found: {file_path}")
+            raise FileNotFoundError(f"Audio file not found: {file_path}")
+        logger.info(f"Transcribing audio: {file_path}")
+        return self._transcribe(file_path, language)
+
+    def transcribe_array(self, samples, language: Optional[str] = None) -> Tuple[str, dict]:
+        """
+        Transcribe decoded audio to text using Whisper.
+
+        Args:
+            samples: 16 kHz mono float32 NumPy array
+            language: Optional language code
+
+        Returns:
+            Tuple of (transcribed_text, metadata)
+        """
+        logger.info(f"Transcribing {len(samples) / SAMPLE_RATE:.1f}s of in-memory audio")
+        return self._transcribe(samples, language)
+
+    def transcribe_batch(self, samples_list: List, language: Optional[str] = None) -> List[Tuple[str, dict]]:
+        """
+        Transcribe several short clips with one batched Whisper decode.
+
+        Each clip must fit Whisper's 30 second window; longer audio needs
+        transcribe_array().
+
+        Args:
+            samples_list: 16 kHz mono float32 NumPy arrays
+            language: Optional language code shared by all clips
+
+        Returns:
+            List of (transcribed_text, metadata), in input order
+        """
+        import torch
+        import whisper
+
+        with self._model() as model:
+            n_mels = getattr(getattr(model, "dims", None), "n_mels", 80)
+            mel = torch.stack([
+                whisper.log_mel_spectrogram(whisper.pad_or_trim(samples), n_mels=n_mels)
+                for samples in samples_list
+            ]).to(model.device)
+            options = whisper.DecodingOptions(task="transcribe", language=language, fp16=False)
+            results = model.decode(mel, options)
+        with self._lock:
+            self._transcriptions += len(samples_list)
+
+        out = []
+        for samples, result in zip(samples_list, results):
+            text = result.text.strip()
+            out.append((text, {
+                "language": result.language or "unknown",
+                "duration": round(len(samples) / SAMPLE_RATE, 2),
+                "segments": 1 if text else 0,
+                "confidence": 1.0 - result.no_speech_prob,
+            }))
+        logger.info(f"Batch transcription of {len(samples_list)} clips completed")
+        return out
+
+    def _transcribe(self, source, language: Optional[str]) -> Tuple[str, dict]:
+        """Run Whisper on a file path or sample array."""
         try:
-            if not os.path.exists(file_path):
-                raise FileNotFoundError(f"Audio file not found: {file_path}")
-            
             # Configure transcription options
             options = {
                 "language": language,
@@ -55,8 +252,10 @@ class SpeechToTextService:
             # Remove None values
             options = {k: v for k, v in options.items() if v is not None}
             
-            logger.info(f"Transcribing audio: {file_path}")
-            result = self.model.transcribe(file_path, **options)
+            with self._model() as model:
+                result = model.transcribe(source, **options)
+            with self._lock:
+                self._transcriptions += 1
             
             transcribed_text = result["text"].strip()
             metadata = {
@@ -90,6 +289,64 @@ class SpeechToTextService:
         
         return total_confidence / count if count > 0 else 0.0
     
+    def transcribe_bytes(self, audio_bytes: bytes, language: Optional[str] = None,
+                         suffix: str = ".webm") -> Tuple[str, dict]:
+        """
+        Transcribe uploaded audio bytes to text.
+
+        The bytes are decoded in memory (see services.audio_decode) and
+        trimmed of silence; only formats that can't be decoded that way go
+        through a temporary file.
+
+        Args:
+            audio_bytes: Raw audio upload
+            language: Optional language code
+            suffix: File extension used if a temporary file is needed
+
+        Returns:
+            Tuple of (transcribed_text, metadata)
+
+        Raises:
+            NoSpeechDetected: If the decoded audio holds no speech
+        """
+        samples = decode_audio(audio_bytes)
+        if samples is not None:
+            samples = vad.trim(samples)
+            with self._lock:
+                self._in_memory += 1
+            return self.transcribe_array(samples, language)
+        return self.transcribe_via_file(audio_bytes, language, suffix)
+
+    def transcribe_via_file(self, audio_bytes: bytes, language: Optional[str] = None,
+                            suffix: str = ".webm") -> Tuple[str, dict]:
+        """
+        Transcribe audio bytes through a temporary file, for uploads that
+        could not be decoded in memory.
+
+        Args:
+            audio_bytes: Raw audio upload
+            language: Optional language code
+            suffix: File extension of the temporary file
+
+        Returns:
+            Tuple of (transcribed_text, metadata)
+        """
+        with self._lock:
+            self._temp_files += 1
+        # Create temporary file
+        with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as temp_file:
+            temp_file.write(audio_bytes)
+            temp_file.flush()
+            
+        try:
+            return self.transcribe_audio(temp_file.name, language)
+        finally:
+            # Clean up temporary file
+            try:
+                os.unlink(temp_file.name)
+            except OSError:
+                pass
+
     def transcribe_audio_file(self, audio_file, language: Optional[str] = None) -> Tuple[str, dict]:
         """
         Transcribe audio file object to text.
@@ -101,22 +358,22 @@ class SpeechToTextService:
         Returns:
             Tuple of (transcribed_text, metadata)
         """
-        # Create temporary file
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.webm') as temp_file:
-            audio_file.save(temp_file.name)
-            temp_file.flush()
-            
-            try:
-                return self.transcribe_audio(temp_file.name, language)
-            finally:
-                # Clean up temporary file
-                try:
-                    os.unlink(temp_file.name)
-                except OSError:
-                    pass
+        try:
+            # Callers may already have read the upload
+            audio_file.stream.seek(0)
+        except (AttributeError, OSError):
+            pass
+        suffix = os.path.splitext(getattr(audio_file, "filename", "") or "")[1] or ".webm"
+        return self.transcribe_bytes(audio_file.read(), language, suffix)
 
 # Global instance
-stt_service = SpeechToTextService()
+stt_service = SpeechToTextService(
+    model_size=os.getenv("WHISPER_MODEL_SIZE", "base"),
+    pool_size=int(os.getenv("WHISPER_POOL_SIZE", "1")),
+    threads=int(os.getenv("WHISPER_THREADS", "0")),
+    device=os.getenv("WHISPER_DEVICE") or None,
+    prewarm=os.getenv("WHISPER_PREWARM", "false").lower() in ("1", "true", "yes"),
+)
 
 def transcribe_audio(file_path: str) -> str:
     """
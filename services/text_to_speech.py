@@ -2,11 +2,18 @@
 import os
 from elevenlabs.client import ElevenLabs
 from elevenlabs import save
+from services.tts_cache import tts_audio_cache, audio_key
+
+# Voice ID for "Rachel"
+DEFAULT_VOICE_ID = "21m00Tcm4TlvDq8ikWAM"
+DEFAULT_MODEL_ID = "eleven_multilingual_v2"
 
 class ElevenLabsService:
     def __init__(self):
         """Initializes the ElevenLabs client."""
         self.client = None
+        self.voice_id = os.getenv("ELEVENLABS_VOICE_ID", DEFAULT_VOICE_ID)
+        self.model_id = os.getenv("ELEVENLABS_MODEL_ID", DEFAULT_MODEL_ID)
         try:
             elevenlabs_api_key = os.getenv("ELEVENLABS_API_KEY")
             if not elevenlabs_api_key:
@@ -22,24 +29,75 @@ class ElevenLabsService:
         Returns:
             bytes OR (bytes, metadata_dict)
         """
+        # Identical text (greetings, canned prompts, errors) is served from the cache
+        key = audio_key(text_to_synthesize, self.voice_id, self.model_id)
+        cached = tts_audio_cache.get(key)
+        if cached:
+            audio_bytes, mime = cached
+            return (audio_bytes, {"mime": mime, "source": "cache"})
+
         if not self.client:
             return None
         try:
             # The ElevenLabs client may return an iterator/stream of bytes
             audio_stream = self.client.text_to_speech.convert(
-                voice_id="21m00Tcm4TlvDq8ikWAM",  # Voice ID for "Rachel"
+                voice_id=self.voice_id,
                 text=text_to_synthesize,
-                model_id="eleven_multilingual_v2"
+                model_id=self.model_id
             )
             # Normalize stream -> bytes
             audio_bytes = b"".join(chunk for chunk in audio_stream)
 
             # Best-effort MIME detection: ElevenLabs typically returns mp3; prefer mp3
             metadata = {"mime": "audio/mpeg", "source": "elevenlabs"}
+            tts_audio_cache.put(key, audio_bytes, metadata["mime"])
             return (audio_bytes, metadata)
         except Exception as e:
             print(f"❌ ElevenLabs TTS Error: {e}")
             return None
 
+    def stream_speech(self, text_to_synthesize):
+        """Starts speech synthesis, handing back audio chunks as ElevenLabs produces them.
+
+        A completed stream is stored in the TTS cache; cached text is replayed
+        from there without calling ElevenLabs.
+
+        Returns:
+            (chunk_iterator, metadata_dict) or None if TTS is unavailable
+        """
+        key = audio_key(text_to_synthesize, self.voice_id, self.model_id)
+        cached = tts_audio_cache.get(key)
+        if cached:
+            audio_bytes, mime = cached
+            return (_iter_chunks(audio_bytes), {"mime": mime, "source": "cache"})
+
+        if not self.client:
+            return None
+        audio_stream = self.client.text_to_speech.convert(
+            voice_id=self.voice_id,
+            text=text_to_synthesize,
+            model_id=self.model_id
+        )
+        return (_tee_to_cache(key, audio_stream), {"mime": "audio/mpeg", "source": "elevenlabs"})
+
+
+STREAM_CHUNK_SIZE = 16 * 1024
+
+
+def _iter_chunks(audio_bytes):
+    for start in range(0, len(audio_bytes), STREAM_CHUNK_SIZE):
+        yield audio_bytes[start:start + STREAM_CHUNK_SIZE]
+
+
+def _tee_to_cache(key, audio_stream):
+    """Relay chunks unchanged, caching the audio only if the stream ran to the end."""
+    chunks = []
+    for chunk in audio_stream:
+        if chunk:
+            chunks.append(chunk)
+            yield chunk
+    if chunks:
+        tts_audio_cache.put(key, b"".join(chunks), "audio/mpeg")
+
 # Create a single instance
 tts_service = ElevenLabsService()
\ No newline at end of file
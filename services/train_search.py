@@ -0,0 +1,313 @@
+import os
+import re
+import json
+import logging
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+SORT_KEYS = ("departure", "duration", "fare")
+
+_DURATION_RE = re.compile(r"(?:(\d+)\s*h)?\s*(?:(\d+)\s*m)?", re.IGNORECASE)
+
+
+def _parse_clock(value: Optional[str]) -> Optional[int]:
+    """Convert "HH:MM" into minutes after midnight."""
+    if not value:
+        return None
+    try:
+        hours, minutes = str(value).strip().split(":")[:2]
+        return int(hours) * 60 + int(minutes)
+    except (ValueError, TypeError):
+        return None
+
+
+def _parse_duration(value: Optional[str]) -> Optional[int]:
+    """Convert "15h 40m" into minutes."""
+    if not value:
+        return None
+    match = _DURATION_RE.fullmatch(str(value).strip())
+    if not match or not any(match.groups()):
+        return None
+    return int(match.group(1) or 0) * 60 + int(match.group(2) or 0)
+
+
+def _stop_code(stop: Any) -> str:
+    if isinstance(stop, dict):
+        stop = stop.get("code") or stop.get("station") or ""
+    return str(stop).strip().upper()
+
+
+class _Snapshot:
+    """Immutable set of indexes over one version of trains.json."""
+
+    def __init__(self, trains: List[dict], mtime: Optional[float]):
+        self.trains = trains
+        self.mtime = mtime
+        self.loaded_at = time.time()
+        self.by_route = {}     # (source, destination) -> [train idx]
+        self.by_number = {}    # train_number -> train idx
+        self.by_station = {}   # station code -> {train idx: stop position}
+        self.stops = []        # train idx -> [station codes in running order]
+        self.departure = []    # train idx -> minutes after midnight
+        self.duration = []     # train idx -> minutes
+
+        for idx, train in enumerate(trains):
+            source = str(train.get("source", "")).strip().upper()
+            destination = str(train.get("destination", "")).strip().upper()
+            # Optional intermediate halts; the bundled file only has termini
+            middle = [_stop_code(s) for s in train.get("stops") or train.get("route") or []]
+            stops = [source] + [code for code in middle if code and code not in (source, destination)] + [destination]
+
+            self.stops.append(stops)
+            self.departure.append(_parse_clock(train.get("departure_time")))
+            self.duration.append(_parse_duration(train.get("duration")))
+            self.by_route.setdefault((source, destination), []).append(idx)
+            if train.get("train_number"):
+                self.by_number[str(train["train_number"])] = idx
+            for position, code in enumerate(stops):
+                self.by_station.setdefault(code, {}).setdefault(idx, position)
+
+
+class TrainIndex:
+    def __init__(self, json_path: str, reload_interval: float = 2.0):
+        """
+        Initialize the in-memory train search index.
+
+        All lookups are served from indexes built once per version of the
+        JSON file: (source, destination) -> trains, train number -> train and
+        station -> trains calling there. The file's mtime is checked at most
+        every reload_interval seconds and a changed file is rebuilt off to the
+        side and swapped in with a single reference assignment, so searches
+        never see a half-built index.
+
+        Args:
+            json_path: Path to trains.json
+            reload_interval: Minimum seconds between mtime checks (0 disables reloading)
+        """
+        self.json_path = json_path
+        self.reload_interval = reload_interval
+        self._reload_lock = threading.Lock()
+        self._last_check = time.monotonic()
+        self._reloads = 0
+        self._searches = 0
+        self._snapshot = self._build()
+
+    def _read_mtime(self) -> Optional[float]:
+        try:
+            return os.path.getmtime(self.json_path)
+        except OSError:
+            return None
+
+    def _build(self) -> _Snapshot:
+        """Load the JSON file and build a fresh snapshot."""
+        mtime = self._read_mtime()
+        try:
+            with open(self.json_path, "r") as f:
+                trains = json.load(f)
+            if not isinstance(trains, list):
+                raise ValueError("trains.json must contain a list")
+            print(f"Loaded {len(trains)} trains from {self.json_path}")
+        except Exception as e:
+            print(f"Error loading train data: {e}")
+            trains = []
+        return _Snapshot(trains, mtime)
+
+    def reload(self, force: bool = False) -> bool:
+        """
+        Rebuild the index if the JSON file changed on disk.
+
+        A file that fails to parse keeps the previous index in service.
+
+        Args:
+            force: Rebuild even if the mtime is unchanged
+
+        Returns:
+            True if a new snapshot was swapped in
+        """
+        with self._reload_lock:
+            return self._reload_locked(force)
+
+    def _reload_locked(self, force: bool = False) -> bool:
+        """Body of reload(). Caller must hold the reload lock."""
+        self._last_check = time.monotonic()
+        current = self._snapshot
+        mtime = self._read_mtime()
+        if not force and (mtime is None or mtime == current.mtime):
+            return False
+        snapshot = self._build()
+        if not snapshot.trains and current.trains:
+            logger.error(f"Keeping previous train index, {self.json_path} produced no trains")
+            return False
+        self._snapshot = snapshot
+        self._reloads += 1
+        logger.info(f"Train index reloaded with {len(snapshot.trains)} trains")
+        return True
+
+    def _current(self) -> _Snapshot:
+        """Return the live snapshot, reloading first if the file changed."""
+        if self.reload_interval > 0 and time.monotonic() - self._last_check >= self.reload_interval:
+            # Only one request pays for the stat/rebuild, the rest keep using the old snapshot
+            if self._reload_lock.acquire(blocking=False):
+                try:
+                    self._reload_locked()
+                finally:
+                    self._reload_lock.release()
+        return self._snapshot
+
+    @property
+    def trains(self) -> List[dict]:
+        """All trains of the live snapshot, in file order."""
+        return self._current().trains
+
+    def get_train(self, train_number: str) -> Optional[dict]:
+        """
+        Look up a train by number.
+
+        Args:
+            train_number: Train number, e.g. "12951"
+
+        Returns:
+            Train dict or None
+        """
+        snapshot = self._current()
+        idx = snapshot.by_number.get(str(train_number).strip())
+        return snapshot.trains[idx] if idx is not None else None
+
+    def trains_at_station(self, code: str) -> List[dict]:
+        """
+        List every train calling at a station.
+
+        Args:
+            code: Station code
+
+        Returns:
+            List of train dicts
+        """
+        snapshot = self._current()
+        return [snapshot.trains[idx] for idx in sorted(snapshot.by_station.get(code.strip().upper(), {}))]
+
+    def search(self, source: str, destination: str, via: Optional[str] = None,
+               depart_after: Optional[str] = None, depart_before: Optional[str] = None,
+               travel_class: Optional[str] = None, sort_by: Optional[str] = None) -> List[dict]:
+        """
+        Find trains running from source to destination.
+
+        Trains whose termini match come straight from the route index; trains
+        listing intermediate stops also match when source is called at before
+        destination. Those partial-segment results are copies carrying
+        board_at/alight_at; their departure and duration are the whole run's.
+
+        Args:
+            source: Boarding station code
+            destination: Alighting station code
+            via: Station the train must call at between source and destination
+            depart_after: Earliest departure "HH:MM"
+            depart_before: Latest departure "HH:MM"
+            travel_class: Class the train must offer, e.g. "3A"
+            sort_by: One of "departure", "duration", "fare" (file order if None)
+
+        Returns:
+            List of train dicts
+        """
+        snapshot = self._current()
+        self._searches += 1
+        source = (source or "").strip().upper()
+        destination = (destination or "").strip().upper()
+        via = (via or "").strip().upper() or None
+        travel_class = (travel_class or "").strip().upper() or None
+
+        # (train idx, is a partial segment)
+        matches = [(idx, False) for idx in snapshot.by_route.get((source, destination), [])]
+        at_source = snapshot.by_station.get(source, {})
+        at_destination = snapshot.by_station.get(destination, {})
+        smaller, other = (at_source, at_destination) if len(at_source) <= len(at_destination) else (at_destination, at_source)
+        for idx in smaller:
+            if idx not in other or len(snapshot.stops[idx]) <= 2:
+                continue
+            if at_source[idx] < at_destination[idx]:
+                stops = snapshot.stops[idx]
+                if stops[0] != source or stops[-1] != destination:
+                    matches.append((idx, True))
+
+        if via:
+            at_via = snapshot.by_station.get(via, {})
+            matches = [
+                (idx, partial) for idx, partial in matches
+                if idx in at_via and at_source[idx] < at_via[idx] < at_destination[idx]
+            ]
+
+        after = _parse_clock(depart_after)
+        before = _parse_clock(depart_before)
+        if after is not None or before is not None:
+            def in_window(idx):
+                departure = snapshot.departure[idx]
+                if departure is None:
+                    return False
+                if after is not None and before is not None and after > before:
+                    # Window wraps midnight, e.g. 22:00 -> 04:00
+                    return departure >= after or departure <= before
+                return (after is None or departure >= after) and (before is None or departure <= before)
+            matches = [m for m in matches if in_window(m[0])]
+
+        if travel_class:
+            matches = [m for m in matches if travel_class in (snapshot.trains[m[0]].get("classes") or {})]
+
+        if sort_by in SORT_KEYS:
+            def fare(idx):
+                classes = snapshot.trains[idx].get("classes") or {}
+                if travel_class:
+                    return classes.get(travel_class, float("inf"))
+                return min(classes.values(), default=float("inf"))
+
+            key_funcs = {
+                "departure": lambda idx: snapshot.departure[idx],
+                "duration": lambda idx: snapshot.duration[idx],
+                "fare": fare,
+            }
+            key_func = key_funcs[sort_by]
+
+            def sort_key(match):
+                value = key_func(match[0])
+                # Trains missing the sort field go last instead of breaking the sort
+                return (value is None, value if value is not None else 0)
+            matches.sort(key=sort_key)
+
+        results = []
+        for idx, partial in matches:
+            train = snapshot.trains[idx]
+            if partial:
+                train = {**train, "board_at": source, "alight_at": destination}
+            results.append(train)
+        return results
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get index counters.
+
+        Returns:
+            Dictionary with train/route/station counts, reloads and searches
+        """
+        snapshot = self._snapshot
+        return {
+            "total_trains": len(snapshot.trains),
+            "routes": len(snapshot.by_route),
+            "stations": len(snapshot.by_station),
+            "loaded_at": snapshot.loaded_at,
+            "file_mtime": snapshot.mtime,
+            "reloads": self._reloads,
+            "searches": self._searches,
+        }
+
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Global instance
+train_index = TrainIndex(
+    os.getenv("TRAINS_JSON_PATH", os.path.join(_ROOT, "static", "js", "trains.json")),
+    reload_interval=float(os.getenv("TRAINS_RELOAD_INTERVAL", "2")),
+)
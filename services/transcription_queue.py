@@ -0,0 +1,259 @@
+import os
+import time
+import queue
+import logging
+import threading
+from collections import deque
+from concurrent.futures import Future
+from typing import Any, Dict, List, Optional, Tuple
+
+from services.audio_decode import SAMPLE_RATE, decode_audio
+from services.speech_to_text import SpeechToTextService, stt_service
+from services.vad import vad
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Whisper decodes one 30 s window per clip; anything longer needs the full transcribe loop
+BATCHABLE_SECONDS = 30.0
+
+_LATENCY_SAMPLES = 500
+
+
+class TranscriptionQueueFull(Exception):
+    """Raised when the transcription backlog is at capacity."""
+
+
+class _Clip:
+    __slots__ = ("samples", "audio_bytes", "language", "suffix", "future", "enqueued")
+
+    def __init__(self, samples, audio_bytes, language, suffix):
+        self.samples = samples
+        self.audio_bytes = audio_bytes
+        self.language = language
+        self.suffix = suffix
+        self.future = Future()
+        self.enqueued = time.perf_counter()
+
+    @property
+    def batchable(self) -> bool:
+        return self.samples is not None and len(self.samples) <= BATCHABLE_SECONDS * SAMPLE_RATE
+
+
+class TranscriptionQueue:
+    def __init__(self, stt: SpeechToTextService, max_pending: int = 32, workers: int = 1,
+                 batch_window_ms: float = 15, max_batch: int = 8):
+        """
+        Initialize the transcription scheduler.
+
+        Uploads reserve a queue slot, are decoded in the request thread and
+        queued for a fixed set of workers, so Whisper never runs more
+        transcriptions than there are model instances. Uploads arriving at
+        capacity are rejected before any decoding. A worker that picks up a short clip waits up to
+        batch_window_ms for more short clips in the same language and
+        decodes them as one batch.
+
+        Args:
+            stt: Service providing the Whisper model pool
+            max_pending: Clips decoding or queued before submit() rejects new ones
+            workers: Worker threads (match the model pool size)
+            batch_window_ms: How long a worker waits to fill a batch
+            max_batch: Maximum clips decoded together
+        """
+        self.stt = stt
+        self.max_pending = max(1, max_pending)
+        self.workers = max(1, workers)
+        self.batch_window = max(0.0, batch_window_ms) / 1000.0
+        self.max_batch = max(1, max_batch)
+        self._queue = queue.Queue()
+        # One slot per clip being decoded or waiting; freed when a worker picks it up
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._lock = threading.Lock()
+        self._threads = []
+        self._busy = 0
+        self._submitted = 0
+        self._rejected = 0
+        self._completed = 0
+        self._failed = 0
+        self._batches = 0
+        self._batched_clips = 0
+        self._largest_batch = 0
+        self._wait_ms = deque(maxlen=_LATENCY_SAMPLES)
+        self._total_ms = deque(maxlen=_LATENCY_SAMPLES)
+
+    def _ensure_workers(self):
+        with self._lock:
+            while len(self._threads) < self.workers:
+                thread = threading.Thread(target=self._worker, name=f"stt-worker-{len(self._threads)}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def submit(self, audio_bytes: bytes, language: Optional[str] = None, suffix: str = ".webm") -> Future:
+        """
+        Queue an upload for transcription.
+
+        Args:
+            audio_bytes: Raw audio upload
+            language: Optional language code
+            suffix: File extension used if the upload needs a temporary file
+
+        Returns:
+            Future resolving to (transcribed_text, metadata)
+
+        Raises:
+            NoSpeechDetected: If the upload holds no speech (nothing is queued)
+            TranscriptionQueueFull: If max_pending clips are already waiting
+        """
+        self._ensure_workers()
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._rejected += 1
+            raise TranscriptionQueueFull(f"Transcription queue is full ({self.max_pending} pending)")
+        try:
+            samples = decode_audio(audio_bytes)
+            if samples is not None:
+                samples = vad.trim(samples)
+        except BaseException:
+            self._slots.release()
+            raise
+        clip = _Clip(samples, audio_bytes, language, suffix)
+        self._queue.put(clip)
+        with self._lock:
+            self._submitted += 1
+        return clip.future
+
+    def transcribe(self, audio_bytes: bytes, language: Optional[str] = None, suffix: str = ".webm",
+                   timeout: Optional[float] = None) -> Tuple[str, dict]:
+        """
+        Queue an upload and wait for its transcription.
+
+        Args:
+            audio_bytes: Raw audio upload
+            language: Optional language code
+            suffix: File extension used if the upload needs a temporary file
+            timeout: Seconds to wait for the result (None = no limit)
+
+        Returns:
+            Tuple of (transcribed_text, metadata)
+        """
+        return self.submit(audio_bytes, language, suffix).result(timeout)
+
+    def _worker(self):
+        while True:
+            batch = [self._take()]
+            if batch[0].batchable and self.batch_window > 0:
+                deadline = time.perf_counter() + self.batch_window
+                while len(batch) < self.max_batch:
+                    remaining = deadline - time.perf_counter()
+                    if remaining <= 0:
+                        break
+                    try:
+                        batch.append(self._take(timeout=remaining))
+                    except queue.Empty:
+                        break
+            with self._lock:
+                self._busy += 1
+            try:
+                self._process(batch)
+            finally:
+                with self._lock:
+                    self._busy -= 1
+
+    def _take(self, timeout: Optional[float] = None) -> _Clip:
+        clip = self._queue.get(timeout=timeout)
+        self._slots.release()
+        return clip
+
+    def _process(self, clips: List[_Clip]):
+        started = time.perf_counter()
+        groups = {}  # language -> batchable clips
+        singles = []
+        for clip in clips:
+            if clip.batchable:
+                groups.setdefault(clip.language, []).append(clip)
+            else:
+                singles.append(clip)
+        for group in groups.values():
+            if len(group) == 1:
+                singles.extend(group)
+                continue
+            try:
+                results = self.stt.transcribe_batch([c.samples for c in group], group[0].language)
+            except Exception as e:
+                logger.error(f"Batched transcription of {len(group)} clips failed, retrying one by one: {e}")
+                singles.extend(group)
+                continue
+            with self._lock:
+                self._batches += 1
+                self._batched_clips += len(group)
+                self._largest_batch = max(self._largest_batch, len(group))
+            for clip, result in zip(group, results):
+                self._finish(clip, started, result=result)
+        for clip in singles:
+            try:
+                if clip.samples is not None:
+                    result = self.stt.transcribe_array(clip.samples, clip.language)
+                else:
+                    # Decoding already failed in submit(); don't run ffmpeg again
+                    result = self.stt.transcribe_via_file(clip.audio_bytes, clip.language, clip.suffix)
+            except Exception as e:
+                self._finish(clip, started, error=e)
+            else:
+                self._finish(clip, started, result=result)
+
+    def _finish(self, clip: _Clip, started: float, result=None, error: Optional[Exception] = None):
+        done = time.perf_counter()
+        with self._lock:
+            self._wait_ms.append((started - clip.enqueued) * 1000)
+            self._total_ms.append((done - clip.enqueued) * 1000)
+            if error is None:
+                self._completed += 1
+            else:
+                self._failed += 1
+        if error is None:
+            clip.future.set_result(result)
+        else:
+            clip.future.set_exception(error)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get scheduler counters.
+
+        Returns:
+            Dictionary with queue depth, throughput counters, batch sizes and
+            per-clip queue-wait/total latency percentiles over recent clips
+        """
+        def pct(samples, p):
+            if not samples:
+                return None
+            ordered = sorted(samples)
+            return round(ordered[min(len(ordered) - 1, int(len(ordered) * p))], 1)
+
+        with self._lock:
+            return {
+                "depth": self._queue.qsize(),
+                "max_pending": self.max_pending,
+                "workers": self.workers,
+                "busy": self._busy,
+                "submitted": self._submitted,
+                "rejected": self._rejected,
+                "completed": self._completed,
+                "failed": self._failed,
+                "batches": self._batches,
+                "batched_clips": self._batched_clips,
+                "largest_batch": self._largest_batch,
+                "wait_ms": {"p50": pct(self._wait_ms, 0.5), "p95": pct(self._wait_ms, 0.95)},
+                "latency_ms": {"p50": pct(self._total_ms, 0.5), "p95": pct(self._total_ms, 0.95),
+                               "max": round(max(self._total_ms), 1) if self._total_ms else None},
+            }
+
+
+# Global instance
+transcription_queue = TranscriptionQueue(
+    stt_service,
+    max_pending=int(os.getenv("STT_QUEUE_MAX", "32")),
+    workers=int(os.getenv("STT_QUEUE_WORKERS", str(stt_service.pool_size))),
+    batch_window_ms=float(os.getenv("STT_BATCH_WINDOW_MS", "15")),
+    max_batch=int(os.getenv("STT_MAX_BATCH", "8")),
+)
@@ -1,16 +1,48 @@
+import os
+import time
 import logging
-from typing import Optional, Tuple, Dict, List
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Optional, Tuple, Dict, List
 from deep_translator import GoogleTranslator, single_detection
+from services.language_detect import language_detector
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class TranslationService:
-    def __init__(self):
+    def __init__(self, cache_size: int = 5000, cache_ttl: int = 7 * 24 * 3600, max_concurrency: int = 8,
+                 min_detect_confidence: float = 0.7):
         """
         Initialize the Translation service using Deep Translator.
+
+        Results (and language detections) are memoized per (source, target,
+        text) in an LRU with a TTL, and one translator object is kept per
+        language pair (per thread, as deep-translator instances carry
+        per-request state).
+
+        Args:
+            cache_size: Maximum memoized results
+            cache_ttl: Seconds a memoized result stays valid
+            max_concurrency: Upstream calls in flight for batch translation
+            min_detect_confidence: Local detections below this ask the network detector
         """
+        self.cache_size = cache_size
+        self.cache_ttl = cache_ttl
+        self.max_concurrency = max(1, max_concurrency)
+        self.min_detect_confidence = min_detect_confidence
+        self._cache = OrderedDict()  # (source, target, text) -> (value, expires_at)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="translate")
+        self._hits = 0
+        self._misses = 0
+        self._upstream_calls = 0
+        self._upstream_errors = 0
+        self._local_detections = 0
+
         # Language code mapping for better compatibility
         self.language_codes = {
             'english': 'en',
@@ -48,9 +80,43 @@ class TranslationService:
             'sv': 'swedish', 'da': 'danish', 'no': 'norwegian', 'fi': 'finnish'
         }
     
+    def _cache_get(self, key: tuple) -> Optional[Any]:
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None:
+                if entry[1] > time.time():
+                    self._cache.move_to_end(key)
+                    self._hits += 1
+                    return entry[0]
+                del self._cache[key]
+            self._misses += 1
+            return None
+
+    def _cache_put(self, key: tuple, value: Any):
+        if self.cache_size <= 0:
+            return
+        with self._lock:
+            self._cache[key] = (value, time.time() + self.cache_ttl)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def _translator(self, source_lang: str, target_lang: str) -> GoogleTranslator:
+        """Translator for a language pair, built once per thread."""
+        translators = getattr(self._local, "translators", None)
+        if translators is None:
+            translators = self._local.translators = {}
+        translator = translators.get((source_lang, target_lang))
+        if translator is None:
+            translator = translators[(source_lang, target_lang)] = GoogleTranslator(source=source_lang, target=target_lang)
+        return translator
+
     def detect_language(self, text: str) -> Tuple[str, float]:
         """
         Detect the language of the given text.
+
+        Runs in-process (services.language_detect); the network detector is
+        only asked when the local confidence is below min_detect_confidence.
         
         Args:
             text: Text to detect language for
@@ -58,11 +124,29 @@ class TranslationService:
         Returns:
             Tuple of (language_code, confidence)
         """
+        local_lang, local_confidence = language_detector.detect(text)
+        if local_lang and local_confidence >= self.min_detect_confidence:
+            with self._lock:
+                self._local_detections += 1
+            return local_lang, local_confidence
+
+        key = ("", "detect", text)
+        cached = self._cache_get(key)
+        if cached is not None:
+            return cached
         try:
+            with self._lock:
+                self._upstream_calls += 1
             detected_lang = single_detection(text)
-            return detected_lang, 0.8  # Deep translator doesn't provide confidence
+            result = (detected_lang, 0.8)  # Deep translator doesn't provide confidence
+            self._cache_put(key, result)
+            return result
         except Exception as e:
+            with self._lock:
+                self._upstream_errors += 1
             logger.error(f"Language detection failed: {e}")
+            if local_lang:
+                return local_lang, local_confidence
             return 'en', 0.0
     
     def translate_text(self, text: str, source_lang: str, target_lang: str) -> str:
@@ -77,16 +161,50 @@ class TranslationService:
         Returns:
             Translated text
         """
-        if source_lang == target_lang:
+        if source_lang == target_lang or not text or not text.strip():
             return text
-        
+
+        key = (source_lang, target_lang, text)
+        cached = self._cache_get(key)
+        if cached is not None:
+            return cached
         try:
-            translator = GoogleTranslator(source=source_lang, target=target_lang)
-            result = translator.translate(text)
+            with self._lock:
+                self._upstream_calls += 1
+            result = self._translator(source_lang, target_lang).translate(text)
+            if result is None:
+                return text
+            # Failures fall through to the original text and are not cached
+            self._cache_put(key, result)
             return result
         except Exception as e:
+            with self._lock:
+                self._upstream_errors += 1
             logger.error(f"Translation failed: {e}")
             return text
+
+    def translate_batch(self, texts: List[str], source_lang: str, target_lang: str) -> List[str]:
+        """
+        Translate many strings, e.g. the UI labels of a page, in one call.
+
+        Duplicates and cached strings cost nothing; the rest are translated
+        with at most max_concurrency upstream calls in flight.
+
+        Args:
+            texts: Strings to translate
+            source_lang: Source language code ('auto' to let the translator detect it)
+            target_lang: Target language code
+
+        Returns:
+            Translated strings, in input order (originals where translation failed)
+        """
+        unique = list(dict.fromkeys(texts))
+        if len(unique) <= 1:
+            translated = {text: self.translate_text(text, source_lang, target_lang) for text in unique}
+        else:
+            results = self._executor.map(lambda text: self.translate_text(text, source_lang, target_lang), unique)
+            translated = dict(zip(unique, results))
+        return [translated[text] for text in texts]
     
     def detect_and_translate(self, text: str, target_lang: str = 'en') -> Tuple[str, str, float]:
         """
@@ -168,8 +286,34 @@ class TranslationService:
         normalized = self.language_codes.get(lang_input.lower(), lang_input.lower())
         return normalized
 
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get cache counters.
+
+        Returns:
+            Dictionary with cache size, hits/misses and upstream call counts
+        """
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries": len(self._cache),
+                "max_entries": self.cache_size,
+                "ttl": self.cache_ttl,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+                "upstream_calls": self._upstream_calls,
+                "upstream_errors": self._upstream_errors,
+                "local_detections": self._local_detections,
+            }
+
 # Global instance
-translation_service = TranslationService()
+translation_service = TranslationService(
+    cache_size=int(os.getenv("TRANSLATE_CACHE_SIZE", "5000")),
+    cache_ttl=int(os.getenv("TRANSLATE_CACHE_TTL", str(7 * 24 * 3600))),
+    max_concurrency=int(os.getenv("TRANSLATE_CONCURRENCY", "8")),
+    min_detect_confidence=float(os.getenv("LANGDETECT_MIN_CONFIDENCE", "0.7")),
+)
 
 def detect_and_translate(text: str, target_lang: str = 'en') -> Tuple[str, str]:
     """
@@ -0,0 +1,350 @@
+import os
+import re
+import time
+import logging
+import threading
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Optional, Tuple
+
+from services.iata_resolver import iata_resolver
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Same task vocabulary as the heuristic fallback in trip_planner.extract_trip_details
+TASK_KEYWORDS = [
+    ("plan_itinerary", ("plan", "itinerary", "trip")),
+    ("find_hotels", ("hotel", "hotels", "accommodation", "stay", "room", "rooms")),
+    ("find_flights", ("flight", "flights", "fly", "airline")),
+    ("find_attractions", ("attraction", "attractions", "place", "places", "visit", "see", "tourist", "near")),
+]
+
+# Words a simple request is made of besides its slots; anything else lowers confidence
+FILLER_WORDS = set("""
+a an the me my us our i we please can could would you find show search get book need want looking
+look for to from on in at of and with some any also trip plan make create give days day go going travel budget
+""".split())
+
+# References to earlier turns, edits and open questions need the model
+DEFER_PATTERN = re.compile(
+    r"\b(there|it|same|that|those|them|again|instead|change|modify|cancel|not|don't|dont|except|but|"
+    r"cheaper|weekend|month|what|which|how|why|when|where|should)\b|\?"
+)
+
+MONTHS = {
+    "january": 1, "jan": 1, "february": 2, "feb": 2, "march": 3, "mar": 3, "april": 4, "apr": 4,
+    "may": 5, "june": 6, "jun": 6, "july": 7, "jul": 7, "august": 8, "aug": 8,
+    "september": 9, "sep": 9, "sept": 9, "october": 10, "oct": 10, "november": 11, "nov": 11,
+    "december": 12, "dec": 12,
+}
+_MONTH = "(?:" + "|".join(sorted(MONTHS, key=len, reverse=True)) + ")"
+_DATE = (
+    rf"\d{{4}}-\d{{2}}-\d{{2}}|\d{{1,2}}/\d{{1,2}}/\d{{4}}|today|tomorrow"
+    rf"|\d{{1,2}}(?:st|nd|rd|th)?\s+{_MONTH}(?:,?\s+\d{{4}})?"
+    rf"|{_MONTH}\s+\d{{1,2}}(?:st|nd|rd|th)?(?:,?\s+\d{{4}})?"
+)
+# A place name ends where the next slot or connective begins
+_PLACE_WORD = r"(?!(?:to|from|for|on|in|and|with|the|a|my)\b)[a-z][a-z.'-]*"
+_PLACE = rf"{_PLACE_WORD}(?:\s+{_PLACE_WORD}){{0,2}}?"
+_PLACE_END = rf"(?=\s+(?:on|for|from|in|with|under|around|and|departing|leaving|returning|between|{_DATE}|\d)\b|[,.!]|$)"
+
+PATTERNS = {
+    "from_to": re.compile(rf"\bfrom\s+(?P<origin>{_PLACE})\s+to\s+(?P<destination>{_PLACE}){_PLACE_END}"),
+    "to": re.compile(rf"\bto\s+(?P<destination>{_PLACE}){_PLACE_END}"),
+    "in": re.compile(rf"\bin\s+(?P<destination>{_PLACE}){_PLACE_END}"),
+    "days": re.compile(r"\b(?:for\s+)?(?P<days>\d{1,2})[\s-]*days?\b"),
+    "range": re.compile(rf"\b(?:from\s+)?(?P<start>{_DATE})\s+(?:to|until|till|-)\s+(?P<end>{_DATE})\b"),
+    "return": re.compile(rf"\breturn(?:ing)?\s+(?:on\s+)?(?P<end>{_DATE})\b"),
+    "date": re.compile(rf"\b(?:on\s+|departing\s+|leaving\s+)?(?P<start>{_DATE})\b"),
+    "adults": re.compile(r"\b(?:for\s+)?(?P<adults>\d{1,2})\s+(?:people|persons|adults|travellers|travelers|guests)\b"),
+    "budget_amount": re.compile(
+        r"\b(?:(?:with\s+)?(?:a\s+)?budget\s+(?:of\s+|is\s+)?|under\s+|around\s+|within\s+)"
+        r"(?:rs\.?\s*|inr\s*|₹\s*)?(?P<amount>\d[\d,]*)\s*(?P<unit>k|thousand|lakhs?)?\b"
+        r"(?:\s*(?:rs|inr|rupees))?"
+    ),
+    "budget_word": re.compile(r"\b(?:on\s+a\s+)?(?P<budget>cheap|moderate|luxury|affordable|expensive)\b"),
+    "interests": re.compile(r"\b(?P<interest>beach|hiking|museums|food|shopping)\b"),
+}
+_WORD = re.compile(r"[a-z0-9₹]+(?:'[a-z]+)?")
+
+# Labeled messages for the check below: (message, expected reason, expected details subset)
+LABELED_CASES = (
+    ("flights from Delhi to Mumbai on 2025-11-15", "ok",
+     {"origin": "Delhi", "destination": "Mumbai", "departure_date": "2025-11-15"}),
+    ("plan a trip to Goa for 5 days", "ok", {"destination": "Goa", "days": 5}),
+    ("plan a trip to Manali for 3 days with a budget of 50k", "ok", {"destination": "Manali", "budget": "50000"}),
+    ("show hotels in Goa for 2 people", "ok", {"destination": "Goa", "adults": 2}),
+    ("plan a trip to Mumbai for 4 days and give me budget", "ok", {"destination": "Mumbai", "budget": None}),
+    # A second place after "and" is not captured
+    ("plan a 3 day trip in Goa and Mumbai", "unexplained_words", {}),
+    # A month outside any date pattern would be dropped
+    ("plan a trip to goa in december for 5 days", "unparsed_date", {}),
+    ("flight from Pune to Goa on 31 feb", "invalid_date", {}),
+    # Slots that contradict each other or are empty
+    ("flights to Goa on 15 nov returning on 10 nov", "invalid_date", {}),
+    ("plan a trip to Goa for 0 days", "invalid_count", {}),
+    ("show hotels in Goa for 0 people", "invalid_count", {}),
+    ("plan a trip to relax for 5 days", "low_confidence", {}),
+    ("what should I see there?", "needs_model", {}),
+    ("for 5 days", "no_task", {}),
+)
+
+
+def _to_iso(text: str, today: date) -> Optional[str]:
+    """Parse one of the _DATE forms; dates without a year take the next occurrence."""
+    text = text.strip().replace(",", "")
+    if text == "today":
+        return today.isoformat()
+    if text == "tomorrow":
+        return (today + timedelta(days=1)).isoformat()
+    try:
+        if re.fullmatch(r"\d{4}-\d{2}-\d{2}", text):
+            return datetime.strptime(text, "%Y-%m-%d").date().isoformat()
+        m = re.fullmatch(r"(\d{1,2})/(\d{1,2})/(\d{4})", text)
+        if m:
+            return date(int(m.group(3)), int(m.group(2)), int(m.group(1))).isoformat()
+        parts = re.sub(r"(\d)(?:st|nd|rd|th)\b", r"\1", text).split()
+        month = next(MONTHS[p] for p in parts if p in MONTHS)
+        numbers = [int(p) for p in parts if p.isdigit()]
+        day = numbers[0]
+        if len(numbers) > 1:
+            return date(numbers[1], month, day).isoformat()
+        candidate = date(today.year, month, day)
+        if candidate < today:
+            candidate = date(today.year + 1, month, day)
+        return candidate.isoformat()
+    except (ValueError, StopIteration, IndexError):
+        return None
+
+
+class FastTripParser:
+    def __init__(self, min_confidence: float = 0.85, unknown_place_weight: float = 0.9):
+        """
+        Initialize the local trip request parser.
+
+        Covers the simple requests most chat traffic consists of ("flights
+        from Delhi to Mumbai on 2025-11-15", "plan a trip to Goa for 5
+        days") with patterns compiled at import. Every word must be
+        explained by a recognized slot, task keyword or filler word, and
+        every date must parse; confidence is then scaled down for place
+        names that are neither known airports nor capitalized. Anything
+        referring to earlier turns, editing a plan or asking a question is
+        left to the model.
+
+        Args:
+            min_confidence: Confidence required to skip the model
+            unknown_place_weight: Confidence factor for a capitalized place
+                that is not in the airport list
+        """
+        self.min_confidence = min_confidence
+        self.unknown_place_weight = unknown_place_weight
+        self._lock = threading.Lock()
+        self._attempts = 0
+        self._hits = 0
+        self._misses = {}  # reason -> count
+        self._parse_seconds = 0.0
+
+    def _place(self, phrase: str, original: str) -> Tuple[Optional[str], float]:
+        """Return (display name, confidence factor) for a matched place phrase."""
+        words = phrase.split()
+        if not words or any(w in FILLER_WORDS for w in words):
+            return None, 0.0
+        if iata_resolver.lookup(phrase)["status"] in ("exact", "alias"):
+            return phrase.title(), 1.0
+        # Speech transcripts and typed requests capitalize real place names
+        m = re.search(re.escape(phrase), original, re.IGNORECASE)
+        if m and all(w[:1].isupper() for w in m.group(0).split()):
+            return m.group(0), self.unknown_place_weight
+        return phrase.title(), 0.5
+
+    def parse(self, text: str, has_history: bool = False) -> Tuple[Optional[Dict[str, Any]], float, str]:
+        """
+        Parse a request without the model.
+
+        Args:
+            text: User message
+            has_history: Whether earlier turns exist that the model could
+                draw missing details from
+
+        Returns:
+            Tuple of (result in extract_trip_details format or None,
+            confidence, reason); reason is "ok" or why the result is unsure
+        """
+        original = " ".join(str(text or "").split())
+        lower = original.lower()
+        if not lower or len(lower) > 200:
+            return None, 0.0, "length"
+        if DEFER_PATTERN.search(lower):
+            return None, 0.0, "needs_model"
+
+        today = date.today()
+        spans = []
+        bad_dates = []
+        details = {"destination": None, "origin": None, "days": None, "departure_date": None,
+                   "return_date": None, "budget": None, "interests": [], "adults": None}
+        factor = 1.0
+
+        def take(match):
+            spans.append(match.span())
+            return match
+
+        m = PATTERNS["from_to"].search(lower) or PATTERNS["to"].search(lower) or PATTERNS["in"].search(lower)
+        if m:
+            take(m)
+            for slot in ("origin", "destination"):
+                phrase = m.groupdict().get(slot)
+                if phrase:
+                    details[slot], weight = self._place(phrase, original)
+                    factor = min(factor, weight)
+
+        m = PATTERNS["range"].search(lower)
+        if m:
+            take(m)
+            details["departure_date"] = _to_iso(m.group("start"), today)
+            details["return_date"] = _to_iso(m.group("end"), today)
+            if details["departure_date"] is None or details["return_date"] is None:
+                bad_dates.append(m.group(0))
+        else:
+            m = PATTERNS["return"].search(lower)
+            if m:
+                take(m)
+                details["return_date"] = _to_iso(m.group("end"), today)
+                if details["return_date"] is None:
+                    bad_dates.append(m.group("end"))
+            for m in PATTERNS["date"].finditer(lower):
+                if not any(s <= m.start() < e for s, e in spans):
+                    take(m)
+                    details["departure_date"] = _to_iso(m.group("start"), today)
+                    if details["departure_date"] is None:
+                        bad_dates.append(m.group("start"))
+                    break
+
+        m = PATTERNS["days"].search(lower)
+        if m:
+            take(m)
+            details["days"] = int(m.group("days"))
+        m = PATTERNS["adults"].search(lower)
+        if m:
+            take(m)
+            details["adults"] = int(m.group("adults"))
+        m = PATTERNS["budget_amount"].search(lower)
+        if m:
+            take(m)
+            amount = int(m.group("amount").replace(",", ""))
+            unit = m.group("unit") or ""
+            amount *= 100000 if unit.startswith("lakh") else 1000 if unit in ("k", "thousand") else 1
+            details["budget"] = str(amount)
+        else:
+            m = PATTERNS["budget_word"].search(lower)
+            if m:
+                take(m)
+                details["budget"] = m.group("budget")
+        for m in PATTERNS["interests"].finditer(lower):
+            take(m)
+            details["interests"].append(m.group("interest"))
+
+        words = _WORD.findall(lower)
+        tasks = [task for task, keywords in TASK_KEYWORDS if any(w in keywords for w in words)]
+
+        # Words outside every matched span that are neither keywords nor filler
+        residual = list(lower)
+        for start, end in spans:
+            residual[start:end] = " " * (end - start)
+        keywords = {w for _, kws in TASK_KEYWORDS for w in kws}
+        leftover = _WORD.findall("".join(residual))
+        unexplained = [w for w in leftover if w not in FILLER_WORDS and w not in keywords]
+        confidence = round((1 - len(unexplained) / max(1, len(words))) * factor, 3)
+
+        if not tasks:
+            return None, confidence, "no_task"
+        # A date the user gave must not be silently dropped or turned into None
+        if bad_dates:
+            return None, confidence, "invalid_date"
+        # ISO dates compare as strings
+        if details["departure_date"] and details["return_date"] and details["return_date"] < details["departure_date"]:
+            return None, confidence, "invalid_date"
+        if details["days"] == 0 or details["adults"] == 0:
+            return None, confidence, "invalid_count"
+        if any(w in MONTHS for w in leftover):
+            return None, confidence, "unparsed_date"
+        # Anything unexplained (a second place after "and", a vague qualifier)
+        # would be lost; the model reads the whole message
+        if unexplained:
+            return None, confidence, "unexplained_words"
+        if not details["destination"]:
+            return None, confidence, "no_destination"
+        if has_history and "find_flights" in tasks and not (details["origin"] and details["departure_date"]):
+            # The model fills these from earlier turns
+            return None, confidence, "needs_context"
+        if has_history and "plan_itinerary" in tasks and not details["days"]:
+            return None, confidence, "needs_context"
+        if confidence < self.min_confidence:
+            return None, confidence, "low_confidence"
+        return {"tasks": tasks, "details": details}, confidence, "ok"
+
+    def try_parse(self, text: str, has_history: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        Parse a request locally if confident enough, counting the outcome.
+
+        Args:
+            text: User message
+            has_history: Whether earlier turns exist
+
+        Returns:
+            Result in extract_trip_details format, or None to use the model
+        """
+        started = time.perf_counter()
+        try:
+            result, confidence, reason = self.parse(text, has_history)
+        except Exception as e:
+            logger.error(f"Fast trip parse failed for {text!r}: {e}")
+            result, confidence, reason = None, 0.0, "error"
+        with self._lock:
+            self._attempts += 1
+            self._parse_seconds += time.perf_counter() - started
+            if result is not None:
+                self._hits += 1
+            else:
+                self._misses[reason] = self._misses.get(reason, 0) + 1
+        if result is not None:
+            logger.debug(f"Fast-path trip parse (confidence {confidence}): {result}")
+        return result
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get fast-path counters.
+
+        Returns:
+            Dictionary with attempts, hits, hit_rate, misses by reason and
+            average parse time
+        """
+        with self._lock:
+            return {
+                "min_confidence": self.min_confidence,
+                "attempts": self._attempts,
+                "hits": self._hits,
+                "hit_rate": round(self._hits / self._attempts, 4) if self._attempts else 0.0,
+                "misses": dict(self._misses),
+                "avg_parse_ms": round(self._parse_seconds / self._attempts * 1000, 3) if self._attempts else 0.0,
+            }
+
+
+# Global instance
+fast_trip_parser = FastTripParser(
+    min_confidence=float(os.getenv("FAST_PARSE_MIN_CONFIDENCE", "0.85")),
+)
+
+
+if __name__ == "__main__":
+    # Check the labeled cases: python -m services.trip_parser
+    parser = FastTripParser()
+    failures = 0
+    for message, expected_reason, expected in LABELED_CASES:
+        result, confidence, reason = parser.parse(message)
+        details = result["details"] if result else {}
+        wrong = {k: details.get(k) for k, v in expected.items() if details.get(k) != v}
+        if reason != expected_reason or wrong:
+            failures += 1
+            print(f"MISMATCH {message!r}: expected {expected_reason}, got {reason} ({confidence}); wrong slots {wrong}")
+    print(f"{len(LABELED_CASES) - failures}/{len(LABELED_CASES)} labeled cases parsed as expected")
@@ -0,0 +1,283 @@
+import os
+import time
+import hashlib
+import logging
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_CACHE_DIR = os.path.join(_ROOT, ".cache", "tts")
+
+_EXTENSIONS = {"audio/mpeg": ".mp3", "audio/wav": ".wav", "audio/ogg": ".ogg"}
+_MIME_BY_EXT = {ext: mime for mime, ext in _EXTENSIONS.items()}
+
+# Don't rewrite a file's mtime on every hit; LRU order only needs to be roughly right on disk
+_TOUCH_INTERVAL = 300
+
+
+def audio_key(text: str, voice_id: str = "", model_id: str = "") -> str:
+    """
+    Content address of one synthesized clip.
+
+    Whitespace-only differences in the text map to the same clip.
+
+    Args:
+        text: Text to synthesize
+        voice_id: TTS voice
+        model_id: TTS model
+
+    Returns:
+        32-character hex key
+    """
+    normalized = " ".join((text or "").split())
+    digest = hashlib.sha256(f"{voice_id}\x00{model_id}\x00{normalized}".encode("utf-8"))
+    return digest.hexdigest()[:32]
+
+
+class TtsAudioCache:
+    def __init__(self, cache_dir: Optional[str] = DEFAULT_CACHE_DIR, max_disk_bytes: int = 256 * 1024 * 1024,
+                 hot_entries: int = 32, hot_bytes: int = 8 * 1024 * 1024):
+        """
+        Initialize the synthesized-audio cache.
+
+        Clips live on disk under cache_dir, written atomically and evicted
+        least-recently-used once the directory exceeds max_disk_bytes. The
+        most recently used clips are also kept in memory (the hot tier) so
+        repeated phrases such as greetings never touch the disk.
+
+        Args:
+            cache_dir: Directory for audio files (None = memory only)
+            max_disk_bytes: Size bound of the disk tier
+            hot_entries: Maximum clips in the memory tier
+            hot_bytes: Maximum bytes in the memory tier
+        """
+        self.cache_dir = cache_dir
+        self.max_disk_bytes = max_disk_bytes
+        self.hot_entries = max(0, hot_entries)
+        self.hot_bytes = hot_bytes
+        self._lock = threading.Lock()
+        self._hot = OrderedDict()   # key -> (audio, mime)
+        self._hot_size = 0
+        self._disk = OrderedDict()  # key -> (path, size, last_touch), LRU order
+        self._disk_size = 0
+        self._hits = 0
+        self._hot_hits = 0
+        self._misses = 0
+        self._writes = 0
+        self._evictions = 0
+
+        if self.cache_dir:
+            try:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                self._scan()
+            except OSError as e:
+                logger.error(f"TTS disk cache disabled, cannot use {self.cache_dir}: {e}")
+                self.cache_dir = None
+
+    def _scan(self):
+        """Index existing files, oldest mtime first, and drop leftovers from interrupted writes."""
+        found = []
+        for dirpath, _, filenames in os.walk(self.cache_dir):
+            for name in filenames:
+                path = os.path.join(dirpath, name)
+                stem, ext = os.path.splitext(name)
+                try:
+                    if ext == ".tmp":
+                        os.unlink(path)
+                        continue
+                    if ext not in _MIME_BY_EXT or len(stem) != 32:
+                        continue
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                found.append((st.st_mtime, stem, path, st.st_size))
+        for mtime, key, path, size in sorted(found):
+            self._disk[key] = (path, size, mtime)
+            self._disk_size += size
+        with self._lock:
+            evicted = self._evict_disk_locked()
+        self._remove_files(evicted)
+        if found:
+            logger.info(f"TTS cache indexed {len(self._disk)} clips ({self._disk_size} bytes) from {self.cache_dir}")
+
+    def _path_for(self, key: str, mime: str) -> str:
+        # Two-level fan-out keeps directories small
+        return os.path.join(self.cache_dir, key[:2], key + _EXTENSIONS.get(mime, ".mp3"))
+
+    def contains(self, key: str) -> bool:
+        """True if the clip is cached in either tier."""
+        with self._lock:
+            return key in self._hot or key in self._disk
+
+    def get(self, key: str) -> Optional[Tuple[bytes, str]]:
+        """
+        Fetch a cached clip.
+
+        Args:
+            key: Key from audio_key()
+
+        Returns:
+            (audio_bytes, mime) or None
+        """
+        with self._lock:
+            hot = self._hot.get(key)
+            if hot is not None:
+                self._hot.move_to_end(key)
+                if key in self._disk:
+                    self._disk.move_to_end(key)
+                self._hits += 1
+                self._hot_hits += 1
+                return hot
+            entry = self._disk.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            self._disk.move_to_end(key)
+        path, size, last_touch = entry
+
+        try:
+            with open(path, "rb") as f:
+                audio = f.read()
+        except OSError as e:
+            logger.error(f"Dropping unreadable TTS cache file {path}: {e}")
+            with self._lock:
+                if self._disk.pop(key, None) is not None:
+                    self._disk_size -= size
+                self._misses += 1
+            return None
+
+        mime = _MIME_BY_EXT.get(os.path.splitext(path)[1], "audio/mpeg")
+        now = time.time()
+        if now - last_touch > _TOUCH_INTERVAL:
+            # Persist recency so LRU order survives restarts
+            try:
+                os.utime(path, (now, now))
+            except OSError:
+                pass
+        with self._lock:
+            if key in self._disk:
+                self._disk[key] = (path, size, now if now - last_touch > _TOUCH_INTERVAL else last_touch)
+            self._hits += 1
+            self._remember_hot_locked(key, audio, mime)
+        return audio, mime
+
+    def put(self, key: str, audio: bytes, mime: str = "audio/mpeg"):
+        """
+        Store a clip in both tiers.
+
+        Args:
+            key: Key from audio_key()
+            audio: Audio bytes
+            mime: Audio MIME type
+        """
+        if not audio:
+            return
+        audio = bytes(audio)
+        with self._lock:
+            self._remember_hot_locked(key, audio, mime)
+            if not self.cache_dir or key in self._disk:
+                return
+
+        path = self._path_for(key, mime)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(audio)
+                os.replace(tmp_path, path)
+            except BaseException:
+                try:
+                    os.unlink(tmp_path)
+                except OSError:
+                    pass
+                raise
+        except OSError as e:
+            logger.error(f"Failed to write TTS cache file {path}: {e}")
+            return
+
+        with self._lock:
+            if key not in self._disk:
+                self._disk[key] = (path, len(audio), time.time())
+                self._disk_size += len(audio)
+                self._writes += 1
+            evicted = self._evict_disk_locked()
+        self._remove_files(evicted)
+
+    def _remember_hot_locked(self, key: str, audio: bytes, mime: str):
+        """Put a clip in the memory tier. Caller must hold the lock."""
+        if self.hot_entries == 0 or len(audio) > self.hot_bytes:
+            return
+        previous = self._hot.pop(key, None)
+        if previous is not None:
+            self._hot_size -= len(previous[0])
+        self._hot[key] = (audio, mime)
+        self._hot_size += len(audio)
+        while len(self._hot) > self.hot_entries or self._hot_size > self.hot_bytes:
+            _, (old_audio, _) = self._hot.popitem(last=False)
+            self._hot_size -= len(old_audio)
+
+    def _evict_disk_locked(self) -> List[str]:
+        """
+        Drop least-recently-used files from the index until within max_disk_bytes.
+        Caller must hold the lock.
+
+        Returns:
+            Paths to delete; pass them to _remove_files after releasing the
+            lock so disk I/O never blocks lookups
+        """
+        evicted = []
+        while self._disk_size > self.max_disk_bytes and self._disk:
+            key, (path, size, _) = self._disk.popitem(last=False)
+            self._disk_size -= size
+            self._evictions += 1
+            evicted.append(path)
+        return evicted
+
+    @staticmethod
+    def _remove_files(paths: List[str]):
+        """Delete evicted cache files. Call without holding the lock."""
+        for path in paths:
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get cache counters.
+
+        Returns:
+            Dictionary with tier sizes, hits (total and memory), misses, writes and evictions
+        """
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "disk_entries": len(self._disk),
+                "disk_bytes": self._disk_size,
+                "max_disk_bytes": self.max_disk_bytes,
+                "hot_entries": len(self._hot),
+                "hot_bytes": self._hot_size,
+                "hits": self._hits,
+                "hot_hits": self._hot_hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+                "writes": self._writes,
+                "evictions": self._evictions,
+                "cache_dir": self.cache_dir,
+            }
+
+
+# Global instance
+tts_audio_cache = TtsAudioCache(
+    cache_dir=os.getenv("TTS_CACHE_DIR", DEFAULT_CACHE_DIR) or None,
+    max_disk_bytes=int(os.getenv("TTS_CACHE_MAX_BYTES", str(256 * 1024 * 1024))),
+    hot_entries=int(os.getenv("TTS_CACHE_HOT_ENTRIES", "32")),
+    hot_bytes=int(os.getenv("TTS_CACHE_HOT_BYTES", str(8 * 1024 * 1024))),
+)
@@ -0,0 +1,299 @@
+import os
+import time
+import secrets
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+from services.tts_cache import TtsAudioCache, tts_audio_cache, audio_key
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+READY = "ready"
+FAILED = "failed"
+
+
+def tts_job_id(text: str, voice_id: str = "", model_id: str = "") -> str:
+    """
+    Job ID for one synthesized clip; identical to its audio cache key.
+
+    Args:
+        text: Text to synthesize
+        voice_id: TTS voice
+        model_id: TTS model
+
+    Returns:
+        32-character hex ID
+    """
+    return audio_key(text, voice_id, model_id)
+
+
+class TtsJobQueue:
+    def __init__(self, synthesize: Callable[[str], Optional[Tuple[bytes, str]]], max_workers: int = 2,
+                 max_entries: int = 64, max_bytes: int = 64 * 1024 * 1024,
+                 cache: Optional[TtsAudioCache] = None):
+        """
+        Initialize the background text-to-speech job queue.
+
+        Jobs are keyed by a hash of (voice, model, text), so the same reply
+        is synthesized once no matter how many times it is requested, and
+        finished audio stays in memory until pushed out by the size bounds.
+
+        Args:
+            synthesize: Callable turning text into (audio_bytes, mime) or None
+            max_workers: Concurrent synthesis calls
+            max_entries: Maximum finished clips kept
+            max_bytes: Maximum total audio bytes kept
+            cache: Audio cache consulted before queueing and after jobs expire
+        """
+        self.synthesize = synthesize
+        self.cache = cache
+        self.max_entries = max(1, max_entries)
+        self.max_bytes = max_bytes
+        self._executor = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="tts-job")
+        self._jobs = OrderedDict()  # job_id -> job dict
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self._submitted = 0
+        self._deduplicated = 0
+        self._cache_hits = 0
+        self._failures = 0
+
+    def submit(self, text: str, voice_id: str = "", model_id: str = "") -> str:
+        """
+        Queue synthesis of text unless the same clip is queued or ready.
+
+        Args:
+            text: Text to synthesize
+            voice_id: TTS voice (part of the job key)
+            model_id: TTS model (part of the job key)
+
+        Returns:
+            Job ID
+        """
+        job_id = tts_job_id(text, voice_id, model_id)
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None and job["status"] != FAILED:
+                self._jobs.move_to_end(job_id)
+                self._deduplicated += 1
+                return job_id
+        # Already synthesized earlier: get() serves it straight from the cache
+        if job is None and self.cache is not None and self.cache.contains(job_id):
+            with self._lock:
+                self._cache_hits += 1
+            return job_id
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None and job["status"] != FAILED:
+                return job_id
+            job = {
+                "job_id": job_id,
+                "status": PENDING,
+                "audio": None,
+                "mime": None,
+                "error": None,
+                "created_at": time.time(),
+                "done": threading.Event(),
+            }
+            self._jobs[job_id] = job
+            self._submitted += 1
+        self._executor.submit(self._run, job, text)
+        return job_id
+
+    def _run(self, job: Dict[str, Any], text: str):
+        started = time.time()
+        try:
+            result = self.synthesize(text)
+            if not result or not result[0]:
+                raise ValueError("TTS returned no audio")
+            audio, mime = result
+            with self._lock:
+                job["audio"] = bytes(audio)
+                job["mime"] = mime or "audio/mpeg"
+                job["status"] = READY
+                job["elapsed"] = round(time.time() - started, 3)
+                if self._jobs.get(job["job_id"]) is job:
+                    self._bytes += len(job["audio"])
+                    self._evict_locked()
+        except Exception as e:
+            logger.error(f"TTS job {job['job_id']} failed: {e}")
+            with self._lock:
+                job["status"] = FAILED
+                job["error"] = str(e)
+                self._failures += 1
+                self._evict_locked()
+        finally:
+            job["done"].set()
+
+    def _evict_locked(self):
+        """Drop the oldest finished clips until within bounds. Caller must hold the lock."""
+        for job_id in list(self._jobs):
+            if len(self._jobs) <= self.max_entries and self._bytes <= self.max_bytes:
+                break
+            job = self._jobs[job_id]
+            if job["status"] == PENDING:
+                continue
+            del self._jobs[job_id]
+            if job["audio"]:
+                self._bytes -= len(job["audio"])
+
+    def get(self, job_id: str, wait: float = 0) -> Optional[Dict[str, Any]]:
+        """
+        Look up a job, optionally waiting for it to finish.
+
+        Args:
+            job_id: ID returned by submit()
+            wait: Seconds to wait for a pending job (0 = don't wait)
+
+        Returns:
+            Job dict (status, audio, mime, error) or None if unknown
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                self._jobs.move_to_end(job_id)
+        if job is None and self.cache is not None:
+            cached = self.cache.get(job_id)
+            if cached:
+                return {"job_id": job_id, "status": READY, "audio": cached[0], "mime": cached[1], "error": None}
+        if job is not None and wait > 0 and job["status"] == PENDING:
+            job["done"].wait(wait)
+        return job
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get queue counters.
+
+        Returns:
+            Dictionary with job counts by status, bytes held and dedupe/failure counts
+        """
+        with self._lock:
+            statuses = {PENDING: 0, READY: 0, FAILED: 0}
+            for job in self._jobs.values():
+                statuses[job["status"]] += 1
+            return {
+                "jobs": len(self._jobs),
+                **statuses,
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "submitted": self._submitted,
+                "deduplicated": self._deduplicated,
+                "cache_hits": self._cache_hits,
+                "failures": self._failures,
+                "cache": self.cache.get_stats() if self.cache is not None else None,
+            }
+
+
+class TtsStreamTickets:
+    def __init__(self, ttl: float = 120, max_entries: int = 256):
+        """
+        Initialize the store of short-lived tickets for streamed speech.
+
+        The text is handed over in a POST and exchanged for a random ticket,
+        so the URL given to an <audio> element stays short and the text
+        never appears in URLs or access logs.
+
+        Args:
+            ttl: Seconds a ticket stays valid
+            max_entries: Maximum live tickets (oldest dropped first)
+        """
+        self.ttl = ttl
+        self.max_entries = max(1, max_entries)
+        self._tickets = OrderedDict()  # ticket -> (text, expires_at)
+        self._lock = threading.Lock()
+        self._issued = 0
+        self._expired = 0
+
+    def issue(self, text: str) -> str:
+        """
+        Create a ticket for text.
+
+        Args:
+            text: Text to synthesize
+
+        Returns:
+            32-character hex ticket
+        """
+        ticket = secrets.token_hex(16)
+        now = time.time()
+        with self._lock:
+            self._purge_locked(now)
+            self._tickets[ticket] = (text, now + self.ttl)
+            while len(self._tickets) > self.max_entries:
+                self._tickets.popitem(last=False)
+            self._issued += 1
+        return ticket
+
+    def text_for(self, ticket: str) -> Optional[str]:
+        """
+        Look up the text behind a ticket.
+
+        Tickets stay valid until they expire, so an <audio> element may
+        re-request the stream.
+
+        Args:
+            ticket: Ticket returned by issue()
+
+        Returns:
+            Text, or None if the ticket is unknown or expired
+        """
+        now = time.time()
+        with self._lock:
+            self._purge_locked(now)
+            entry = self._tickets.get(ticket)
+        return entry[0] if entry and entry[1] > now else None
+
+    def _purge_locked(self, now: float):
+        """Drop expired tickets. Caller must hold the lock."""
+        for ticket, (_, expires_at) in list(self._tickets.items()):
+            if expires_at > now:
+                break
+            del self._tickets[ticket]
+            self._expired += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get ticket counters.
+
+        Returns:
+            Dictionary with live, issued and expired ticket counts
+        """
+        with self._lock:
+            return {"live": len(self._tickets), "issued": self._issued,
+                    "expired": self._expired, "ttl": self.ttl}
+
+
+def _synthesize_with_tts_service(text: str) -> Optional[Tuple[bytes, str]]:
+    """Adapt tts_service's return shapes to (bytes, mime)."""
+    from services.text_to_speech import tts_service
+
+    res = tts_service.text_to_speech(text)
+    if not res:
+        return None
+    # Backwards-compatible: res may be bytes or (bytes, metadata)
+    if isinstance(res, tuple):
+        audio_bytes, metadata = res[0], res[1] if len(res) > 1 else {}
+    else:
+        audio_bytes, metadata = res, {}
+    mime = metadata.get("mime") if isinstance(metadata, dict) and metadata.get("mime") else "audio/mpeg"
+    return audio_bytes, mime
+
+
+# Global instance
+tts_jobs = TtsJobQueue(
+    _synthesize_with_tts_service,
+    max_workers=int(os.getenv("TTS_JOB_WORKERS", "2")),
+    max_entries=int(os.getenv("TTS_JOB_MAX_ENTRIES", "64")),
+    max_bytes=int(os.getenv("TTS_JOB_MAX_BYTES", str(64 * 1024 * 1024))),
+    cache=tts_audio_cache,
+)
+
+tts_stream_tickets = TtsStreamTickets(
+    ttl=float(os.getenv("TTS_STREAM_TICKET_TTL", "120")),
+    max_entries=int(os.getenv("TTS_STREAM_MAX_TICKETS", "256")),
+)
@@ -0,0 +1,219 @@
+import os
+import logging
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from services.audio_decode import SAMPLE_RATE, decode_audio, encode_wav
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+_EPS = 1e-10
+
+
+class NoSpeechDetected(Exception):
+    """Raised when a clip holds no speech, before any model or upstream call."""
+
+
+class VoiceActivityDetector:
+    def __init__(self, frame_ms: int = 30, margin_db: float = 12.0, floor_db: float = -55.0,
+                 pad_ms: int = 200, min_speech_ms: int = 200, min_trim_seconds: float = 0.3):
+        """
+        Initialize the energy-based voice activity detector.
+
+        Frames are voiced when their RMS level clears an adaptive threshold:
+        margin_db above the clip's noise floor (10th percentile frame), but
+        never above margin_db below its loud frames (95th percentile), so a
+        clip that is speech end to end stays whole. A clip whose loud frames
+        are less than margin_db above its noise floor is steady noise and
+        holds no speech. floor_db is the level under which nothing counts as
+        speech.
+
+        Args:
+            frame_ms: Analysis frame length
+            margin_db: Required level above the noise floor
+            floor_db: Absolute minimum speech level, in dBFS
+            pad_ms: Audio kept on either side of the detected speech
+            min_speech_ms: Voiced audio needed for a clip to count as speech
+            min_trim_seconds: Re-encode an upload only if trimming saves at least this much
+        """
+        self.frame_ms = frame_ms
+        self.margin_db = margin_db
+        self.floor_db = floor_db
+        self.pad_ms = pad_ms
+        self.min_speech_ms = min_speech_ms
+        self.min_trim_seconds = min_trim_seconds
+        self._lock = threading.Lock()
+        self._clips = 0
+        self._rejected = 0
+        self._seconds_in = 0.0
+        self._seconds_out = 0.0
+        self._bytes_in = 0
+        self._bytes_out = 0
+
+    def detect(self, samples: np.ndarray, sample_rate: int = SAMPLE_RATE) -> Optional[Tuple[int, int]]:
+        """
+        Find the span of a clip that holds speech.
+
+        Args:
+            samples: 1-D float array
+            sample_rate: Rate of samples in Hz
+
+        Returns:
+            (start, end) sample indices including padding, or None if no speech
+        """
+        frame = max(1, int(sample_rate * self.frame_ms / 1000))
+        n_frames = len(samples) // frame
+        if n_frames == 0:
+            return None
+        frames = np.asarray(samples[:n_frames * frame], dtype=np.float32).reshape(n_frames, frame)
+        level = 20 * np.log10(np.sqrt(np.mean(frames * frames, axis=1)) + _EPS)
+
+        noise, loud = np.percentile(level, [10, 95])
+        # Speech rises and falls; a flat level (hum, hiss, fan) is not speech
+        if loud - noise < self.margin_db:
+            return None
+        threshold = max(self.floor_db, min(noise + self.margin_db, loud - self.margin_db))
+        voiced = np.flatnonzero(level > threshold)
+        if len(voiced) * self.frame_ms < self.min_speech_ms:
+            return None
+
+        pad = int(sample_rate * self.pad_ms / 1000)
+        start = max(0, voiced[0] * frame - pad)
+        end = min(len(samples), (voiced[-1] + 1) * frame + pad)
+        return int(start), int(end)
+
+    def _record(self, seconds_in: float, seconds_out: float, bytes_in: int, bytes_out: int):
+        with self._lock:
+            self._clips += 1
+            if seconds_out == 0:
+                self._rejected += 1
+            self._seconds_in += seconds_in
+            self._seconds_out += seconds_out
+            self._bytes_in += bytes_in
+            self._bytes_out += bytes_out
+
+    def trim(self, samples: np.ndarray, sample_rate: int = SAMPLE_RATE) -> np.ndarray:
+        """
+        Cut leading and trailing silence from decoded audio.
+
+        Args:
+            samples: 1-D float array
+            sample_rate: Rate of samples in Hz
+
+        Returns:
+            The speech span of samples (a view, no copy)
+
+        Raises:
+            NoSpeechDetected: If the clip holds no speech
+        """
+        span = self.detect(samples, sample_rate)
+        kept = samples[span[0]:span[1]] if span else samples[:0]
+        self._record(len(samples) / sample_rate, len(kept) / sample_rate,
+                     samples.nbytes, kept.nbytes)
+        if span is None:
+            raise NoSpeechDetected("No speech detected in the recording")
+        return kept
+
+    def prepare_upload(self, audio_bytes: bytes, mime_type: str) -> Tuple[bytes, str]:
+        """
+        Trim an encoded upload before it is sent to a hosted model.
+
+        The upload is returned untouched when it can't be decoded here or
+        trimming would save little; otherwise the speech span is re-encoded
+        as 16 kHz WAV (hosted models bill audio by duration).
+
+        Args:
+            audio_bytes: Raw upload
+            mime_type: MIME type of the upload
+
+        Returns:
+            (audio_bytes, mime_type) to send
+
+        Raises:
+            NoSpeechDetected: If the clip holds no speech
+        """
+        samples = decode_audio(audio_bytes)
+        if samples is None:
+            return audio_bytes, mime_type
+        seconds_in = len(samples) / SAMPLE_RATE
+        span = self.detect(samples)
+        if span is None:
+            self._record(seconds_in, 0.0, len(audio_bytes), 0)
+            raise NoSpeechDetected("No speech detected in the recording")
+
+        seconds_out = (span[1] - span[0]) / SAMPLE_RATE
+        if seconds_in - seconds_out < self.min_trim_seconds:
+            self._record(seconds_in, seconds_in, len(audio_bytes), len(audio_bytes))
+            return audio_bytes, mime_type
+        trimmed = encode_wav(samples[span[0]:span[1]])
+        # Compare against the whole clip in the same encoding: a compressed
+        # upload can be smaller than its trimmed WAV, but is billed by duration
+        sample_bytes = len(trimmed) - 2 * (span[1] - span[0])
+        self._record(seconds_in, seconds_out, sample_bytes + 2 * len(samples), len(trimmed))
+        return trimmed, "audio/wav"
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get trimming counters.
+
+        Returns:
+            Dictionary with clips seen, empty clips rejected, and seconds and
+            bytes before/after trimming (bytes are of the audio handed on:
+            PCM for local models, the upload for hosted ones, measured as
+            WAV on both sides when an upload was re-encoded)
+        """
+        with self._lock:
+            return {
+                "clips": self._clips,
+                "rejected": self._rejected,
+                "seconds_in": round(self._seconds_in, 2),
+                "seconds_out": round(self._seconds_out, 2),
+                "seconds_saved": round(self._seconds_in - self._seconds_out, 2),
+                "bytes_in": self._bytes_in,
+                "bytes_out": self._bytes_out,
+                "bytes_saved": self._bytes_in - self._bytes_out,
+            }
+
+
+# Global instance
+vad = VoiceActivityDetector(
+    margin_db=float(os.getenv("VAD_MARGIN_DB", "12")),
+    floor_db=float(os.getenv("VAD_FLOOR_DB", "-55")),
+    pad_ms=int(os.getenv("VAD_PAD_MS", "200")),
+    min_speech_ms=int(os.getenv("VAD_MIN_SPEECH_MS", "200")),
+)
+
+
+if __name__ == "__main__":
+    # Synthetic clip check: python -m services.vad
+    rng = np.random.default_rng(0)
+    second = SAMPLE_RATE
+
+    def noise(seconds, dbfs):
+        return (rng.standard_normal(int(seconds * second)) * 10 ** (dbfs / 20)).astype(np.float32)
+
+    def syllables(seconds, dbfs):
+        # Bursts of 200 ms on, 100 ms off, like a speaker's syllables
+        t = np.arange(int(seconds * second)) / second
+        envelope = (t % 0.3 < 0.2).astype(np.float32)
+        return (np.sin(2 * np.pi * 180 * t) * envelope * 10 ** (dbfs / 20) * 1.41).astype(np.float32)
+
+    cases = (
+        ("digital silence", np.zeros(3 * second, dtype=np.float32), False),
+        ("steady noise at -40 dBFS", noise(3, -40), False),
+        ("steady noise at -20 dBFS", noise(3, -20), False),
+        ("speech in quiet noise", np.concatenate([noise(1, -50), syllables(1, -20) + noise(1, -50), noise(1, -50)]), True),
+        ("speech end to end", syllables(3, -20), True),
+    )
+    detector = VoiceActivityDetector()
+    failures = 0
+    for name, samples, has_speech in cases:
+        span = detector.detect(samples)
+        if (span is not None) != has_speech:
+            failures += 1
+            print(f"MISMATCH {name}: expected {'speech' if has_speech else 'none'}, got {span}")
+    print(f"{len(cases) - failures}/{len(cases)} synthetic clips detected as expected")
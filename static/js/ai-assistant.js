@@ -246,6 +246,46 @@
     }
   }
 
+  // Streaming chat over Server-Sent Events: reply tokens render as they arrive,
+  // speech follows in a later "audio" event. handlers: { token, reply, audio, error }
+  async function callStreamingChat(message, handlers) {
+    const response = await fetch('/api/chat-text-stream', {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({
+        message: message,
+        conversation_id: conversationId
+      })
+    });
+    if (!response.ok || !response.body || !response.body.getReader) {
+      throw new Error(`Streaming unavailable (${response.status})`);
+    }
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    while (true) {
+      const { value, done } = await reader.read();
+      if (done) break;
+      buffer += decoder.decode(value, { stream: true });
+      let sep;
+      while ((sep = buffer.indexOf('\n\n')) !== -1) {
+        const frame = buffer.slice(0, sep);
+        buffer = buffer.slice(sep + 2);
+        let event = 'message';
+        const dataLines = [];
+        frame.split('\n').forEach(line => {
+          if (line.startsWith('event:')) event = line.slice(6).trim();
+          else if (line.startsWith('data:')) dataLines.push(line.slice(5).trim());
+        });
+        // Frames without data are keepalive comments
+        if (!dataLines.length) continue;
+        const data = JSON.parse(dataLines.join('\n'));
+        if (handlers[event]) handlers[event](data);
+      }
+    }
+  }
+
   // Event delegation to handle Save button clicks on trip plan cards
   
 
@@ -280,6 +320,22 @@
     }
   }
 
+  // The text is POSTed; the returned URL only carries a short-lived ticket
+  async function ttsStreamUrl(text) {
+    try {
+      const response = await fetch('/api/tts-stream', {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ text })
+      });
+      const data = await response.json();
+      return response.ok ? data.audio_url : null;
+    } catch (error) {
+      console.error('TTS stream error:', error);
+      return null;
+    }
+  }
+
   async function getNotifications() {
     try {
       const response = await fetch('/api/notifications');
@@ -509,6 +565,22 @@
   function playAudio(audioBase64) {
     if (!audioBase64) return;
 
+    // Chat replies return a URL to background-synthesized audio
+    if (/^(\/|https?:)/.test(String(audioBase64))) {
+      const audio = new Audio(audioBase64);
+      speakerButton.classList.add('speaking');
+      audio.onended = () => speakerButton.classList.remove('speaking');
+      audio.onerror = () => speakerButton.classList.remove('speaking');
+      const p = audio.play();
+      if (p && typeof p.then === 'function') {
+        p.catch(err => {
+          console.error('Audio play promise rejected:', err);
+          speakerButton.classList.remove('speaking');
+        });
+      }
+      return;
+    }
+
     try {
       console.debug('playAudio called, payload length:', (''+audioBase64).length);
 
@@ -728,16 +800,13 @@
   });
 
   // Text-to-Speech button
-  speakerButton.addEventListener('click', function() {
+  speakerButton.addEventListener('click', async function() {
     const lastMessage = chatContainer.querySelector('.assistant-message:last-child');
     if (lastMessage) {
       const text = lastMessage.textContent.trim();
       if (text) {
-  callTextToSpeech(text).then(data => {
-          if (data.audio) {
-            playAudio(data.audio);
-          }
-        });
+        // Streamed: playback starts with the first chunk of synthesized audio
+        playAudio(await ttsStreamUrl(text));
       }
     }
   });
@@ -778,8 +847,63 @@
   addMessage(message, true, false);
     showTypingIndicator();
     
+    let streamDiv = null;
+    let streamedText = '';
+    let gotReply = false;
+    const dropStreamPreview = () => {
+      if (streamDiv) {
+        streamDiv.remove();
+        streamDiv = null;
+      }
+    };
+
+    try {
+      await callStreamingChat(message, {
+        token: (data) => {
+          if (!streamDiv) {
+            hideTypingIndicator();
+            streamDiv = document.createElement('div');
+            streamDiv.className = 'message assistant-message';
+            chatContainer.appendChild(streamDiv);
+          }
+          // Plain text while streaming; the reply event swaps in the rendered version
+          streamedText += data.text || '';
+          streamDiv.textContent = streamedText;
+          chatContainer.scrollTop = chatContainer.scrollHeight;
+        },
+        reply: (data) => {
+          gotReply = true;
+          hideTypingIndicator();
+          dropStreamPreview();
+          renderAssistantResponse(data);
+        },
+        audio: (data) => {
+          if (data.audio) playAudio(data.audio);
+        },
+        error: (data) => {
+          gotReply = true;
+          hideTypingIndicator();
+          dropStreamPreview();
+          addMessage(`Error: ${data.details || data.error}`, false, false);
+        }
+      });
+      if (!gotReply) throw new Error('Stream ended without a reply');
+      return;
+    } catch (error) {
+      console.debug('Streaming chat unavailable:', error);
+      if (gotReply) return;
+      if (streamDiv) {
+        // The server already handled this message; re-sending would duplicate it
+        dropStreamPreview();
+        hideTypingIndicator();
+        addMessage("Sorry, the connection to the assistant was interrupted.", false, false);
+        return;
+      }
+    }
+
+    // Fallback: non-streaming endpoint
     try {
-  const response = await callEnhancedChat(message);
+      const response = await callEnhancedChat(message);
       hideTypingIndicator();
       
       if (response.error) {
@@ -787,47 +911,12 @@
         return;
       }
 
-      // Unified assistant response handling (avoid duplicates)
-      // Prefer the canonical keys: reply, reply_text
-      const replyText = response.reply || response.reply_text || response.reply_text || '';
-
-      if (replyText) {
-        // Assistant reply: render Markdown/HTML
-        addMessage(replyText, false, true);
-      }
-
-      // Defensive trip_plan lookup (top-level or nested)
-      const tripPlan = response.trip_plan || (response.response_data && response.response_data.trip_plan);
-      if (tripPlan) {
-        const tripPlanHtml = renderTripPlan(tripPlan);
-        addMessage(tripPlanHtml, false, true);
-      }
-
-      // ** NEW ** Check for hotel results and render interactive hotel cards
-      const hotelResults = response.hotel_results || (response.response_data && response.response_data.hotel_results);
-      if (Array.isArray(hotelResults) && hotelResults.length > 0) {
-        const hotelCardsHtml = renderHotelCards(hotelResults);
-        if (hotelCardsHtml) addMessage(hotelCardsHtml, false, true);
-      }
+      renderAssistantResponse(response);
 
       // Play audio if available
       if (response.audio) {
         playAudio(response.audio);
       }
-
-      // Update suggestions if present
-      if (response.response_data?.suggestions) {
-        updateSuggestions(response.response_data.suggestions);
-      }
-
-      // Quick actions and booking actions (if provided)
-      if (response.response_data?.quick_actions) {
-        showQuickActions(response.response_data.quick_actions);
-      }
-      if (response.response_data?.booking_actions) {
-        showBookingActions(response.response_data.booking_actions);
-      }
-      
     } catch (error) {
       hideTypingIndicator();
       console.error('Send message error:', error);
@@ -835,6 +924,45 @@
     }
   }
 
+  // Render reply text, trip plan, hotel cards and actions from a chat payload
+  function renderAssistantResponse(response) {
+    // Unified assistant response handling (avoid duplicates)
+    // Prefer the canonical keys: reply, reply_text
+    const replyText = response.reply || response.reply_text || response.reply_text || '';
+
+    if (replyText) {
+      // Assistant reply: render Markdown/HTML
+      addMessage(replyText, false, true);
+    }
+
+    // Defensive trip_plan lookup (top-level or nested)
+    const tripPlan = response.trip_plan || (response.response_data && response.response_data.trip_plan);
+    if (tripPlan) {
+      const tripPlanHtml = renderTripPlan(tripPlan);
+      addMessage(tripPlanHtml, false, true);
+    }
+
+    // ** NEW ** Check for hotel results and render interactive hotel cards
+    const hotelResults = response.hotel_results || (response.response_data && response.response_data.hotel_results);
+    if (Array.isArray(hotelResults) && hotelResults.length > 0) {
+      const hotelCardsHtml = renderHotelCards(hotelResults);
+      if (hotelCardsHtml) addMessage(hotelCardsHtml, false, true);
+    }
+
+    // Update suggestions if present
+    if (response.response_data?.suggestions) {
+      updateSuggestions(response.response_data.suggestions);
+    }
+
+    // Quick actions and booking actions (if provided)
+    if (response.response_data?.quick_actions) {
+      showQuickActions(response.response_data.quick_actions);
+    }
+    if (response.response_data?.booking_actions) {
+      showBookingActions(response.response_data.booking_actions);
+    }
+  }
+
   // Bind send button click without passing the event object into sendMessage
   // (passing the event caused PointerEvent to be used as the message)
   sendButton.removeEventListener('click', sendMessage);
@@ -1,8 +1,18 @@
 import os
 import json
-from serpapi import GoogleSearch
+from services.serp_cache import cached_search
+from services.iata_resolver import iata_resolver
+from services.trip_parser import fast_trip_parser
 # Gemini service is imported lazily to avoid initialization side-effects during module import
 
+def _load_json_reply(text):
+    # Imported lazily for the same reason as the service itself
+    from services.gemini_service import load_json_reply
+    return load_json_reply(text)
+
+def _parses_as_json(text):
+    return _load_json_reply(text) is not None
+
 def _get_gemini_service():
     try:
         from services.gemini_service import gemini_service as _svc
@@ -17,19 +27,6 @@ from datetime import datetime, timedelta
 # --- Configuration ---
 SERPAPI_KEY = os.getenv("SERPAPI_KEY")
 
-# Load airports data (used to map city/name -> IATA code for SerpAPI)
-_AIRPORTS = []
-try:
-    _ROOT = os.path.dirname(os.path.abspath(__file__))
-    _AIRPATH = os.path.join(_ROOT, "static", "js", "airports.json")
-    if not os.path.exists(_AIRPATH):
-        # try project root static path (main.py uses BASE_DIR/static/js)
-        _AIRPATH = os.path.join(os.path.dirname(_ROOT), "static", "js", "airports.json")
-    with open(_AIRPATH, "r", encoding="utf-8") as _f:
-        _AIRPORTS = json.load(_f)
-except Exception as _e:
-    print(f"Warning: could not load airports.json for mapping: {_e}")
-    _AIRPORTS = []
 # --- 1. Main Orchestrator Function ---
 
 def generate_trip_plan_from_details(trip_details, conversation_id="default"):
@@ -88,7 +85,15 @@ def extract_trip_details(user_text, conversation_history=None):
         user_text: The current user message
         conversation_history: Optional list of previous conversation messages in format:
             [{"role": "user", "content": "..."}, {"role": "assistant", "content": "..."}, ...]
+
+    Simple, self-contained requests are parsed locally (services.trip_parser)
+    and skip the model entirely.
     """
+    fast = fast_trip_parser.try_parse(user_text, has_history=bool(conversation_history))
+    if fast is not None:
+        fast["details"] = _normalize_details(fast["details"])
+        return fast
+
     # Get current date for context
     from datetime import datetime
     today = datetime.now().date()
@@ -173,10 +178,9 @@ def extract_trip_details(user_text, conversation_history=None):
         svc = _get_gemini_service()
         if not svc:
             raise Exception("Gemini service unavailable")
-        response_text = svc.generate_chat_response(prompt)
-        # Clean the response to ensure it's valid JSON
-        json_response = response_text.strip().replace("```json", "").replace("```", "")
-        parsed = json.loads(json_response)
+        response_text = svc.generate_chat_response(prompt, task="parse", validate=_parses_as_json)
+        # Same extraction the escalation check applied
+        parsed = _load_json_reply(response_text)
 
         # Ensure the response has the expected structure (tasks and details)
         if not isinstance(parsed, dict):
@@ -200,22 +204,7 @@ def extract_trip_details(user_text, conversation_history=None):
                 "details": parsed  # Use the parsed data as details
             }
         
-        # Normalize date fields in details
-        details = parsed.get("details", {})
-        if details.get("departure_date"):
-            details["departure_date"] = _normalize_and_validate_date(details.get("departure_date"))
-        if details.get("return_date"):
-            details["return_date"] = _normalize_and_validate_date(details.get("return_date"))
-        if details.get("days") and isinstance(details.get("days"), str) and details.get("days").isdigit():
-            details["days"] = int(details.get("days"))
-        # Normalize adults field if present
-        if details.get("adults") is not None:
-            try:
-                details["adults"] = int(details.get("adults"))
-            except Exception:
-                details["adults"] = None
-        
-        parsed["details"] = details
+        parsed["details"] = _normalize_details(parsed.get("details", {}))
         return parsed
     except Exception as e:
         print(f"Gemini parsing failed, falling back to heuristic parsing: {e}")
@@ -437,6 +426,23 @@ def extract_trip_details(user_text, conversation_history=None):
         return None
 
 
+def _normalize_details(details):
+    """Normalize date, days and adults fields of extracted trip details in place."""
+    if details.get("departure_date"):
+        details["departure_date"] = _normalize_and_validate_date(details.get("departure_date"))
+    if details.get("return_date"):
+        details["return_date"] = _normalize_and_validate_date(details.get("return_date"))
+    if details.get("days") and isinstance(details.get("days"), str) and details.get("days").isdigit():
+        details["days"] = int(details.get("days"))
+    # Normalize adults field if present
+    if details.get("adults") is not None:
+        try:
+            details["adults"] = int(details.get("adults"))
+        except Exception:
+            details["adults"] = None
+    return details
+
+
 def _normalize_and_validate_date(text):
     """
     Normalize and validate a date string. Handles:
@@ -650,75 +656,34 @@ def get_flight_options(origin, destination, date, return_date=None):
         return {"error": "Missing flight details (origin, destination, or date)."}
 
     # Normalize origin/destination to 3-letter IATA codes if possible
-    def _find_iata_code(val: str):
-        if not val:
-            return None
-        import re
-        v = re.sub(r"[^A-Za-z0-9 ()-]", "", val or "").strip()
-
-        # If user provided something like 'Ahmedabad (AMD)'
-        m = re.search(r"\(([A-Za-z]{3})\)", v)
-        if m:
-            return m.group(1).upper()
-
-        # If already a 3-letter code
-        if len(v) == 3 and v.isalpha():
-            return v.upper()
-
-        q = v.lower()
-        candidates = []
-
-        # Exact matches first
-        for a in _AIRPORTS:
-            try:
-                city = (a.get('city') or '').lower()
-                name = (a.get('name') or '').lower()
-                code = (a.get('code') or '').upper()
-                if q == city or q == name or q == code.lower():
-                    return code
-            except Exception:
-                continue
-
-        # Substring / startswith matches
-        for a in _AIRPORTS:
-            try:
-                city = (a.get('city') or '').lower()
-                name = (a.get('name') or '').lower()
-                code = (a.get('code') or '').upper()
-                if city.startswith(q) or q in city or q in name or name.startswith(q):
-                    return code
-                # collect candidates for later debug
-                if q in city or q in name:
-                    candidates.append(code)
-            except Exception:
-                continue
-
-        # Fallback: match by first 3 letters of city
-        for a in _AIRPORTS:
-            try:
-                city = (a.get('city') or '').lower()
-                code = (a.get('code') or '').upper()
-                if city and city[:3] == q[:3]:
-                    return code
-            except Exception:
-                continue
-
-        # Nothing found
-        if candidates:
-            # return the first candidate if we have any fuzzy matches
-            return candidates[0]
-
-        return None
-
-    origin_code = _find_iata_code(origin)
-    dest_code = _find_iata_code(destination)
+    origin_match = iata_resolver.lookup(origin)
+    dest_match = iata_resolver.lookup(destination)
+    origin_code = origin_match["code"]
+    dest_code = dest_match["code"]
 
     if not origin_code or not dest_code:
         details = []
-        if not origin_code:
-            details.append(f"origin='{origin}'")
-        if not dest_code:
-            details.append(f"destination='{destination}'")
+        candidates = {}
+        for label, value, match in (("origin", origin, origin_match), ("destination", destination, dest_match)):
+            if match["code"]:
+                continue
+            if match["candidates"]:
+                candidates[label] = match["candidates"]
+            else:
+                details.append(f"{label}='{value}'")
+        if candidates:
+            # Let the user pick instead of guessing between similar airports
+            options = "; ".join(
+                f"{label}: " + ", ".join(f"{c['city']} ({c['code']})" for c in options)
+                for label, options in candidates.items()
+            )
+            message = f"Which airport did you mean? {options}."
+            if details:
+                message += f" Also could not find: {', '.join(details)}."
+            return {
+                "error": message + " Please reply with the city or code (e.g., 'DEL').",
+                "candidates": candidates
+            }
         return {"error": f"Could not determine IATA codes for: {', '.join(details)}. Please provide city or airport (e.g., 'Ahmedabad (AMD)' or 'DEL')."}
     
     try:
@@ -741,8 +706,7 @@ def get_flight_options(origin, destination, date, return_date=None):
                 # return a helpful error so the caller can ask user to re-specify return date
                 return {"error": f"Invalid return_date format: {return_date}. Please provide YYYY-MM-DD or DD/MM/YYYY."}
             params["return_date"] = norm_ret
-        search = GoogleSearch(params)
-        results = search.get_dict()
+        results = cached_search(params)
         
         if "error" in results:
             return {"error": results["error"]}
@@ -838,8 +802,7 @@ def get_hotel_options(destination, check_in_date, check_out_date, adults=2, budg
         if budget:
             params["budget"] = budget
 
-        search = GoogleSearch(params)
-        results = search.get_dict()
+        results = cached_search(params)
         if "error" in results:
             return {"error": results["error"]}
 
@@ -1017,16 +980,10 @@ def build_itinerary(destination, days, interests, budget, origin=None, transport
         svc = _get_gemini_service()
         if not svc:
             raise Exception("Gemini service unavailable")
-        response = svc.generate_chat_response(prompt)
-        cleaned = (response or "").strip().replace("```json", "").replace("```", "")
-        
-        # Try to extract JSON if it's wrapped in text
-        import re
-        json_match = re.search(r'\{.*\}', cleaned, re.DOTALL)
-        if json_match:
-            cleaned = json_match.group(0)
-        
-        data = json.loads(cleaned)
+        # Validated so a malformed itinerary is never cached
+        response = svc.generate_chat_response(prompt, task="long_form", validate=_parses_as_json)
+        # Strips fences and extracts the object if it's wrapped in text
+        data = _load_json_reply(response)
         # Minimal validation
         if not isinstance(data, dict):
             raise ValueError("Itinerary response was not a JSON object")
@@ -1120,8 +1077,7 @@ def get_attractions(destination):
             "api_key": SERPAPI_KEY
         }
         
-        search = GoogleSearch(params)
-        results = search.get_dict()
+        results = cached_search(params)
         
         if "error" in results:
             return {"error": results["error"]}
@@ -1202,20 +1158,9 @@ def modify_trip_plan(user_message, current_plan):
         if not svc:
             intent_response = ""
         else:
-            intent_response = svc.generate_chat_response(intent_prompt)
-        # Clean JSON response
-        intent_json = intent_response.strip().replace("```json", "").replace("```", "")
-        try:
-            intent_data = json.loads(intent_json)
-        except json.JSONDecodeError:
-            # If JSON parsing fails, try to extract JSON from the response
-            import re
-            json_match = re.search(r'\{[^{}]*"intent"[^{}]*\}', intent_json)
-            if json_match:
-                intent_data = json.loads(json_match.group())
-            else:
-                # Default to 'other' intent if parsing fails
-                intent_data = {"intent": "other", "details": {"action": "general modification"}}
+            intent_response = svc.generate_chat_response(intent_prompt, task="classify", validate=_parses_as_json)
+        # Default to 'other' intent if parsing fails
+        intent_data = _load_json_reply(intent_response) or {"intent": "other", "details": {"action": "general modification"}}
         
         intent = intent_data.get('intent', 'other')
         modified_plan = current_plan.copy()
@@ -1299,7 +1244,7 @@ def modify_trip_plan(user_message, current_plan):
             if not svc:
                 updated_itinerary = "I couldn't update the itinerary at this time."
             else:
-                updated_itinerary = svc.generate_chat_response(itinerary_prompt)
+                updated_itinerary = svc.generate_chat_response(itinerary_prompt, task="long_form")
             modified_plan['itinerary_text'] = updated_itinerary
             bot_reply = "I've updated your itinerary based on your request."
             
@@ -1320,12 +1265,13 @@ def modify_trip_plan(user_message, current_plan):
             if not svc:
                 bot_reply = "I understand your request, but I need more specific details. Could you clarify what you'd like to change?"
             else:
-                modification_response = svc.generate_chat_response(modification_prompt)
-                modification_json = modification_response.strip().replace("```json", "").replace("```", "")
-                try:
-                    modified_plan = json.loads(modification_json)
+                modification_response = svc.generate_chat_response(modification_prompt, task="long_form",
+                                                                   validate=_parses_as_json)
+                parsed_plan = _load_json_reply(modification_response)
+                if parsed_plan is not None:
+                    modified_plan = parsed_plan
                     bot_reply = "I've updated your trip plan based on your request."
-                except:
+                else:
                     bot_reply = "I understand your request, but I need more specific details. Could you clarify what you'd like to change?"
         
         return modified_plan, bot_reply